@@ -60,6 +60,9 @@ def include_object(object, name, type_, reflected, compare_to):
 
 def run_migrations_offline():
     """离线迁移：不连接数据库"""
+    if settings.database_url.startswith("sqlite"):
+        # article 上的全文索引触发器调用应用注册的 fts_segment()，sqlite3 执行生成的 SQL 时没有该函数
+        raise RuntimeError("SQLite 不支持离线迁移：全文索引触发器依赖 fts_segment()，请使用在线迁移（alembic upgrade head）")
 
     if context.is_offline_mode():
         context.configure(
@@ -125,9 +128,16 @@ async def print_current_tables(engine: AsyncEngine):
 async def run_migrations_online():
     """在线迁移"""
     engine = create_async_engine(settings.database_url, echo=False)  # ✅ 动态创建
+    if engine.dialect.name == "sqlite":
+        # 迁移中写 article 会触发全文索引触发器，需要 fts_segment()
+        from app.core.search.sqlite_search_impl import register_sqlite_functions
+        register_sqlite_functions(engine.sync_engine)
     # ✅ 检查数据库连接
     await check_db_connection(engine)
     async with engine.begin() as conn:
+        if engine.dialect.name == "sqlite":
+            from app.core.search.sqlite_search_impl import ensure_sqlite_functions
+            await conn.run_sync(ensure_sqlite_functions)
         await conn.run_sync(do_run_migrations)
     # ✅ 迁移后打印所有表名
     await print_current_tables(engine)
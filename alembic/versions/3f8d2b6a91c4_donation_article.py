@@ -0,0 +1,44 @@
+"""
+donation record article
+
+Revision ID: 3f8d2b6a91c4
+Revises: e4a7c19b5f20
+Create Date: 2026-10-18 14:05:12.506731
+
+Project   : MyBlog FastAPI System
+Author    : Gold Zheng
+Alembic   : Auto-generated by Alembic Migration System
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# Revision identifiers, used by Alembic.
+revision: str = '3f8d2b6a91c4'
+down_revision: Union[str, None] = 'e4a7c19b5f20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    """
+    Upgrade migrations:
+    donation_record 关联打赏的文章，支付成功后计入热门文章榜
+    """
+    with op.batch_alter_table('donation_record') as batch_op:
+        batch_op.add_column(sa.Column('article_id', sa.Integer(), nullable=True, comment='打赏的文章ID（计入热门榜）'))
+        batch_op.create_foreign_key(
+            'fk_donation_record_article_id', 'article', ['article_id'], ['id'], ondelete='SET NULL'
+        )
+
+
+def downgrade() -> None:
+    """
+    Downgrade migrations:
+    This is the reverse of upgrade().
+    """
+    with op.batch_alter_table('donation_record') as batch_op:
+        batch_op.drop_constraint('fk_donation_record_article_id', type_='foreignkey')
+        batch_op.drop_column('article_id')
@@ -0,0 +1,42 @@
+"""
+media file listing indexes
+
+Revision ID: 58e0b7c3d1a6
+Revises: d2c8a5f41e93
+Create Date: 2026-10-18 21:36:02.118540
+
+Project   : MyBlog FastAPI System
+Author    : Gold Zheng
+Alembic   : Auto-generated by Alembic Migration System
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# Revision identifiers, used by Alembic.
+revision: str = '58e0b7c3d1a6'
+down_revision: Union[str, None] = 'd2c8a5f41e93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    """
+    Upgrade migrations:
+    媒体库按上传时间游标分页、按上传者过滤；get_media 按 (type, filename) 查找
+    """
+    op.create_index('idx_media_file_upload_time', 'media_file', ['upload_time', 'id'], unique=False)
+    op.create_index('idx_media_file_uploader_time', 'media_file', ['uploader_id', 'upload_time'], unique=False)
+    op.create_index('idx_media_file_type_filename', 'media_file', ['type', 'filename'], unique=False)
+
+
+def downgrade() -> None:
+    """
+    Downgrade migrations:
+    This is the reverse of upgrade().
+    """
+    op.drop_index('idx_media_file_type_filename', table_name='media_file')
+    op.drop_index('idx_media_file_uploader_time', table_name='media_file')
+    op.drop_index('idx_media_file_upload_time', table_name='media_file')
@@ -0,0 +1,42 @@
+"""
+keyset pagination indexes
+
+Revision ID: 5b2f0c7d9e41
+Revises: 1833864cda3b
+Create Date: 2026-10-18 09:12:40.218734
+
+Project   : MyBlog FastAPI System
+Author    : Gold Zheng
+Alembic   : Auto-generated by Alembic Migration System
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# Revision identifiers, used by Alembic.
+revision: str = '5b2f0c7d9e41'
+down_revision: Union[str, None] = '1833864cda3b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    """
+    Upgrade migrations:
+    (created_at, id) 复合索引，支撑文章 / 评论 / 捐赠记录的游标分页
+    """
+    op.create_index('idx_article_created_at_id', 'article', ['created_at', 'id'], unique=False)
+    op.create_index('idx_comment_article_created_at_id', 'comment', ['article_id', 'created_at', 'id'], unique=False)
+    op.create_index('idx_donation_record_created_at_id', 'donation_record', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """
+    Downgrade migrations:
+    This is the reverse of upgrade().
+    """
+    op.drop_index('idx_donation_record_created_at_id', table_name='donation_record')
+    op.drop_index('idx_comment_article_created_at_id', table_name='comment')
+    op.drop_index('idx_article_created_at_id', table_name='article')
@@ -0,0 +1,62 @@
+"""
+article related tables
+
+Revision ID: 7a5e0d3c8f16
+Revises: 3f8d2b6a91c4
+Create Date: 2026-10-18 15:42:37.904512
+
+Project   : MyBlog FastAPI System
+Author    : Gold Zheng
+Alembic   : Auto-generated by Alembic Migration System
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# Revision identifiers, used by Alembic.
+revision: str = '7a5e0d3c8f16'
+down_revision: Union[str, None] = '3f8d2b6a91c4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    """
+    Upgrade migrations:
+    相关文章近邻表与增量计算状态表；数据由 update_related_articles 任务首次运行时全量生成
+    """
+    op.create_table(
+        'article_related',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('article_id', sa.Integer(), nullable=False),
+        sa.Column('related_id', sa.Integer(), nullable=False),
+        sa.Column('rank', sa.Integer(), nullable=False, comment='名次，从 0 开始'),
+        sa.Column('score', sa.Float(), nullable=False, comment='TF-IDF 余弦与标签 Jaccard 的加权分数'),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False, comment='创建时间'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False, comment='更新时间'),
+        sa.ForeignKeyConstraint(['article_id'], ['article.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['related_id'], ['article.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('idx_article_related_article_rank', 'article_related', ['article_id', 'rank'], unique=False)
+    op.create_table(
+        'article_related_state',
+        sa.Column('article_id', sa.Integer(), nullable=False),
+        sa.Column('signature', sa.String(length=40), nullable=False, comment='标题 / 摘要 / 正文 / 标签的 SHA-1'),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False, comment='创建时间'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False, comment='更新时间'),
+        sa.ForeignKeyConstraint(['article_id'], ['article.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('article_id'),
+    )
+
+
+def downgrade() -> None:
+    """
+    Downgrade migrations:
+    This is the reverse of upgrade().
+    """
+    op.drop_table('article_related_state')
+    op.drop_index('idx_article_related_article_rank', table_name='article_related')
+    op.drop_table('article_related')
@@ -0,0 +1,47 @@
+"""
+article comment_count
+
+Revision ID: 9c41e6a2b7d3
+Revises: 5b2f0c7d9e41
+Create Date: 2026-10-18 10:03:11.507362
+
+Project   : MyBlog FastAPI System
+Author    : Gold Zheng
+Alembic   : Auto-generated by Alembic Migration System
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# Revision identifiers, used by Alembic.
+revision: str = '9c41e6a2b7d3'
+down_revision: Union[str, None] = '5b2f0c7d9e41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    """
+    Upgrade migrations:
+    新增 article.comment_count 冗余计数并按 comment 表回填
+    """
+    op.add_column(
+        'article',
+        sa.Column('comment_count', sa.Integer(), nullable=False, server_default='0',
+                  comment='评论数（冗余计数，随评论增删在同一事务内维护）')
+    )
+    op.execute(
+        "UPDATE article SET comment_count = "
+        "(SELECT COUNT(*) FROM comment WHERE comment.article_id = article.id)"
+    )
+
+
+def downgrade() -> None:
+    """
+    Downgrade migrations:
+    This is the reverse of upgrade().
+    """
+    with op.batch_alter_table('article') as batch_op:
+        batch_op.drop_column('comment_count')
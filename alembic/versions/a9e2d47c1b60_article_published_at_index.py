@@ -0,0 +1,37 @@
+"""
+article published_at index
+
+Revision ID: a9e2d47c1b60
+Revises: c7e3a9d1f552
+Create Date: 2026-10-19 09:12:05.418367
+
+Project   : MyBlog FastAPI System
+Author    : Gold Zheng
+Alembic   : Auto-generated by Alembic Migration System
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# Revision identifiers, used by Alembic.
+revision: str = 'a9e2d47c1b60'
+down_revision: Union[str, None] = 'c7e3a9d1f552'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    """
+    Upgrade migrations:
+    热门榜单的数据库兜底按 published_at 取时间窗口
+    """
+    op.create_index('idx_article_published_at', 'article', ['published_at'], unique=False)
+
+
+def downgrade() -> None:
+    """
+    Downgrade migrations:
+    This is the reverse of upgrade().
+    """
+    op.drop_index('idx_article_published_at', table_name='article')
@@ -0,0 +1,44 @@
+"""
+article view flush
+
+Revision ID: b3f58c2e7d14
+Revises: a9e2d47c1b60
+Create Date: 2026-10-19 09:47:31.205846
+
+Project   : MyBlog FastAPI System
+Author    : Gold Zheng
+Alembic   : Auto-generated by Alembic Migration System
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# Revision identifiers, used by Alembic.
+revision: str = 'b3f58c2e7d14'
+down_revision: Union[str, None] = 'a9e2d47c1b60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    """
+    Upgrade migrations:
+    浏览量快照批次号，保证同一快照只落库一次
+    """
+    op.create_table(
+        'article_view_flush',
+        sa.Column('batch_id', sa.String(length=32), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False, comment='创建时间'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False, comment='更新时间'),
+        sa.PrimaryKeyConstraint('batch_id'),
+    )
+
+
+def downgrade() -> None:
+    """
+    Downgrade migrations:
+    This is the reverse of upgrade().
+    """
+    op.drop_table('article_view_flush')
@@ -0,0 +1,58 @@
+"""
+media blob content-addressed storage
+
+Revision ID: b6d1f3a8e027
+Revises: 7a5e0d3c8f16
+Create Date: 2026-10-18 17:05:12.381946
+
+Project   : MyBlog FastAPI System
+Author    : Gold Zheng
+Alembic   : Auto-generated by Alembic Migration System
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# Revision identifiers, used by Alembic.
+revision: str = 'b6d1f3a8e027'
+down_revision: Union[str, None] = '7a5e0d3c8f16'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    """
+    Upgrade migrations:
+    按 SHA-256 寻址的媒体内容表（引用计数），media_file 通过 blob_sha256 引用；
+    已有文件的 blob_sha256 为 NULL，仍按原路径访问和删除
+    """
+    op.create_table(
+        'media_blob',
+        sa.Column('sha256', sa.String(length=64), nullable=False),
+        sa.Column('size', sa.Integer(), nullable=False),
+        sa.Column('path', sa.String(), nullable=False, comment='相对 uploads 目录的存储路径（blobs/ab/cd/<sha256><ext>）'),
+        sa.Column('refcount', sa.Integer(), server_default='0', nullable=False, comment='引用该内容的 MediaFile 数'),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False, comment='创建时间'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False, comment='更新时间'),
+        sa.PrimaryKeyConstraint('sha256'),
+    )
+    with op.batch_alter_table('media_file') as batch_op:
+        batch_op.add_column(sa.Column('blob_sha256', sa.String(length=64), nullable=True))
+        batch_op.create_index('ix_media_file_blob_sha256', ['blob_sha256'], unique=False)
+        batch_op.create_foreign_key(
+            'fk_media_file_blob_sha256', 'media_blob', ['blob_sha256'], ['sha256']
+        )
+
+
+def downgrade() -> None:
+    """
+    Downgrade migrations:
+    This is the reverse of upgrade().
+    """
+    with op.batch_alter_table('media_file') as batch_op:
+        batch_op.drop_constraint('fk_media_file_blob_sha256', type_='foreignkey')
+        batch_op.drop_index('ix_media_file_blob_sha256')
+        batch_op.drop_column('blob_sha256')
+    op.drop_table('media_blob')
@@ -0,0 +1,47 @@
+"""
+search index state
+
+Revision ID: c7e3a9d1f552
+Revises: 58e0b7c3d1a6
+Create Date: 2026-10-18 22:14:37.602915
+
+Project   : MyBlog FastAPI System
+Author    : Gold Zheng
+Alembic   : Auto-generated by Alembic Migration System
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# Revision identifiers, used by Alembic.
+revision: str = 'c7e3a9d1f552'
+down_revision: Union[str, None] = '58e0b7c3d1a6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    """
+    Upgrade migrations:
+    全文索引结构版本与高水位；表为空时下次启动全量建立一次索引，之后只增量补齐
+    """
+    op.create_table(
+        'search_index_state',
+        sa.Column('name', sa.String(length=32), nullable=False),
+        sa.Column('version', sa.Integer(), server_default='0', nullable=False, comment='建立索引时的 INDEX_VERSION，0 表示尚未建立'),
+        sa.Column('indexed_until', sa.DateTime(timezone=True), nullable=True, comment='已索引文章的最大 updated_at'),
+        sa.Column('last_id', sa.Integer(), server_default='0', nullable=False, comment='已索引文章的最大 id'),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False, comment='创建时间'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False, comment='更新时间'),
+        sa.PrimaryKeyConstraint('name'),
+    )
+
+
+def downgrade() -> None:
+    """
+    Downgrade migrations:
+    This is the reverse of upgrade().
+    """
+    op.drop_table('search_index_state')
@@ -0,0 +1,50 @@
+"""
+media derivative table
+
+Revision ID: d2c8a5f41e93
+Revises: b6d1f3a8e027
+Create Date: 2026-10-18 20:48:19.527103
+
+Project   : MyBlog FastAPI System
+Author    : Gold Zheng
+Alembic   : Auto-generated by Alembic Migration System
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# Revision identifiers, used by Alembic.
+revision: str = 'd2c8a5f41e93'
+down_revision: Union[str, None] = 'b6d1f3a8e027'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    """
+    Upgrade migrations:
+    图片衍生版本（缩放 / WebP / AVIF）记录；已有图片在首次按宽度请求时生成
+    """
+    op.create_table(
+        'media_derivative',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('source_url', sa.String(), nullable=False, comment='原文件 URL（与 MediaFile.url 相同）'),
+        sa.Column('width', sa.Integer(), nullable=False, comment='目标宽度档位（原图更窄时不放大）'),
+        sa.Column('format', sa.String(length=8), nullable=False),
+        sa.Column('path', sa.String(), nullable=False, comment='相对 uploads 目录的存储路径'),
+        sa.Column('size', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False, comment='创建时间'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False, comment='更新时间'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('source_url', 'width', 'format', name='uq_media_derivative_variant'),
+    )
+
+
+def downgrade() -> None:
+    """
+    Downgrade migrations:
+    This is the reverse of upgrade().
+    """
+    op.drop_table('media_derivative')
@@ -0,0 +1,43 @@
+"""
+article prerender columns
+
+Revision ID: e4a7c19b5f20
+Revises: 9c41e6a2b7d3
+Create Date: 2026-10-18 11:20:45.118204
+
+Project   : MyBlog FastAPI System
+Author    : Gold Zheng
+Alembic   : Auto-generated by Alembic Migration System
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# Revision identifiers, used by Alembic.
+revision: str = 'e4a7c19b5f20'
+down_revision: Union[str, None] = '9c41e6a2b7d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    """
+    Upgrade migrations:
+    新增 article 预渲染列；历史文章由 render_articles 定时任务 / 首次访问时补渲染
+    """
+    op.add_column('article', sa.Column('content_hash', sa.String(length=64), nullable=True, comment='预渲染对应的内容哈希'))
+    op.add_column('article', sa.Column('content_html', sa.Text(), nullable=True, comment='预渲染HTML'))
+    op.add_column('article', sa.Column('content_toc', sa.JSON(), nullable=True, comment='目录（标题层级/锚点）'))
+
+
+def downgrade() -> None:
+    """
+    Downgrade migrations:
+    This is the reverse of upgrade().
+    """
+    with op.batch_alter_table('article') as batch_op:
+        batch_op.drop_column('content_toc')
+        batch_op.drop_column('content_html')
+        batch_op.drop_column('content_hash')
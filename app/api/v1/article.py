@@ -2,60 +2,77 @@ import os
 from pathlib import Path
 import uuid
 from datetime import datetime
-from typing import List, Optional, Annotated
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, BackgroundTasks, Query
+from typing import Any, Dict, List, Literal, Optional, Annotated, Tuple, Union
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, BackgroundTasks, Query, Request, Response
 from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete
-from sqlalchemy.orm import selectinload
+from sqlalchemy import func, select, update, delete
+from sqlalchemy.orm import QueryableAttribute, defer, joinedload, load_only, selectinload, undefer
 import re
 
 from app.core.database import get_db
-from app.core.exceptions import NotFoundError, AuthorizationError
-from app.core.security import get_current_user
+from app.core.exceptions import NotFoundError, AuthorizationError, ValidationError
+from app.core.security import get_current_user, require_admin
 from app.core.tasks import add_comment_notification_task
+from app.core.view_counter import view_counter
+from app.core.trending import trending
+from app.core.related_articles import related_articles
+from app.core.feeds import site_feeds
+from app.core.file_response import file_response
+from app.core.media_signing import media_signer
+from app.core.image_variants import image_variants
+from app.core.media_store import media_store
+from app.core.article_cache import article_cache
+from app.core.comment_count import refresh_comment_counts
+from app.core.comment_tree import fetch_comment_tree
+from app.core.tag_resolver import sync_article_tags
+from app.core.article_render import article_renderer
+from app.core.article_io import export_ndjson, import_ndjson, iter_upload_lines
+from app.core.pagination import apply_keyset, build_page, timestamp_param
+from app.core.http_cache import (
+    CACHE_ARTICLE_DETAIL, CACHE_ARTICLE_LIST, CACHE_RELATED, CACHE_TRENDING, is_not_modified, make_etag, not_modified, set_validators,
+    validator_headers
+)
+from app.core.serialization import article_list_items, json_response
 from app.models.user import User, UserRole
 from app.models.article import Article, ArticleStatus
 from app.models.comment import Comment
 from app.models.tag import Tag, ArticleTag
 from app.schemas.article import (
     ArticleCreate, ArticleUpdate, ArticleResponse, ArticleListResponse,
-    ArticleDetailResponse, CommentCreate, CommentResponse
+    ArticleDetailResponse, ArticleBatchItem, ArticleBatchResponse, RelatedArticle, TrendingResponse,
+    CommentCreate, CommentResponse, CommentTreeNode
 )
+from app.schemas.pagination import CursorPage
+from app.schemas.media import MediaFileItem, MediaPage, MediaTypeTotal
 from app.core.config import settings
 from app.models.media import MediaFile, MediaType
-from app.utils.file_ops import delete_file
-from app.core.file_path import get_file_path_from_url,get_save_path
+from app.utils.file_ops import UploadTooLarge, delete_file
+from app.core.file_path import get_file_path_from_url
 
 
 router = APIRouter(prefix="/articles", tags=["articles"])
 
 
 
-async def save_upload_file(file: UploadFile, save_dir: Path, filename: str) -> bytes:
-    save_dir.mkdir(parents=True, exist_ok=True)
-    file_path = save_dir / filename
-    content = await file.read()
-    file_path.write_bytes(content)
-    return content
-
-
 async def handle_upload(
     current_user: User,
     db: AsyncSession,
     file: UploadFile,
     file_type: str,
     max_size: int,
-    allowed_mime_prefix: str
+    allowed_mime_prefix: str,
+    background_tasks: Optional[BackgroundTasks] = None
 ):
     """通用上传处理逻辑"""
     # 类型检查
     if not file.content_type or not file.content_type.startswith(allowed_mime_prefix):
         raise HTTPException(status_code=400, detail=f"Only {file_type} files are allowed")
 
-    # 大小检查
+    # 大小检查：file.size 已知时提前拒绝，流式写入时仍会按实际字节数再检查
+    too_large = f"File size too large. Maximum {max_size // (1024*1024)}MB allowed"
     if file.size and file.size > max_size:
-        raise HTTPException(status_code=400, detail=f"File size too large. Maximum {max_size // (1024*1024)}MB allowed")
+        raise HTTPException(status_code=400, detail=too_large)
 
     # 文件名检查
     if not file.filename:
@@ -65,27 +82,38 @@ async def handle_upload(
     ext = os.path.splitext(file.filename)[1]
     filename = f"{uuid.uuid4()}{ext}"
 
-    # 路径 & 保存
-    save_dir, file_url = get_save_path(current_user, file_type, filename)
-    content = await save_upload_file(file, save_dir, filename)
+    # 按内容寻址保存：相同内容只存一份，引用计数 + 1
+    try:
+        blob = await media_store.acquire(db, file, max_size)
+    except UploadTooLarge:
+        raise HTTPException(status_code=400, detail=too_large)
 
     # 存数据库
     db_file = MediaFile(
         filename=filename,
         type=MediaType[file_type],
-        url=file_url,
-        size=len(content),
+        url=blob.url,
+        size=blob.size,
         description=None,
-        uploader_id=current_user.id
+        uploader_id=current_user.id,
+        blob_sha256=blob.sha256
     )
     db.add(db_file)
     await db.commit()
+    await media_store.ensure_stored(file, blob, max_size)
+
+    # 图片在后台生成缩放 / WebP / AVIF 版本（内容已存在时只补缺少的版本）
+    if file_type == "image" and background_tasks is not None and settings.media_image_eager:
+        background_tasks.add_task(image_variants.generate, blob.url, blob.path)
 
     return {
-        "url": file_url,
+        "url": blob.url,
         "filename": filename,
         "original_name": file.filename,
-        "size": len(content)
+        "size": blob.size,
+        "sha256": blob.sha256,
+        "deduplicated": not blob.written,
+        "signed_url": media_signer.sign(blob.url)
     }
 
 
@@ -96,6 +124,7 @@ async def handle_upload(
 async def upload_image(
     current_user: Annotated[User, Depends(get_current_user)],
     db: Annotated[AsyncSession, Depends(get_db)],
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...)
 ):
     return await handle_upload(
@@ -104,7 +133,8 @@ async def upload_image(
         file=file,
         file_type="image",
         max_size=5 * 1024 * 1024,  # 5MB
-        allowed_mime_prefix="image/"
+        allowed_mime_prefix="image/",
+        background_tasks=background_tasks
     )
 
 
@@ -145,13 +175,14 @@ from sqlalchemy import select
 
 @router.get("/media/{file_type}/{filename}")
 async def get_media(
+    request: Request,
     file_type: MediaType,
     filename: str,
     db: Annotated[AsyncSession, Depends(get_db)],
     preview: bool = Query(True)
 ):
     """
-    通用文件获取接口
+    通用文件获取接口（支持 Range / If-Range，视频拖动和 PDF 跳页只传输需要的区间）
     file_type: image / video / pdf / latex 等（枚举类型）
     filename: 文件名
     preview: 对 PDF 是否预览（true）或下载（false）
@@ -168,43 +199,31 @@ async def get_media(
         raise HTTPException(status_code=404, detail="File not found")
 
     # 通过 URL 得到本地路径
-    local_path = media.url.lstrip("/")
+    local_path = get_file_path_from_url(media.url)
     if not os.path.exists(local_path):
         raise HTTPException(status_code=404, detail="File missing on disk")
 
-    # PDF 特殊处理（流式传输 + 下载/预览切换）
-    if file_type == MediaType.pdf:
-        try:
-            file = open(local_path, "rb")
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Failed to open PDF: {str(e)}")
+    # PDF 下载/预览切换
+    media_type = "application/pdf" if file_type == MediaType.pdf else None
+    download_name = filename if file_type == MediaType.pdf and not preview else None
 
-        def file_iterator():
-            try:
-                while chunk := file.read(8192):
-                    yield chunk
-            finally:
-                file.close()
-
-        response = StreamingResponse(file_iterator(), media_type="application/pdf")
-        if not preview:
-            response.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
-        return response
-
-    # 其他类型直接用 FileResponse 返回
-    return FileResponse(local_path)
+    # uploads 下的文件可交给 nginx 发送（X-Accel-Redirect）；客户端直接使用 signed_url 时连这里的查询也省去
+    if media.url.startswith("/uploads/"):
+        return await media_signer.serve(request, local_path, media_type=media_type, download_name=download_name)
+    disposition = "attachment" if download_name else "inline"
+    return await file_response(request, local_path, media_type, download_name, disposition=disposition)
 
 @router.get("/images/{filename}")
-async def get_image_compat(filename: str, db: Annotated[AsyncSession, Depends(get_db)]):
-    return await get_media(MediaType.image, filename,  db,True)
+async def get_image_compat(request: Request, filename: str, db: Annotated[AsyncSession, Depends(get_db)]):
+    return await get_media(request, MediaType.image, filename,  db,True)
 
 @router.get("/videos/{filename}")
-async def get_video_compat(filename: str, db: Annotated[AsyncSession, Depends(get_db)]):
-    return await get_media(MediaType.video, filename,  db,True)
+async def get_video_compat(request: Request, filename: str, db: Annotated[AsyncSession, Depends(get_db)]):
+    return await get_media(request, MediaType.video, filename,  db,True)
 
 @router.get("/pdfs/{filename}")
-async def get_pdf_compat(filename: str, db: Annotated[AsyncSession, Depends(get_db)],preview: bool = Query(True)):
-    return await get_media(MediaType.pdf, filename,  db,preview)
+async def get_pdf_compat(request: Request, filename: str, db: Annotated[AsyncSession, Depends(get_db)],preview: bool = Query(True)):
+    return await get_media(request, MediaType.pdf, filename,  db,preview)
 
 
 
@@ -241,8 +260,12 @@ async def create_comment(
     )
     
     db.add(db_comment)
+    await db.flush()
+    await refresh_comment_counts(db, [article_id])
     await db.commit()
     await db.refresh(db_comment)
+    await article_cache.invalidate_article(article_id)
+    await trending.record_comment(article_id)
     
     # 发送评论通知邮件给文章作者
     if article.author_id != current_user.id and article.author:
@@ -269,26 +292,61 @@ async def create_comment(
     )
 
 
-@router.get("/{article_id}/comments", response_model=List[CommentResponse])
+@router.get("/{article_id}/comments", response_model=Union[List[CommentResponse], CursorPage[CommentResponse]])
 async def get_article_comments(
     article_id: int,
     db: Annotated[AsyncSession, Depends(get_db)],
     skip: int = 0,
-    limit: int = 50
+    limit: int = 50,
+    cursor: Optional[str] = Query(None, description="游标（第一页传空字符串），传入时返回 {items, next_cursor}")
 ):
     """获取文章评论"""
-    result = await db.execute(
-        select(Comment).options(
-            selectinload(Comment.author),
-            selectinload(Comment.replies)
-        ).where(Comment.article_id == article_id)
-        .order_by(Comment.created_at.desc())
-        .offset(skip)
-        .limit(limit)
-    )
+    query = select(Comment).options(
+        selectinload(Comment.author),
+        selectinload(Comment.replies)
+    ).where(Comment.article_id == article_id)
+    if cursor is not None:
+        query = apply_keyset(query, Comment.created_at, Comment.id, cursor, limit)
+    else:
+        query = query.order_by(Comment.created_at.desc()).offset(skip).limit(limit)
+    result = await db.execute(query)
     comments = result.scalars().all()
     
-    return [CommentResponse.from_orm(comment) for comment in comments]
+    items = [CommentResponse.from_orm(comment) for comment in comments]
+    if cursor is not None:
+        return build_page(items, limit)
+    return items
+
+
+@router.get("/{article_id}/comments/tree", response_model=CursorPage[CommentTreeNode])
+async def get_article_comment_tree(
+    article_id: int,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    limit: int = Query(20, ge=1, le=100, description="每页根评论数"),
+    depth: int = Query(3, ge=1, le=10, description="展开层数（含根评论）"),
+    replies_limit: int = Query(3, ge=0, le=50, description="每条评论最多展开的回复数"),
+    parent_id: Optional[int] = Query(None, description="加载某条评论的更多回复时传入"),
+    cursor: Optional[str] = Query(None, description="顶层评论 / 回复的翻页游标（节点的 replies_cursor）")
+):
+    """获取评论树（一条递归 CTE）"""
+    return await fetch_comment_tree(
+        db, article_id,
+        parent_id=parent_id, cursor=cursor, limit=limit,
+        depth=depth, replies_limit=replies_limit,
+    )
+
+
+@router.get("/{article_id}/related", response_model=List[RelatedArticle])
+async def get_related_articles(
+    article_id: int,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    limit: int = Query(5, ge=1, le=settings.related_top_k)
+):
+    """相关文章（由 update_related_articles 定时任务预先计算）"""
+    items = await related_articles.fetch(db, article_id, limit)
+    if not items and (await db.scalar(select(Article.id).where(Article.id == article_id))) is None:
+        raise NotFoundError("Article not found")
+    return json_response(items, headers={"Cache-Control": CACHE_RELATED})
 
 
 @router.delete("/{article_id}/comments/{comment_id}")
@@ -310,7 +368,9 @@ async def delete_comment(
     
     # 删除评论
     await db.execute(delete(Comment).where(Comment.id == comment_id))
+    await refresh_comment_counts(db, [comment.article_id])
     await db.commit()
+    await article_cache.invalidate_article(comment.article_id)
     
     return {"message": "Comment deleted successfully"}
 
@@ -322,44 +382,26 @@ async def create_article(
     db: Annotated[AsyncSession, Depends(get_db)]
 ):
     """创建文章"""
-    # 检查是否包含LaTeX内容（用于标记，但不进行服务端渲染）
-    has_latex = False
-    latex_content = None
-    
-    
-    # 创建文章（直接使用原始内容，不进行LaTeX处理）
+    # 创建文章：Markdown / LaTeX 在进程池中预渲染，has_latex / latex_content 由内容识别
     db_article = Article(
         title=article_data.title,
-        content=article_data.content,  # 直接使用原始内容
+        content=article_data.content,
         summary=article_data.summary,
         status=article_data.status,
         author_id=current_user.id,
-        has_latex=has_latex,
-        latex_content=latex_content
     )
+    await article_renderer.apply(db_article)
     
     db.add(db_article)
-    await db.commit()
-    await db.refresh(db_article)
+    await db.flush()
     
-    # 处理标签
+    # 处理标签（与文章写入同一事务）
     if article_data.tags:
-        for tag_name in article_data.tags:
-            # 查找或创建标签
-            result = await db.execute(select(Tag).where(Tag.name == tag_name))
-            tag = result.scalar_one_or_none()
-            
-            if not tag:
-                tag = Tag(name=tag_name)
-                db.add(tag)
-                await db.commit()
-                await db.refresh(tag)
-            
-            # 创建文章标签关联
-            article_tag = ArticleTag(article_id=db_article.id, tag_id=tag.id)
-            db.add(article_tag)
-        
-        await db.commit()
+        await sync_article_tags(db, db_article.id, article_data.tags)
+    
+    await db.commit()
+    await article_cache.invalidate_lists()
+    await site_feeds.invalidate()
     
     # 重新加载文章及其标签
     result = await db.execute(
@@ -390,21 +432,42 @@ async def create_article(
     )
 
 
-@router.get("/", response_model=List[ArticleListResponse])
+@router.get("/", response_model=Union[List[ArticleListResponse], CursorPage[ArticleListResponse]])
 async def list_articles(
+    request: Request,
     db: Annotated[AsyncSession, Depends(get_db)],
     skip: int = 0,
     limit: int = 10,
     status: Optional[ArticleStatus] = None,
     tag: Optional[str] = None,
     search: Optional[str] = None,
-    author: Optional[str] = None
+    author: Optional[str] = None,
+    cursor: Optional[str] = Query(None, description="游标（第一页传空字符串），传入时返回 {items, next_cursor}")
 ):
     """获取文章列表"""
+    # 条件请求：ETag 由列表缓存 key（含列表代数）和缓存内容的哈希组成，缓存命中和 304 都不查库；
+    # 浏览量在返回前叠加，不参与校验（弱 ETag）
+    cache_key = await article_cache.list_key(
+        skip=skip, limit=limit, status=status, tag=tag, search=search, author=author,
+        cursor=cursor if cursor is None else f"c:{cursor}"
+    )
+    hit = await article_cache.get_models_digest(cache_key, ArticleListResponse)
+    if hit is not None:
+        cached, digest = hit
+        etag = make_etag("articles", cache_key, digest, weak=True)
+        if is_not_modified(request, etag):
+            return not_modified(etag, CACHE_ARTICLE_LIST)
+        headers = validator_headers(etag, CACHE_ARTICLE_LIST)
+        pending_views = await view_counter.pending_many(a.id for a in cached)
+        for item in cached:
+            item.view_count += pending_views.get(item.id, 0)
+        return json_response(build_page(cached, limit) if cursor is not None else cached, headers=headers)
+
     query = select(Article).options(
+        defer(Article.content),
+        defer(Article.latex_content),
         selectinload(Article.author),
-        selectinload(Article.tags).selectinload(ArticleTag.tag),
-        selectinload(Article.comments)
+        selectinload(Article.tags).selectinload(ArticleTag.tag)
     )
     
     # 过滤条件
@@ -424,47 +487,211 @@ async def list_articles(
         query = query.join(User).where(User.username == author)
     
     # 排序和分页
-    query = query.order_by(Article.created_at.desc()).offset(skip).limit(limit)
+    if cursor is not None:
+        query = apply_keyset(query, Article.created_at, Article.id, cursor, limit)
+    else:
+        query = query.order_by(Article.created_at.desc()).offset(skip).limit(limit)
     
     result = await db.execute(query)
     articles = result.scalars().all()
     
-    # 手动构建响应，避免ORM序列化问题
+    # 整页一次批量校验，避免逐行 model_validate
+    article_responses = article_list_items(articles)
+    
+    # 缓存中保存已落库的浏览量，返回前再叠加缓冲中的增量
+    digest = await article_cache.set_models(cache_key, article_responses, ArticleListResponse)
+    etag = make_etag("articles", cache_key, digest, weak=True)
+    if is_not_modified(request, etag):
+        return not_modified(etag, CACHE_ARTICLE_LIST)
+    headers = validator_headers(etag, CACHE_ARTICLE_LIST)
+    pending_views = await view_counter.pending_many(a.id for a in article_responses)
+    for item in article_responses:
+        item.view_count += pending_views.get(item.id, 0)
+    if cursor is not None:
+        return json_response(build_page(article_responses, limit), headers=headers)
+    return json_response(article_responses, headers=headers)
+
+
+@router.get("/export")
+async def export_articles(
+    current_user: Annotated[User, Depends(require_admin)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+    status: Optional[ArticleStatus] = Query(None, description="只导出指定状态的文章")
+):
+    """流式导出文章 / 标签 / 评论（NDJSON，仅管理员）"""
+    filename = f"articles-{datetime.now().strftime('%Y%m%d%H%M%S')}.ndjson"
+    return StreamingResponse(
+        export_ndjson(db, status=status),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@router.post("/import", response_model=dict)
+async def import_articles(
+    current_user: Annotated[User, Depends(require_admin)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+    file: UploadFile = File(..., description="export 导出的 NDJSON 文件"),
+    batch_size: int = Query(500, ge=1, le=10000, description="每个事务导入的文章数")
+):
+    """批量导入 NDJSON（仅管理员），找不到作者时归到当前管理员名下"""
+    stats = await import_ndjson(db, iter_upload_lines(file), current_user.id, batch_size=batch_size)
+    await article_cache.invalidate_lists()
+    await site_feeds.invalidate()
+    return {"message": "Import completed", **stats}
+
+
+# 稀疏字段集：字段组 -> 需要加载的列
+BATCH_MAX_IDS = 100
+BATCH_FIELD_COLUMNS: Dict[str, Tuple[QueryableAttribute[Any], ...]] = {
+    "title": (Article.title,),
+    "summary": (Article.summary,),
+    "status": (Article.status,),
+    "author": (Article.author_id,),
+    "tags": (),
+    "counts": (Article.view_count, Article.comment_count),
+    "dates": (Article.created_at, Article.updated_at),
+    "content": (Article.content,),
+}
+BATCH_DEFAULT_FIELDS = ("title", "summary", "status", "author", "tags", "counts", "dates")
+
+
+def _parse_csv(raw: str) -> List[str]:
+    return [part.strip() for part in raw.split(",") if part.strip()]
+
+
+@router.get(
+    "/batch",
+    response_model=ArticleBatchResponse,
+    response_model_exclude_unset=True
+)
+async def get_articles_batch(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    ids: str = Query(..., description=f"逗号分隔的文章ID，最多 {BATCH_MAX_IDS} 个，按传入顺序返回"),
+    fields: Optional[str] = Query(
+        None, description="逗号分隔的字段组：title,summary,status,author,tags,counts,dates,content；默认不含 content"
+    )
+):
+    """批量获取文章（一条查询，不计浏览量）"""
+    try:
+        requested_ids = list(dict.fromkeys(int(part) for part in _parse_csv(ids)))
+    except ValueError:
+        raise ValidationError("ids must be comma separated integers")
+    if not requested_ids:
+        raise ValidationError("ids is required")
+    if len(requested_ids) > BATCH_MAX_IDS:
+        raise ValidationError(f"At most {BATCH_MAX_IDS} ids per request")
+
+    field_groups = set(_parse_csv(fields)) if fields else set(BATCH_DEFAULT_FIELDS)
+    unknown = field_groups - BATCH_FIELD_COLUMNS.keys()
+    if unknown:
+        raise ValidationError(f"Unknown fields: {', '.join(sorted(unknown))}")
+
+    columns: List[QueryableAttribute[Any]] = [Article.id] + [col for group in field_groups for col in BATCH_FIELD_COLUMNS[group]]
+    options = [load_only(*columns)]
+    # 作者 / 标签用 JOIN 预加载，整个批次只有一条 SQL
+    if "author" in field_groups:
+        options.append(joinedload(Article.author))
+    if "tags" in field_groups:
+        options.append(joinedload(Article.tags).joinedload(ArticleTag.tag))
+    result = await db.execute(
+        select(Article).options(*options).where(Article.id.in_(requested_ids))
+    )
+    articles = {article.id: article for article in result.unique().scalars().all()}
+
+    pending_views = {}
+    if "counts" in field_groups:
+        pending_views = await view_counter.pending_many(articles.keys())
+
     from app.schemas.article import UserBasicInfo, TagInfo
-    article_responses = []
-    
-    for article in articles:
-        author_info = UserBasicInfo.model_validate(article.author)
-        tag_infos = [TagInfo.model_validate(at.tag) for at in article.tags if at.tag is not None]
-        
-        article_response = ArticleListResponse(
-            id=article.id,
-            title=article.title,
-            summary=article.summary,
-            status=article.status,
-            author=author_info,
-            tags=tag_infos,
-            created_at=article.created_at,
-            updated_at=article.updated_at,
-            view_count=getattr(article, 'view_count', 0),
-            comment_count=len(article.comments)
-        )
-        article_responses.append(article_response)
-    
-    return article_responses
+    items = []
+    for article_id in requested_ids:
+        article = articles.get(article_id)
+        if article is None:
+            continue
+        # 只放入请求的字段组，配合 response_model_exclude_unset 输出稀疏字段集
+        data: Dict[str, Any] = {"id": article.id}
+        if "title" in field_groups:
+            data["title"] = article.title
+        if "summary" in field_groups:
+            data["summary"] = article.summary
+        if "status" in field_groups:
+            data["status"] = article.status
+        if "author" in field_groups:
+            data["author"] = UserBasicInfo.model_validate(article.author)
+        if "tags" in field_groups:
+            data["tags"] = [TagInfo.model_validate(at.tag) for at in article.tags if at.tag is not None]
+        if "counts" in field_groups:
+            data["view_count"] = (article.view_count or 0) + pending_views.get(article.id, 0)
+            data["comment_count"] = article.comment_count or 0
+        if "dates" in field_groups:
+            data["created_at"] = article.created_at
+            data["updated_at"] = article.updated_at
+        if "content" in field_groups:
+            data["content"] = article.content
+        items.append(ArticleBatchItem(**data))
+
+    return ArticleBatchResponse(
+        items=items,
+        missing=[article_id for article_id in requested_ids if article_id not in articles]
+    )
+
+
+@router.get("/trending", response_model=TrendingResponse)
+async def get_trending_articles(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    window: Literal["day", "week"] = Query("day", description="榜单窗口：day 日榜，week 周榜"),
+    limit: int = Query(10, ge=1, le=50)
+):
+    """热门文章榜（浏览 / 评论 / 打赏按时间衰减计分）"""
+    board = await trending.fetch(db, window, limit)
+    pending_views = await view_counter.pending_many(item.id for item in board.items)
+    for item in board.items:
+        item.view_count += pending_views.get(item.id, 0)
+    return json_response(board, headers={"Cache-Control": CACHE_TRENDING})
 
 
 @router.get("/{article_id}", response_model=ArticleDetailResponse)
 async def get_article(
     article_id: int,
-    db: Annotated[AsyncSession, Depends(get_db)]
+    request: Request,
+    response: Response,
+    background_tasks: BackgroundTasks,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    format: Literal["markdown", "html"] = Query("markdown", description="markdown：返回原文；html：返回预渲染的 content_html，content 置空")
 ):
     """获取文章详情"""
+    # 访问时自增view_count：只写入缓冲，由定时任务批量落库，详情读取保持只读事务
+    gen = await article_cache.article_generation(article_id)
+    cache_key = article_cache.detail_key_for(article_id, gen)
+    cached = await article_cache.get_model(cache_key, ArticleDetailResponse)
+    if cached is not None:
+        await _record_view(article_id)
+        etag = _detail_etag(article_id, gen, cached.updated_at, cached.comment_count, format)
+        if is_not_modified(request, etag, cached.updated_at):
+            return not_modified(etag, CACHE_ARTICLE_DETAIL, cached.updated_at)
+        set_validators(response, etag, CACHE_ARTICLE_DETAIL, cached.updated_at)
+        cached.view_count += await view_counter.pending(article_id)
+        return _detail_for_format(cached, format)
+
+    # 缓存未命中：先用元数据判断 304，避免加载作者 / 标签
+    meta = (await db.execute(
+        select(Article.updated_at, Article.comment_count).where(Article.id == article_id)
+    )).one_or_none()
+    if meta is None:
+        raise NotFoundError("Article not found")
+    etag = _detail_etag(article_id, gen, meta.updated_at, meta.comment_count, format)
+    if is_not_modified(request, etag, meta.updated_at):
+        await _record_view(article_id)
+        return not_modified(etag, CACHE_ARTICLE_DETAIL, meta.updated_at)
+    set_validators(response, etag, CACHE_ARTICLE_DETAIL, meta.updated_at)
+
     result = await db.execute(
         select(Article).options(
+            undefer(Article.content_html),
+            undefer(Article.content_toc),
             selectinload(Article.author),
-            selectinload(Article.tags).selectinload(ArticleTag.tag),
-            selectinload(Article.comments).selectinload(Comment.author)
+            selectinload(Article.tags).selectinload(ArticleTag.tag)
         ).where(Article.id == article_id)
     )
     article = result.scalar_one_or_none()
@@ -472,42 +699,58 @@ async def get_article(
     if not article:
         raise NotFoundError("Article not found")
     
-    # 访问时自增view_count
-    article.view_count = (article.view_count or 0) + 1
-    await db.commit()
-    await db.refresh(article)
+    await _record_view(article.id)
+    
+    # 历史文章 / 渲染版本升级：在后台补渲染，本次先返回已存储的结果（读路径不写库）
+    if article_renderer.is_stale(article):
+        background_tasks.add_task(article_renderer.refresh, article.id)
     
     # 手动构建响应，避免ORM序列化问题
-    from app.schemas.article import UserBasicInfo, TagInfo, CommentBasicInfo
+    from app.schemas.article import UserBasicInfo, TagInfo
     author_info = UserBasicInfo.model_validate(article.author)
     tag_infos = [TagInfo.model_validate(at.tag) for at in article.tags if at.tag is not None]
     
-    # 处理评论
-    comment_infos = []
-    for comment in article.comments:
-        comment_author = UserBasicInfo.model_validate(comment.author)
-        comment_info = CommentBasicInfo(
-            id=comment.id,
-            content=comment.content,
-            author=comment_author,
-            created_at=comment.created_at,
-            parent_id=comment.parent_id
-        )
-        comment_infos.append(comment_info)
-    
-    return ArticleDetailResponse(
+    # 评论不再随详情下发，由 /{article_id}/comments/tree 分页加载
+    detail = ArticleDetailResponse(
         id=article.id,
         title=article.title,
         content=article.content,
+        content_html=article.content_html,
+        toc=article.content_toc or [],
+        has_latex=article.has_latex,
         summary=article.summary,
         status=article.status,
         author=author_info,
         tags=tag_infos,
-        comments=comment_infos,
+        comment_count=article.comment_count,
         created_at=article.created_at,
         updated_at=article.updated_at,
-        view_count=getattr(article, 'view_count', 0)
+        view_count=article.view_count or 0
     )
+    await article_cache.set_model(cache_key, detail)
+    detail.view_count += await view_counter.pending(article.id)
+    return _detail_for_format(detail, format)
+
+
+async def _record_view(article_id: int):
+    """一次浏览：写入浏览量缓冲并计入热门榜单"""
+    await view_counter.incr(article_id)
+    await trending.record_view(article_id)
+
+
+def _detail_etag(article_id: int, gen: Optional[str], updated_at: datetime, comment_count: int, format: str) -> str:
+    """
+    详情校验器：缓存代数（写路径 INCR）+ updated_at + 评论数；
+    Redis 不可用时只依赖后两者。浏览量不参与校验，因此使用弱 ETag
+    """
+    return make_etag("article", article_id, gen, updated_at.isoformat(), comment_count, format, weak=True)
+
+
+def _detail_for_format(detail: ArticleDetailResponse, format: str) -> ArticleDetailResponse:
+    """缓存中同时保存原文和 HTML，按 format 只返回其中一份；尚未预渲染（后台渲染中）时保留原文"""
+    if format == "html" and detail.content_html is not None:
+        return detail.model_copy(update={"content": ""})
+    return detail.model_copy(update={"content_html": None})
 
 
 @router.put("/{article_id}", response_model=ArticleResponse)
@@ -531,6 +774,15 @@ async def update_article(
     # 只提取 Article 表字段
     update_data = article_data.dict(exclude_unset=True, exclude={"tags"})
     
+    # 内容变化时重新预渲染（内容哈希不变则跳过）
+    if update_data.get("content") is not None:
+        rendered = await article_renderer.rendered_fields(update_data["content"], article.content_hash)
+        if rendered is not None:
+            update_data.update(rendered)
+        else:
+            # 内容未变，LaTeX 标记沿用渲染结果
+            update_data.pop("has_latex", None)
+            update_data.pop("latex_content", None)
     
     # 更新文章
     await db.execute(
@@ -539,26 +791,13 @@ async def update_article(
         .values(**update_data)
     )
     
-    # 更新标签
+    # 更新标签：按差异增删关联
     if article_data.tags is not None:
-        # 删除现有标签关联
-        await db.execute(delete(ArticleTag).where(ArticleTag.article_id == article_id))
-        
-        # 添加新标签
-        for tag_name in article_data.tags:
-            result = await db.execute(select(Tag).where(Tag.name == tag_name))
-            tag = result.scalar_one_or_none()
-            
-            if not tag:
-                tag = Tag(name=tag_name)
-                db.add(tag)
-                await db.commit()
-                await db.refresh(tag)
-            
-            article_tag = ArticleTag(article_id=article_id, tag_id=tag.id)
-            db.add(article_tag)
+        await sync_article_tags(db, article_id, article_data.tags)
     
     await db.commit()
+    await article_cache.invalidate_article(article_id)
+    await site_feeds.invalidate()
     
     # 返回更新后的文章
     result = await db.execute(
@@ -607,36 +846,90 @@ async def delete_article(
     # 删除文章标签关联
     await db.execute(delete(ArticleTag).where(ArticleTag.article_id == article_id))
     
+    await related_articles.forget(db, article_id)
+    
     # 删除文章
     await db.execute(delete(Article).where(Article.id == article_id))
     await db.commit()
+    await article_cache.invalidate_article(article_id)
+    await trending.remove(article_id)
+    await site_feeds.invalidate()
     
     return {"message": "Article deleted successfully"}
 
-@router.get("/media/list", response_model=List[dict])
-async def list_media_files(db: Annotated[AsyncSession, Depends(get_db)],uploader_id: int = Query(None)):
-    from app.models.media import MediaFile
-    from sqlalchemy import select
-    query = select(MediaFile).options(selectinload(MediaFile.uploader))
+def _media_item(f: MediaFile) -> Dict[str, Any]:
+    return {
+        "id": f.id,
+        "filename": f.filename,
+        "type": f.type,
+        "size": f.size,
+        "upload_time": f.upload_time.timestamp() if hasattr(f.upload_time, 'timestamp') else f.upload_time,
+        "url": f.url,
+        "signed_url": media_signer.sign(f.url),
+        # 列表预览使用最小档位的缩略图
+        "thumbnail_url": (
+            media_signer.sign(f.url, width=min(settings.media_image_widths))
+            if f.type == MediaType.image and f.url.startswith("/uploads/") else None
+        ),
+        "uploader_id": f.uploader_id,
+        "uploader_username": f.uploader.username if f.uploader else None,
+        "uploader_role": f.uploader.role if f.uploader else None,
+    }
+
+
+@router.get("/media/list", response_model=Union[List[MediaFileItem], MediaPage])
+async def list_media_files(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    uploader_id: Optional[int] = Query(None),
+    file_type: Optional[MediaType] = Query(None, alias="type", description="文件类型"),
+    filename_prefix: Optional[str] = Query(None, min_length=1, description="文件名前缀"),
+    uploaded_after: Optional[datetime] = Query(None, description="上传时间下限（含）"),
+    uploaded_before: Optional[datetime] = Query(None, description="上传时间上限（不含）"),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="游标（第一页传空字符串），传入时返回 {items, next_cursor, totals}"),
+    full: bool = Query(False, description="不传 cursor 时返回完整列表（最多 MEDIA_LIST_MAX 条）")
+):
+    """
+    媒体库列表（按上传时间倒序，过滤条件都在数据库中执行）
+
+    不传 cursor 时保持原有的列表响应，只返回最新的 limit 条，full=true 时最多返回 media_list_max 条；
+    传 cursor 时按 (upload_time, id) 游标分页，第一页附带按类型分组的文件数 / 字节数汇总（一条 GROUP BY 查询）
+    """
+    conditions = []
     if uploader_id is not None:
-        query = query.where(MediaFile.uploader_id == uploader_id)
-    result = await db.execute(query)
+        conditions.append(MediaFile.uploader_id == uploader_id)
+    if file_type is not None:
+        conditions.append(MediaFile.type == file_type)
+    if filename_prefix:
+        conditions.append(MediaFile.filename.startswith(filename_prefix, autoescape=True))
+    if uploaded_after is not None:
+        conditions.append(MediaFile.upload_time >= timestamp_param(uploaded_after))
+    if uploaded_before is not None:
+        conditions.append(MediaFile.upload_time < timestamp_param(uploaded_before))
+
+    query = select(MediaFile).options(selectinload(MediaFile.uploader)).where(*conditions)
+    if cursor is None:
+        result = await db.execute(
+            query.order_by(MediaFile.upload_time.desc(), MediaFile.id.desc())
+            .limit(settings.media_list_max if full else limit)
+        )
+        return json_response([_media_item(f) for f in result.scalars().all()])
+
+    result = await db.execute(apply_keyset(query, MediaFile.upload_time, MediaFile.id, cursor, limit))
     files = result.scalars().all()
-    media_files = []
-    for f in files:
-        media_files.append({
-            "id": f.id,
-            "filename": f.filename,
-            "type": f.type,
-            "size": f.size,
-            "upload_time": f.upload_time.timestamp() if hasattr(f.upload_time, 'timestamp') else f.upload_time,
-            "url": f.url,
-            "uploader_id": f.uploader_id,
-            "uploader_username": f.uploader.username if f.uploader else None,
-            "uploader_role": f.uploader.role if f.uploader else None,
-        })
-    media_files.sort(key=lambda x: x["upload_time"], reverse=True)
-    return JSONResponse(content=media_files)
+    page = build_page(files, limit, key=lambda f: (f.upload_time, f.id))
+
+    totals: Optional[List[MediaTypeTotal]] = None
+    if not cursor:
+        grouped = await db.execute(
+            select(MediaFile.type, func.count(MediaFile.id), func.coalesce(func.sum(MediaFile.size), 0))
+            .where(*conditions)
+            .group_by(MediaFile.type)
+        )
+        totals = [MediaTypeTotal(type=t, count=count, bytes=size) for t, count, size in grouped.all()]
+    return json_response(MediaPage(
+        items=[MediaFileItem(**_media_item(f)) for f in page.items], next_cursor=page.next_cursor, totals=totals
+    ))
 
 
 @router.delete("/media/{media_id}", response_model=dict)
@@ -648,13 +941,24 @@ async def delete_media_file(
     media = await db.get(MediaFile, media_id)
     if not media:
         raise HTTPException(status_code=404, detail="文件不存在")
-    # 删除文件本体
+
+    if media.blob_sha256:
+        # 内容寻址文件：只减引用计数，归零后由 collect 删除文件本体
+        blob_sha256 = media.blob_sha256
+        await media_store.release(db, [blob_sha256])
+        await db.delete(media)
+        await db.commit()
+        await media_store.collect(db, [blob_sha256])
+        return {"message": "删除成功"}
+
+    # 旧文件：删除文件本体和衍生版本
     # 只删除本地文件，url 需转为本地路径
     file_path = get_file_path_from_url(media.url)
     try:
         await delete_file(file_path, current_user.id, owner_id=media.uploader_id, admin_override=current_user.is_admin)
     except Exception as e:
         print(f"⚠️ 删除物理文件失败: {media.filename} -> {e}")
+    await image_variants.purge(db, [media.url])
     await db.delete(media)
     await db.commit()
     return {"message": "删除成功"} 
\ No newline at end of file
@@ -1,15 +1,17 @@
 from datetime import datetime, timedelta, timezone
-from typing import List, Optional
+from typing import List, Optional, Union
 from decimal import Decimal
 import json
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, status, BackgroundTasks, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, status, BackgroundTasks, Request
 from sqlmodel import select, func
 from sqlalchemy import and_
+from sqlalchemy.ext.asyncio import AsyncSession
 from alipay import AliPay
 
 from app.core.database import async_session
 from app.core.security import get_current_user, require_admin
 from app.models.user import User, UserRole
+from app.models.article import Article
 from app.models.donation import (
     DonationConfig, DonationRecord, DonationGoal,
     DonationStatus, PaymentMethod
@@ -20,11 +22,14 @@ from app.schemas.donation import (
     DonationStats
 
 )
+from app.schemas.pagination import CursorPage
 from app.core.email import email_service
 from app.core.config import settings
+from app.core.pagination import apply_keyset, build_page
 from app.core.exceptions import BlogException
 from app.core.wechat_pay import wechat_pay_v3
 from app.core.paypal import paypal_pay
+from app.core.trending import trending
 
 router = APIRouter(prefix="/donation", tags=["捐赠"])
 
@@ -104,6 +109,16 @@ async def create_donation(
                 detail=f"{donation_data.payment_method} 支付方式未启用"
             )
         
+        if donation_data.article_id is not None:
+            article_exists = await session.scalar(
+                select(Article.id).where(Article.id == donation_data.article_id)
+            )
+            if article_exists is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="打赏的文章不存在"
+                )
+        
         # 创建捐赠记录
         donation = DonationRecord(
             donor_name=donation_data.donor_name,
@@ -114,7 +129,8 @@ async def create_donation(
             currency=donation_data.currency,
             payment_method=donation_data.payment_method,
             user_id=user.id if user else None,
-            goal_id=getattr(donation_data, 'goal_id', None)
+            goal_id=getattr(donation_data, 'goal_id', None),
+            article_id=donation_data.article_id
         )
         
         session.add(donation)
@@ -206,11 +222,12 @@ async def create_donation(
         return donation_dict
 
 
-@router.get("/records", response_model=List[DonationRecordOut])
+@router.get("/records", response_model=Union[List[DonationRecordOut], CursorPage[DonationRecordOut]])
 async def get_donation_records(
     skip: int = 0,
     limit: int = 20,
     status_filter: Optional[DonationStatus] = None,
+    cursor: Optional[str] = Query(None, description="游标（第一页传空字符串），传入时返回 {items, next_cursor}"),
     current_user: User = Depends(require_admin)
 ):
     """获取捐赠记录列表（仅管理员）"""
@@ -220,12 +237,17 @@ async def get_donation_records(
         if status_filter:
             query = query.where(DonationRecord.payment_status == status_filter)
         
-        query = query.order_by(DonationRecord.created_at.desc())
-        query = query.offset(skip).limit(limit)
+        if cursor is not None:
+            query = apply_keyset(query, DonationRecord.created_at, DonationRecord.id, cursor, limit)
+        else:
+            query = query.order_by(DonationRecord.created_at.desc())
+            query = query.offset(skip).limit(limit)
         
         result = await session.execute(query)
         donations = result.scalars().all()
         
+        if cursor is not None:
+            return build_page([DonationRecordOut.model_validate(d) for d in donations], limit)
         return donations
 
 
@@ -263,14 +285,21 @@ async def update_donation_status(
                 detail="捐赠记录不存在"
             )
         
-        # 更新状态
-        donation.payment_status = status
+        if status == DonationStatus.SUCCESS and is_donation_paid(donation):
+            # 已确认支付的记录重复保存：不再发送邮件、累加目标金额或计入热门榜单
+            if transaction_id:
+                donation.transaction_id = transaction_id
+            donation.updated_at = datetime.now(timezone.utc)
+            await session.commit()
+            return {"message": "状态更新成功"}
+        
+        # 更新状态（SUCCESS 由 mark_donation_paid 写入）
+        if status != DonationStatus.SUCCESS:
+            donation.payment_status = status
         if transaction_id:
             donation.transaction_id = transaction_id
         
         if status == DonationStatus.SUCCESS:
-            donation.paid_at = datetime.now(timezone.utc)
-            
             # 发送确认邮件
             if donation.donor_email and settings.email_enabled:
                 background_tasks.add_task(
@@ -303,7 +332,10 @@ async def update_donation_status(
                     goal.is_completed = True
         
         donation.updated_at = datetime.now(timezone.utc)
-        await session.commit()
+        if status == DonationStatus.SUCCESS:
+            await mark_donation_paid(session, donation, paid_at=datetime.now(timezone.utc))
+        else:
+            await session.commit()
         await session.refresh(donation)
         
         return {"message": "状态更新成功"}
@@ -523,12 +555,7 @@ async def wechat_callback(request: Request):
                     )
                     donation = donation_result.scalar_one_or_none()
                     
-                    if donation:
-                        donation.payment_status = DonationStatus.SUCCESS
-                        donation.transaction_id = result.get("transaction_id")
-                        donation.paid_at = datetime.now(timezone.utc)
-                        donation.updated_at = datetime.now(timezone.utc)
-                        
+                    if donation and not is_donation_paid(donation):
                         # 优先累加到 donation.goal_id 指定目标
                         goal = None
                         if donation.goal_id:
@@ -549,7 +576,12 @@ async def wechat_callback(request: Request):
                             if goal.current_amount >= goal.target_amount:
                                 goal.is_completed = True
                         
-                        await session.commit()
+                        donation.updated_at = datetime.now(timezone.utc)
+                        await mark_donation_paid(
+                            session, donation,
+                            transaction_id=result.get("transaction_id"),
+                            paid_at=datetime.now(timezone.utc)
+                        )
                         
                         # 发送确认邮件
                         if donation.donor_email and settings.email_enabled:
@@ -602,12 +634,7 @@ async def paypal_callback(request: Request):
                             )
                             donation = donation_result.scalar_one_or_none()
                             
-                            if donation:
-                                donation.payment_status = DonationStatus.SUCCESS
-                                donation.transaction_id = capture_result.get("capture_id")
-                                donation.paid_at = datetime.now(timezone.utc)
-                                donation.updated_at = datetime.now(timezone.utc)
-                                
+                            if donation and not is_donation_paid(donation):
                                 # 优先累加到 donation.goal_id 指定目标
                                 goal = None
                                 if donation.goal_id:
@@ -628,7 +655,12 @@ async def paypal_callback(request: Request):
                                     if goal.current_amount >= goal.target_amount:
                                         goal.is_completed = True
                                 
-                                await session.commit()
+                                donation.updated_at = datetime.now(timezone.utc)
+                                await mark_donation_paid(
+                                    session, donation,
+                                    transaction_id=capture_result.get("capture_id"),
+                                    paid_at=datetime.now(timezone.utc)
+                                )
                                 
                                 # 发送确认邮件
                                 if donation.donor_email and settings.email_enabled:
@@ -655,6 +687,42 @@ async def paypal_callback(request: Request):
         return {"error": str(e)}
 
 
+# ==================== 支付确认 ====================
+
+# "PAID" 是旧版异步通知写入的状态，视同支付成功
+_PAID_STATUSES = (DonationStatus.SUCCESS.value, "PAID")
+
+
+def is_donation_paid(donation: DonationRecord) -> bool:
+    """已确认支付的记录不再重复处理（支付平台会重发通知）"""
+    return donation.payment_status in _PAID_STATUSES
+
+
+async def mark_donation_paid(
+    session: AsyncSession,
+    donation: DonationRecord,
+    payment_status: str = DonationStatus.SUCCESS,
+    transaction_id: Optional[str] = None,
+    paid_at: Optional[datetime] = None,
+) -> bool:
+    """
+    标记捐赠支付成功并提交，随后计入热门文章榜单；已确认支付的记录不做任何修改，返回 False
+
+    所有确认路径（管理员改状态、支付回调、异步通知）都通过这里，各自写入原有的状态值；
+    session 中的其他修改（目标金额）一起提交
+    """
+    if is_donation_paid(donation):
+        return False
+    donation.payment_status = payment_status
+    if transaction_id:
+        donation.transaction_id = transaction_id
+    if paid_at is not None:
+        donation.paid_at = paid_at
+    await session.commit()
+    await trending.record_donation(donation.article_id)
+    return True
+
+
 # ==================== 邮件发送 ====================
 
 async def send_donation_confirmation_email(
@@ -731,8 +799,7 @@ async def alipay_notify(request: Request):
         async with async_session() as session:
             result = await session.execute(select(DonationRecord).where(DonationRecord.transaction_id == out_trade_no))
             record = result.scalar_one_or_none()
-            if record and record.payment_status != "PAID":
-                record.payment_status = "PAID"
+            if record and not is_donation_paid(record):
                 gmt_payment_raw = data.get("gmt_payment")
                 if gmt_payment_raw:
                     if isinstance(gmt_payment_raw, UploadFile):
@@ -740,7 +807,7 @@ async def alipay_notify(request: Request):
                     else:
                         gmt_payment_str = str(gmt_payment_raw)
                     record.paid_at = datetime.strptime(gmt_payment_str, "%Y-%m-%d %H:%M:%S")
-                await session.commit()
+                await mark_donation_paid(session, record, payment_status="PAID")
         return "success"
     return "fail"
 
@@ -758,10 +825,9 @@ async def wechat_notify(request: Request):
         async with async_session() as session:
             result = await session.execute(select(DonationRecord).where(DonationRecord.transaction_id == out_trade_no))
             record = result.scalar_one_or_none()
-            if record and record.payment_status != "PAID":
-                record.payment_status = "PAID"
+            if record and not is_donation_paid(record):
                 record.paid_at = data.get("time_end")
-                await session.commit()
+                await mark_donation_paid(session, record, payment_status="PAID")
         return "<xml><return_code><![CDATA[SUCCESS]]></return_code><return_msg><![CDATA[OK]]></return_msg></xml>"
     return "<xml><return_code><![CDATA[FAIL]]></return_code><return_msg><![CDATA[支付失败]]></return_msg></xml>"
 
@@ -777,9 +843,8 @@ async def paypal_notify(request: Request):
         async with async_session() as session:
             result = await session.execute(select(DonationRecord).where(DonationRecord.transaction_id == invoice_id))
             record = result.scalar_one_or_none()
-            if record and record.payment_status != "PAID":
-                record.payment_status = "PAID"
+            if record and not is_donation_paid(record):
                 record.paid_at = data.get("resource", {}).get("update_time")
-                await session.commit()
+                await mark_donation_paid(session, record, payment_status="PAID")
         return {"status": "success"}
     return {"status": "fail"} 
\ No newline at end of file
@@ -0,0 +1,52 @@
+from fastapi import APIRouter, Request, Response
+
+from app.core.exceptions import NotFoundError
+from app.core.feeds import ATOM_MEDIA_TYPE, RSS_MEDIA_TYPE, SITEMAP_MEDIA_TYPE, site_feeds
+from app.core.http_cache import CACHE_FEED, accepts_gzip, is_not_modified, not_modified, validator_headers
+
+# 订阅源 / 站点地图挂在站点根路径（不带 /api/v1 前缀）
+router = APIRouter(tags=["feeds"])
+
+
+async def _serve(request: Request, name: str, media_type: str) -> Response:
+    """返回预生成的文档；客户端接受 gzip 时直接返回预压缩的字节"""
+    document = await site_feeds.document(name)
+    if document is None:
+        raise NotFoundError(f"{name} not found")
+    # 先选定表示，再用该表示的 ETag 做条件请求校验
+    gzipped = accepts_gzip(request)
+    etag = document.gzip_etag if gzipped else document.etag
+    if is_not_modified(request, etag, document.last_modified):
+        response = not_modified(etag, CACHE_FEED, document.last_modified)
+        response.headers["Vary"] = "Accept-Encoding"
+        return response
+    headers = validator_headers(etag, CACHE_FEED, document.last_modified)
+    headers["Vary"] = "Accept-Encoding"
+    if gzipped:
+        headers["Content-Encoding"] = "gzip"
+        return Response(document.gzipped, media_type=media_type, headers=headers)
+    return Response(document.body, media_type=media_type, headers=headers)
+
+
+@router.get("/feed.xml")
+async def rss_feed(request: Request):
+    """RSS 2.0 订阅源（最新发布的文章）"""
+    return await _serve(request, "feed.xml", RSS_MEDIA_TYPE)
+
+
+@router.get("/atom.xml")
+async def atom_feed(request: Request):
+    """Atom 订阅源"""
+    return await _serve(request, "atom.xml", ATOM_MEDIA_TYPE)
+
+
+@router.get("/sitemap.xml")
+async def sitemap(request: Request):
+    """站点地图；URL 超过 50000 个时为 sitemap 索引"""
+    return await _serve(request, "sitemap.xml", SITEMAP_MEDIA_TYPE)
+
+
+@router.get("/sitemap-{chunk}.xml")
+async def sitemap_chunk(chunk: int, request: Request):
+    """sitemap 索引下的分片"""
+    return await _serve(request, f"sitemap-{chunk}.xml", SITEMAP_MEDIA_TYPE)
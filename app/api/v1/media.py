@@ -0,0 +1,40 @@
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+
+from app.core.image_variants import image_variants
+from app.core.media_signing import media_signer
+
+# 签名媒体链接：签名即授权，不经过登录校验，也不查询数据库
+router = APIRouter(prefix="/media", tags=["media"])
+
+
+@router.get("/{path:path}")
+async def get_signed_media(
+    request: Request,
+    path: str,
+    sig: str = Query(...),
+    exp: int = Query(0),
+    dl: str = Query(""),
+    w: Optional[int] = Query(None, ge=1, description="图片宽度，取不小于该值的最近档位")
+) -> Response:
+    """校验签名后发送 uploads 下的文件（生产环境由 nginx X-Accel-Redirect 发送）"""
+    if not media_signer.verify(path, exp, sig, dl):
+        raise HTTPException(status_code=403, detail="Invalid or expired media signature")
+    local_path = media_signer.resolve(path)
+    if local_path is None:
+        raise HTTPException(status_code=404, detail="File not found")
+
+    if w is not None and image_variants.is_image(local_path):
+        # 缩放版本 + 按 Accept 选择格式；原图无法处理时回退到原图
+        fmt = image_variants.negotiate(request.headers.get("accept", ""), local_path)
+        variant = await image_variants.ensure(f"/uploads/{path}", local_path, image_variants.fit_width(w), fmt)
+        if variant is not None:
+            return await media_signer.serve(
+                request, variant, exp, media_type=f"image/{fmt}", download_name=dl or None, vary="Accept"
+            )
+
+    try:
+        return await media_signer.serve(request, local_path, exp, download_name=dl or None)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="File missing on disk")
@@ -1,47 +1,62 @@
-from typing import List, Optional, Annotated
-from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List, Optional, Annotated, Sequence, Union
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import text, select
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select
+from sqlalchemy.orm import defer, selectinload
 
 from app.core.database import get_db
 from app.core.search import FTSSearch
-from app.schemas.article import ArticleListResponse
+from app.core.search.index_state import INDEX_NAME, sync_search_index
+from app.core.exceptions import ValidationError
+from app.core.http_cache import CACHE_SEARCH, conditional_json
+from app.core.serialization import article_list_items
+from app.core.pagination import apply_keyset, build_page
+from app.schemas.article import ArticleListResponse, ArticleSearchResult
+from app.schemas.pagination import CursorPage
+from app.utils.segment import segment_query
 from app.models.article import ArticleStatus
+from app.models.search_index import SearchIndexState
 
 router = APIRouter(prefix="/search", tags=["search"])
 
 
-@router.get("/", response_model=List[ArticleListResponse])
+@router.get("/", response_model=Union[List[ArticleSearchResult], CursorPage[ArticleSearchResult]])
 async def search_articles(
+    request: Request,
     db: Annotated[AsyncSession, Depends(get_db)],
     q: Optional[str] = Query(None, description="搜索关键词"),
     tag: Optional[str] = Query(None, description="按标签搜索"),
     skip: int = Query(0, ge=0, description="跳过记录数"),
     limit: int = Query(10, ge=1, le=100, description="返回记录数"),
     status: Optional[ArticleStatus] = Query(None, description="文章状态过滤"),
-    author: Optional[str] = Query(None, description="作者用户名过滤")
+    author: Optional[str] = Query(None, description="作者用户名过滤"),
+    cursor: Optional[str] = Query(None, description="游标（第一页传空字符串），传入时按时间倒序返回 {items, next_cursor}")
 ):
     """全文搜索文章
     
     基于 SQLite FTS5 全文索引搜索文章标题和内容
+    结果按相关度排序（标题 > 摘要 > 正文，可选时间加成，见 SEARCH_WEIGHT_* / SEARCH_RECENCY_DAYS）并附带 score
     如果FTS索引不可用，则使用简单的LIKE搜索作为备选
     """
     """全文搜索 + 标签过滤"""
 
     try:
-        results = await get_articles_by_tag_or_not( db, q=q, skip=skip, limit=limit, status=status, author=author,tag=tag)
-        if results:
-            return results
-
-        # FTS 无结果，用 LIKE 回退
-        print(f"FTS搜索无结果，使用LIKE搜索备选方案")
-        return await search_articles_fallback(db, q, skip, limit, status, author,tag=tag)
-
+        results = await get_articles_by_tag_or_not( db, q=q, skip=skip, limit=limit, status=status, author=author,tag=tag, cursor=cursor)
+        if not results and not (q and segment_query(q)):
+            # 关键词无法走全文索引（如单个字母），用 LIKE 回退
+            print(f"关键词无法走全文索引，使用LIKE搜索备选方案")
+            results = await search_articles_fallback(db, q, skip, limit, status, author,tag=tag, cursor=cursor)
+
+    except ValidationError:
+        raise
     except Exception as e:
         print(f"FTS搜索失败，使用LIKE搜索备选方案: {e}")
         await db.rollback()
-        return await search_articles_fallback(db, q, skip, limit, status, author,tag=tag)
+        results = await search_articles_fallback(db, q, skip, limit, status, author,tag=tag, cursor=cursor)
+
+    if cursor is not None:
+        return conditional_json(request, build_page(results, limit), CACHE_SEARCH)
+    return conditional_json(request, results, CACHE_SEARCH)
 
 
 async def search_articles_fallback(
@@ -51,7 +66,8 @@ async def search_articles_fallback(
     limit: int = 10,
     status: Optional[ArticleStatus] = None,
     author: Optional[str] = None,
-    tag: Optional[str] = None
+    tag: Optional[str] = None,
+    cursor: Optional[str] = None
 ) -> List[ArticleListResponse]:
     """
     备选搜索方案：使用简单的LIKE搜索
@@ -61,7 +77,6 @@ async def search_articles_fallback(
     from app.models.article import Article
     from app.models.tag import ArticleTag, Tag
     from app.models.user import User
-    from app.schemas.article import UserBasicInfo, TagInfo
     print(f"🐱‍🏍🐱‍🏍🐱‍🏍🐱‍🏍{tag}")
     # ===== 第一步：根据 q 搜索文章 ID =====
     stmt_q = select(Article.id).where(
@@ -104,34 +119,22 @@ async def search_articles_fallback(
         select(Article)
         .where(Article.id.in_(article_ids))
         .options(
+            defer(Article.content),
+            defer(Article.latex_content),
             selectinload(Article.author),
-            selectinload(Article.tags).selectinload(ArticleTag.tag),
-            selectinload(Article.comments)
+            selectinload(Article.tags).selectinload(ArticleTag.tag)
         )
-        .order_by(Article.published_at.desc())
-        .offset(skip)
-        .limit(limit)
     )
+    if cursor is not None:
+        stmt_articles = apply_keyset(stmt_articles, Article.created_at, Article.id, cursor, limit)
+    else:
+        stmt_articles = stmt_articles.order_by(Article.published_at.desc()).offset(skip).limit(limit)
 
     result = await db.execute(stmt_articles)
     articles = result.scalars().all()
 
     # ===== 构建响应 =====
-    return [
-        ArticleListResponse(
-            id=a.id,
-            title=a.title,
-            summary=a.summary,
-            status=a.status,
-            author=UserBasicInfo.model_validate(a.author),
-            tags=[TagInfo.model_validate(at.tag) for at in a.tags if at.tag],
-            created_at=a.created_at,
-            updated_at=a.updated_at,
-            view_count=a.view_count,
-            comment_count=len(a.comments or [])
-        )
-        for a in articles
-    ]
+    return article_list_items(articles)
 
 
 
@@ -144,12 +147,12 @@ async def get_articles_by_tag_or_not(
     limit: int = 10,
     status: Optional[ArticleStatus] = None,
     author: Optional[str] = None,
-    tag: str|None = None
-) -> List[ArticleListResponse]:
+    tag: str|None = None,
+    cursor: Optional[str] = None
+) -> Sequence[ArticleListResponse]:
     from app.models.article import Article
     from app.models.tag import ArticleTag, Tag
     from app.models.user import User
-    from app.schemas.article import UserBasicInfo, TagInfo
 
     # 查标签
     # 如果有关键字搜索
@@ -162,8 +165,10 @@ async def get_articles_by_tag_or_not(
             status=status,
             author=author,
             tag=tag,  # 标签过滤
+            cursor=cursor,
         )
-        if results:
+        if results or segment_query(q):
+            # 关键词能走全文索引时直接返回索引结果（包括空结果），不再退化为 LIKE 全表扫描
             return results
     # 如果只有标签过滤
     if tag:
@@ -177,9 +182,10 @@ async def get_articles_by_tag_or_not(
             .join(ArticleTag, Article.id == ArticleTag.article_id)
             .join(Tag, Tag.id == ArticleTag.tag_id)
             .options(
+                defer(Article.content),
+                defer(Article.latex_content),
                 selectinload(Article.author),
-                selectinload(Article.tags).selectinload(ArticleTag.tag),
-                selectinload(Article.comments)
+                selectinload(Article.tags).selectinload(ArticleTag.tag)
             )
             .where(Tag.id == tagentity.id)
         )
@@ -199,35 +205,25 @@ async def get_articles_by_tag_or_not(
                 Article.title.contains(q) | Article.content.contains(q)
             )
 
-        stmt = stmt.order_by(Article.published_at.desc()).offset(skip).limit(limit)
+        if cursor is not None:
+            stmt = apply_keyset(stmt, Article.created_at, Article.id, cursor, limit)
+        else:
+            stmt = stmt.order_by(Article.published_at.desc()).offset(skip).limit(limit)
 
         result = await db.execute(stmt)
         articles = result.scalars().all()
-        return [
-            ArticleListResponse(
-                id=a.id,
-                title=a.title,
-                summary=a.summary,
-                status=a.status,
-                author=UserBasicInfo.model_validate(a.author),
-                tags=[TagInfo.model_validate(at.tag) for at in a.tags if at.tag],
-                created_at=a.created_at,
-                updated_at=a.updated_at,
-                view_count=a.view_count,
-                comment_count=len(a.comments or [])
-            )
-            for a in articles
-        ]
+        return article_list_items(articles)
 
     # 如果既没有 q 也没有 tag，返回空列表
     return await search_articles_fallback(
-        db, q, skip, limit, status, author, tag=tag
+        db, q, skip, limit, status, author, tag=tag, cursor=cursor
     )
 
 
 
 @router.get("/suggestions")
 async def get_search_suggestions(
+    request: Request,
     db: Annotated[AsyncSession, Depends(get_db)],
     q: str = Query(..., description="搜索关键词"),
     limit: int = Query(5, ge=1, le=20, description="建议数量")
@@ -241,15 +237,16 @@ async def get_search_suggestions(
         query=q,
         limit=limit
     )
-    return {
+    return conditional_json(request, {
         "query": q,
         "suggestions": suggestions,
         "count": len(suggestions)
-    }
+    }, CACHE_SEARCH)
 
 
 @router.get("/popular")
 async def get_popular_searches(
+    request: Request,
     db: Annotated[AsyncSession, Depends(get_db)],
     limit: int = Query(10, ge=1, le=50, description="热门搜索词数量")
 ):
@@ -261,31 +258,24 @@ async def get_popular_searches(
         db=db,
         limit=limit
     )
-    return {
+    return conditional_json(request, {
         "popular_searches": popular_words,
         "count": len(popular_words)
-    }
+    }, CACHE_SEARCH)
 
 
 @router.post("/init")
 async def initialize_search_index(db: Annotated[AsyncSession, Depends(get_db)]):
     """初始化搜索索引
     
-    创建 FTS5 虚拟表和触发器，并填充现有数据
+    删除并重建索引表和触发器，填充现有数据，并更新 search_index_state
     """
     try:
-        # 先删除已存在的表和触发器
-        await FTSSearch.drop_fts_table(db)
-        
-        # 创建 FTS5 表
-        await FTSSearch.create_fts_table(db)
-        
-        # 填充数据
-        await FTSSearch.populate_fts_table(db)
-        
+        result = await sync_search_index(db, rebuild=True)
         return {
             "message": "搜索索引初始化成功",
-            "status": "completed"
+            "status": "completed",
+            "indexed": result["indexed"],
         }
     except Exception as e:
         return {
@@ -296,17 +286,16 @@ async def initialize_search_index(db: Annotated[AsyncSession, Depends(get_db)]):
 
 @router.get("/stats")
 async def get_search_stats(db: Annotated[AsyncSession, Depends(get_db)]):
-    """获取搜索统计信息"""
-    # 获取 FTS5 表统计信息
-    result = await db.execute(text("SELECT COUNT(*) FROM articles_fts"))
-    fts_count = result.scalar() or 0
-    
-    # 获取文章总数 - 使用大写的PUBLISHED状态
-    result = await db.execute(text("SELECT COUNT(*) FROM article WHERE status = 'PUBLISHED'"))
-    article_count = result.scalar() or 0
-    
+    """获取搜索统计信息（索引计数由当前后端统计，SQLite / PostgreSQL 通用）"""
+    stats = await FTSSearch.stats(db)
+    fts_count = stats["indexed_articles"]
+    article_count = stats["published_articles"]
+    state = await db.get(SearchIndexState, INDEX_NAME)
+
     return {
         "fts_indexed_articles": fts_count,
         "total_published_articles": article_count,
-        "index_coverage": fts_count / article_count if article_count > 0 else 0
+        "index_coverage": fts_count / article_count if article_count > 0 else 0,
+        "index_version": state.version if state else 0,
+        "indexed_until": state.indexed_until if state else None,
     } 
\ No newline at end of file
@@ -1,11 +1,13 @@
 from typing import List, Annotated
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, delete
 from sqlalchemy.orm import selectinload
 
 from app.core.database import get_db
 from app.core.exceptions import NotFoundError, ConflictError
+from app.core.http_cache import CACHE_TAGS, conditional_json
+from app.core.serialization import validate_many
 from app.core.security import get_current_user, require_admin
 from app.models.user import User
 from app.models.tag import Tag
@@ -38,6 +40,7 @@ async def create_tag(
 
 @router.get("/", response_model=List[TagWithCountResponse])
 async def list_tags(
+    request: Request,
     db: Annotated[AsyncSession, Depends(get_db)]
 ):
     """获取标签列表（包含文章数量）"""
@@ -54,19 +57,15 @@ async def list_tags(
     
     tags_with_count = result.all()
     
-    return [
-        TagWithCountResponse(
-            id=tag.id,
-            name=tag.name,
-            description=tag.description,
-            article_count=count
-        )
+    return conditional_json(request, validate_many(TagWithCountResponse, (
+        {"id": tag.id, "name": tag.name, "description": tag.description, "article_count": count}
         for tag, count in tags_with_count
-    ]
+    )), CACHE_TAGS)
 
 
 @router.get("/popular", response_model=PopularTagsResponse)
 async def get_popular_tags(
+    request: Request,
     db: Annotated[AsyncSession, Depends(get_db)],
     limit: int = 10
 ):
@@ -85,17 +84,12 @@ async def get_popular_tags(
     tags_with_count = result.all()
     print(f"❤❤ {tags_with_count}")
 
-    return PopularTagsResponse(
-        tags=[
-            TagWithCountResponse(
-                id=tag.id,
-                name=tag.name,
-                description=tag.description,
-                article_count=count
-            )
+    return conditional_json(request, PopularTagsResponse.model_validate({
+        "tags": [
+            {"id": tag.id, "name": tag.name, "description": tag.description, "article_count": count}
             for tag, count in tags_with_count
         ]
-    )
+    }), CACHE_TAGS)
 
 
 
@@ -11,7 +11,7 @@ from app.models.scheduled_task import ScheduledTask
 from app.core.database import async_session
 from sqlalchemy.exc import IntegrityError
 from app.core.config import settings
-from app.core.apscheduler.jobs import task_func_map
+from app.core.apscheduler.jobs import task_func_map, task_default_map
 
 logger = logging.getLogger(__name__)
 
@@ -68,13 +68,14 @@ class TaskScheduler:
                 result = await session.execute(stmt)
                 exists = result.scalar()
                 if not exists:
+                    defaults = task_default_map.get(func_name, {})
                     new_task = ScheduledTask(
                         id=str(uuid.uuid4()),
                         name=f"{func_name}-示例",
                         func_name=func_name,
-                        trigger="interval",
-                        trigger_args={"seconds": 60},
-                        is_enabled=False  # 默认禁用，手动启用
+                        trigger=defaults.get("trigger", "interval"),
+                        trigger_args=defaults.get("trigger_args", {"seconds": 60}),
+                        is_enabled=defaults.get("is_enabled", False)  # 任务模块的 register_defaults() 未声明时默认禁用，需手动启用
                     )
                     session.add(new_task)
                     try:
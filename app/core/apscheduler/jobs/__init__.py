@@ -4,6 +4,8 @@ import importlib
 
 # 统一收集函数
 task_func_map = {}
+# 可选：任务首次自动注册时使用的默认触发器配置
+task_default_map = {}
 
 for _, module_name, ispkg in pkgutil.iter_modules(__path__):
     if not ispkg and module_name not in ("__init__"):
@@ -12,3 +14,7 @@ for _, module_name, ispkg in pkgutil.iter_modules(__path__):
             funcs = module.register_jobs()
             if funcs:
                 task_func_map.update(funcs)
+        if hasattr(module, "register_defaults"):
+            defaults = module.register_defaults()
+            if defaults:
+                task_default_map.update(defaults)
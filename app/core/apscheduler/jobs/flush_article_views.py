@@ -0,0 +1,30 @@
+import logging
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+async def flush_article_views():
+    """把 Redis / 进程内缓冲的文章浏览量批量写回数据库"""
+    from app.core.view_counter import view_counter
+    try:
+        flushed = await view_counter.flush()
+        if flushed:
+            logger.info(f"浏览量落库完成，更新了 {flushed} 篇文章")
+    except Exception as e:
+        logger.error(f"浏览量落库失败: {e}")
+
+def register_jobs():
+    return {
+        "flush_article_views":flush_article_views
+    }
+
+def register_defaults():
+    # 浏览量只进缓冲，该任务必须默认启用，否则计数永远不会落库
+    return {
+        "flush_article_views": {
+            "trigger": "interval",
+            "trigger_args": {"seconds": settings.view_count_flush_interval},
+            "is_enabled": True,
+        }
+    }
@@ -0,0 +1,31 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+async def collect_media_blobs():
+    """回收引用计数归零的媒体文件（删除接口失败时的兜底），并清理中断上传的临时文件"""
+    from app.core.database import async_session
+    from app.core.media_store import media_store
+    try:
+        async with async_session() as db:
+            collected = await media_store.collect(db)
+        removed = await media_store.sweep_temp_files()
+        if collected or removed:
+            logger.info(f"媒体文件回收完成: blob {collected} 个, 临时文件 {removed} 个")
+    except Exception as e:
+        logger.error(f"媒体文件回收失败: {e}")
+
+def register_jobs():
+    return {
+        "collect_media_blobs":collect_media_blobs
+    }
+
+def register_defaults():
+    return {
+        "collect_media_blobs": {
+            "trigger": "cron",
+            "trigger_args": {"hour": 4, "minute": 0},
+            "is_enabled": True,
+        }
+    }
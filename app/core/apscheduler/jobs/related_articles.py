@@ -0,0 +1,41 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+async def update_related_articles():
+    """增量重算相关文章：只处理内容 / 标签变化的文章及受其影响的文章"""
+    from app.core.related_articles import related_articles
+    try:
+        await related_articles.update()
+    except Exception as e:
+        logger.error(f"相关文章增量计算失败: {e}")
+
+
+async def rebuild_related_articles():
+    """全量重算相关文章（idf 随文章增多而漂移，每日校正一次）"""
+    from app.core.related_articles import related_articles
+    try:
+        await related_articles.update(full=True)
+    except Exception as e:
+        logger.error(f"相关文章全量计算失败: {e}")
+
+def register_jobs():
+    return {
+        "update_related_articles":update_related_articles,
+        "rebuild_related_articles":rebuild_related_articles,
+    }
+
+def register_defaults():
+    return {
+        "update_related_articles": {
+            "trigger": "interval",
+            "trigger_args": {"minutes": 30},
+            "is_enabled": True,
+        },
+        "rebuild_related_articles": {
+            "trigger": "cron",
+            "trigger_args": {"hour": 4, "minute": 30},
+            "is_enabled": True,
+        },
+    }
@@ -0,0 +1,44 @@
+import logging
+from sqlalchemy import select
+from app.core.database import async_session
+from app.models.article import Article
+
+logger = logging.getLogger(__name__)
+
+RENDER_BATCH_SIZE = 50
+
+
+async def render_articles():
+    """为尚未预渲染的历史文章补渲染 HTML / 目录（每次一批）"""
+    from app.core.article_render import article_renderer
+    from app.core.article_cache import article_cache
+    try:
+        async with async_session() as session:
+            result = await session.execute(
+                select(Article)
+                .where(Article.content_hash.is_(None))
+                .order_by(Article.id)
+                .limit(RENDER_BATCH_SIZE)
+            )
+            articles = result.scalars().all()
+            rendered = [a.id for a in articles if await article_renderer.store(session, a)]
+            await session.commit()
+        if rendered:
+            await article_cache.invalidate_articles(rendered, lists=False)
+            logger.info(f"文章预渲染完成，处理了 {len(rendered)} 篇文章")
+    except Exception as e:
+        logger.error(f"文章预渲染失败: {e}")
+
+def register_jobs():
+    return {
+        "render_articles":render_articles
+    }
+
+def register_defaults():
+    return {
+        "render_articles": {
+            "trigger": "interval",
+            "trigger_args": {"minutes": 10},
+            "is_enabled": True,
+        }
+    }
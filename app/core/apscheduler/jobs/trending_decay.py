@@ -0,0 +1,30 @@
+import logging
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+async def compact_trending():
+    """热门榜单分数统一衰减到当前时间，并清理衰减殆尽 / 超出长度的文章"""
+    from app.core.trending import trending
+    try:
+        remaining = await trending.compact()
+        if remaining:
+            logger.info(f"热门榜单压缩完成: {remaining}")
+    except Exception as e:
+        logger.error(f"热门榜单压缩失败: {e}")
+
+def register_jobs():
+    return {
+        "compact_trending":compact_trending
+    }
+
+def register_defaults():
+    # 前向衰减的分数随时间指数增长，需要定期重置基准，默认启用
+    return {
+        "compact_trending": {
+            "trigger": "interval",
+            "trigger_args": {"seconds": settings.trending_compact_interval},
+            "is_enabled": True,
+        }
+    }
@@ -0,0 +1,177 @@
+import hashlib
+import json
+import logging
+from typing import Any, Iterable, List, Optional, Tuple, Type, TypeVar
+
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.core.redis import redis_manager
+from app.core.serialization import adapter_for
+
+logger = logging.getLogger(__name__)
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+class ArticleCache:
+    '''
+    文章详情 / 列表响应的读穿缓存
+
+    存储规则：
+        cache:article:gen:<article_id>           单篇文章的代数（INCR 即失效）
+        cache:article:list:gen                   所有列表查询共享的代数
+        cache:article:detail:<id>:<gen>          序列化后的 ArticleDetailResponse
+        cache:article:list:<gen>:<params_hash>   序列化后的 List[ArticleListResponse]
+
+    代数必须在查库之前读取：写路径在查库期间 INCR 代数后，
+    本次回填只会落在旧代数的 key 上，不会被后续读取命中。
+    Redis 不可用时所有方法都退化为缓存未命中 / 空操作。
+    '''
+    LIST_GEN_KEY = "cache:article:list:gen"
+
+    @staticmethod
+    def _article_gen_key(article_id: int) -> str:
+        return f"cache:article:gen:{article_id}"
+
+    @staticmethod
+    def normalize_list_params(**params: Any) -> str:
+        """把列表查询参数规整成稳定的哈希（去空值、枚举取值、字符串去空白）"""
+        normalized = {}
+        for name, value in sorted(params.items()):
+            if value is None or value == "":
+                continue
+            if hasattr(value, "value"):
+                value = value.value
+            if isinstance(value, str):
+                value = value.strip()
+            normalized[name] = value
+        raw = json.dumps(normalized, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    async def article_generation(self, article_id: int) -> Optional[str]:
+        """单篇文章的当前代数；Redis 不可用时返回 None"""
+        if redis_manager.redis is None:
+            return None
+        try:
+            return await redis_manager.redis.get(self._article_gen_key(article_id)) or "0"
+        except Exception as e:
+            logger.warning(f"读取文章缓存代数失败: {e}")
+            return None
+
+    @staticmethod
+    def detail_key_for(article_id: int, gen: Optional[str]) -> Optional[str]:
+        return None if gen is None else f"cache:article:detail:{article_id}:{gen}"
+
+    async def detail_key(self, article_id: int) -> Optional[str]:
+        """返回当前代数下的详情缓存 key；Redis 不可用时返回 None"""
+        return self.detail_key_for(article_id, await self.article_generation(article_id))
+
+    async def list_generation(self) -> Optional[str]:
+        """当前列表代数；Redis 不可用时返回 None"""
+        if redis_manager.redis is None:
+            return None
+        try:
+            return await redis_manager.redis.get(self.LIST_GEN_KEY) or "0"
+        except Exception as e:
+            logger.warning(f"读取列表缓存代数失败: {e}")
+            return None
+
+    async def list_key(self, **params: Any) -> Optional[str]:
+        """返回当前代数下的列表缓存 key；Redis 不可用时返回 None"""
+        gen = await self.list_generation()
+        if gen is None:
+            return None
+        return f"cache:article:list:{gen}:{self.normalize_list_params(**params)}"
+
+    async def _get_raw(self, key: Optional[str]) -> Optional[str]:
+        if key is None or redis_manager.redis is None:
+            return None
+        try:
+            return await redis_manager.redis.get(key)
+        except Exception as e:
+            logger.warning(f"读取缓存失败 {key}: {e}")
+            return None
+
+    async def _set_raw(self, key: Optional[str], raw: str | bytes, ttl: int):
+        if key is None or redis_manager.redis is None:
+            return
+        try:
+            await redis_manager.redis.set(key, raw, ex=ttl)
+        except Exception as e:
+            logger.warning(f"写入缓存失败 {key}: {e}")
+
+    async def get_model(self, key: Optional[str], model: Type[ModelT]) -> Optional[ModelT]:
+        raw = await self._get_raw(key)
+        if raw is None:
+            return None
+        try:
+            return model.model_validate_json(raw)
+        except Exception as e:
+            logger.warning(f"缓存内容无法解析，按未命中处理 {key}: {e}")
+            return None
+
+    async def set_model(self, key: Optional[str], item: BaseModel, ttl: Optional[int] = None):
+        await self._set_raw(key, item.model_dump_json(), ttl or settings.article_cache_ttl)
+
+    async def get_models(self, key: Optional[str], model: Type[ModelT]) -> Optional[List[ModelT]]:
+        raw = await self._get_raw(key)
+        if raw is None:
+            return None
+        try:
+            return adapter_for(List[model]).validate_json(raw)  # type: ignore[valid-type]
+        except Exception as e:
+            logger.warning(f"缓存内容无法解析，按未命中处理 {key}: {e}")
+            return None
+
+    async def get_models_digest(
+        self, key: Optional[str], model: Type[ModelT]
+    ) -> Optional[Tuple[List[ModelT], str]]:
+        """与 get_models 相同，同时返回缓存内容的 SHA-1（列表接口用它生成 ETag，304 不需要查库）"""
+        raw = await self._get_raw(key)
+        if raw is None:
+            return None
+        try:
+            items = adapter_for(List[model]).validate_json(raw)  # type: ignore[valid-type]
+        except Exception as e:
+            logger.warning(f"缓存内容无法解析，按未命中处理 {key}: {e}")
+            return None
+        return items, self.payload_digest(raw)
+
+    @staticmethod
+    def payload_digest(raw: str | bytes) -> str:
+        if isinstance(raw, str):
+            raw = raw.encode("utf-8")
+        return hashlib.sha1(raw).hexdigest()
+
+    async def set_models(
+        self, key: Optional[str], items: List[ModelT], model: Type[ModelT], ttl: Optional[int] = None
+    ) -> str:
+        """写入缓存并返回内容的 SHA-1（Redis 不可用时也返回）"""
+        raw = adapter_for(List[model]).dump_json(items)  # type: ignore[valid-type]
+        await self._set_raw(key, raw, ttl or settings.article_list_cache_ttl)
+        return self.payload_digest(raw)
+
+    async def invalidate_articles(self, article_ids: Iterable[int], lists: bool = True):
+        """文章内容 / 评论变化：递增对应文章代数，默认同时使所有列表缓存失效"""
+        if redis_manager.redis is None:
+            return
+        try:
+            pipe = redis_manager.redis.pipeline()
+            for article_id in article_ids:
+                pipe.incr(self._article_gen_key(article_id))
+            if lists:
+                pipe.incr(self.LIST_GEN_KEY)
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"文章缓存失效失败: {e}")
+
+    async def invalidate_article(self, article_id: int, lists: bool = True):
+        await self.invalidate_articles([article_id], lists=lists)
+
+    async def invalidate_lists(self):
+        await self.invalidate_articles([], lists=True)
+
+
+# 实例化
+article_cache = ArticleCache()
@@ -0,0 +1,290 @@
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Any, AsyncIterable, AsyncIterator, Dict, List, Optional, Union
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.tag_resolver import resolve_tags
+from app.models.article import Article, ArticleStatus
+from app.models.comment import Comment
+from app.models.tag import ArticleTag, Tag
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+'''
+文章 / 标签 / 评论的 NDJSON 导入导出
+
+格式：每行一个 JSON 对象
+    {"type": "meta", "version": 1, "exported_at": "..."}
+    {"type": "article", "id": 1, "title": ..., "author": "<username>", "tags": ["..."],
+     "comments": [{"id": 10, "parent_id": null, "author": "<username>", "content": ..., ...}]}
+作者按用户名关联（评论作者已被删除时导出为 null），导入端找不到该用户时归到执行导入的管理员名下；
+id 只用于还原评论的父子关系，导入时重新分配。
+无法解析的行（非法 UTF-8、非法 JSON、缺字段）跳过，并在统计中报告行号。
+'''
+
+FORMAT_VERSION = 1
+EXPORT_BATCH_SIZE = 500
+# 统计中最多报告的跳过行号个数
+MAX_REPORTED_LINES = 100
+
+_ARTICLE_FIELDS = (
+    "title", "content", "summary", "status", "is_featured", "has_latex", "latex_content",
+    "published_at", "view_count", "created_at", "updated_at",
+)
+_COMMENT_FIELDS = ("content", "is_approved", "created_at", "updated_at")
+
+
+def _dump_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, ArticleStatus):
+        return value.value
+    return value
+
+
+def _load_datetime(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+def _ndjson_line(record: Dict[str, Any]) -> bytes:
+    return (json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+async def export_ndjson(
+    db: AsyncSession,
+    status: Optional[ArticleStatus] = None,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> AsyncIterator[bytes]:
+    """
+    流式导出：文章走服务端游标（stream + yield_per），
+    每一批文章的标签 / 评论用两条 IN 查询补齐，内存占用与总量无关
+    """
+    yield _ndjson_line({
+        "type": "meta",
+        "version": FORMAT_VERSION,
+        "exported_at": datetime.now(timezone.utc).isoformat(),
+    })
+
+    query = (
+        select(Article, User.username)
+        .join(User, User.id == Article.author_id)
+        .order_by(Article.id)
+        .execution_options(yield_per=batch_size)
+    )
+    if status:
+        query = query.where(Article.status == status)
+
+    stream = await db.stream(query)
+    async for partition in stream.partitions(batch_size):
+        articles = {article.id: (article, username) for article, username in partition}
+        ids = list(articles)
+
+        tags: Dict[int, List[str]] = {aid: [] for aid in ids}
+        result = await db.execute(
+            select(ArticleTag.article_id, Tag.name)
+            .join(Tag, Tag.id == ArticleTag.tag_id)
+            .where(ArticleTag.article_id.in_(ids))
+            .order_by(ArticleTag.id)
+        )
+        for article_id, name in result.all():
+            tags[article_id].append(name)
+
+        comments: Dict[int, List[Dict[str, Any]]] = {aid: [] for aid in ids}
+        result = await db.execute(
+            select(Comment, User.username)
+            .outerjoin(User, User.id == Comment.author_id)
+            .where(Comment.article_id.in_(ids))
+            .order_by(Comment.id)
+        )
+        for comment, username in result.all():
+            item = {"id": comment.id, "parent_id": comment.parent_id, "author": username}
+            item.update({name: _dump_value(getattr(comment, name)) for name in _COMMENT_FIELDS})
+            comments[comment.article_id].append(item)
+
+        for article_id, (article, username) in articles.items():
+            record: Dict[str, Any] = {"type": "article", "id": article_id, "author": username}
+            record.update({name: _dump_value(getattr(article, name)) for name in _ARTICLE_FIELDS})
+            record["tags"] = tags[article_id]
+            record["comments"] = comments[article_id]
+            yield _ndjson_line(record)
+
+        # 已输出的对象不再需要，避免 identity map 随导出量增长
+        db.expunge_all()
+
+
+class ArticleImporter:
+    '''
+    NDJSON 批量导入
+
+    每 batch_size 篇文章一个事务：
+        作者用户名一次 IN 查询解析（跨批缓存），标签走 resolve_tags 批量 upsert，
+        文章 / 标签关联 / 评论都是 executemany 批量 INSERT，评论父子关系用一次批量 UPDATE 回填。
+    全文索引由 article 上的触发器随每批 INSERT 同步，不暂停：
+    暂停是全库范围的，期间其他请求对已有文章的修改会绕过索引，且导入中断时同步无法恢复。
+    '''
+
+    def __init__(self, db: AsyncSession, default_author_id: int, batch_size: int = 500):
+        self.db = db
+        self.default_author_id = default_author_id
+        self.batch_size = max(1, batch_size)
+        self._user_ids: Dict[str, int] = {}
+        self.stats = {"articles": 0, "comments": 0, "tags": 0, "skipped_lines": 0}
+        self.skipped_line_numbers: List[int] = []
+
+    async def _resolve_users(self, usernames: set) -> None:
+        missing = [name for name in usernames if name and name not in self._user_ids]
+        if not missing:
+            return
+        result = await self.db.execute(select(User.username, User.id).where(User.username.in_(missing)))
+        self._user_ids.update({name: user_id for name, user_id in result.all()})
+
+    def _skip(self, line_number: int, reason: str) -> None:
+        self.stats["skipped_lines"] += 1
+        if len(self.skipped_line_numbers) < MAX_REPORTED_LINES:
+            self.skipped_line_numbers.append(line_number)
+        logger.warning(f"NDJSON 导入跳过第 {line_number} 行: {reason}")
+
+    def _user_id(self, username: Optional[str]) -> int:
+        return self._user_ids.get(username or "", self.default_author_id)
+
+    async def _flush(self, records: List[Dict[str, Any]]) -> None:
+        db = self.db
+        usernames = {r.get("author") for r in records}
+        usernames |= {c.get("author") for r in records for c in r.get("comments") or []}
+        await self._resolve_users(usernames)
+
+        now = datetime.now(timezone.utc)
+        article_rows = []
+        for r in records:
+            comments = r.get("comments") or []
+            article_rows.append({
+                "title": r["title"],
+                "content": r.get("content") or "",
+                "summary": r.get("summary"),
+                "status": ArticleStatus(r.get("status") or ArticleStatus.DRAFT.value),
+                "is_featured": bool(r.get("is_featured")),
+                "has_latex": bool(r.get("has_latex")),
+                "latex_content": r.get("latex_content"),
+                "published_at": _load_datetime(r.get("published_at")),
+                "view_count": int(r.get("view_count") or 0),
+                "comment_count": len(comments),
+                "author_id": self._user_id(r.get("author")),
+                "created_at": _load_datetime(r.get("created_at")) or now,
+                "updated_at": _load_datetime(r.get("updated_at")) or now,
+            })
+        result = await db.execute(
+            insert(Article).returning(Article.id, sort_by_parameter_order=True), article_rows
+        )
+        new_ids = [row[0] for row in result.all()]
+
+        tag_ids = await resolve_tags(db, [name for r in records for name in r.get("tags") or []])
+        link_rows = [
+            {"article_id": article_id, "tag_id": tag_ids[name]}
+            for article_id, r in zip(new_ids, records)
+            for name in dict.fromkeys((n or "").strip() for n in r.get("tags") or [])
+            if name in tag_ids
+        ]
+        if link_rows:
+            await db.execute(insert(ArticleTag), link_rows)
+
+        comment_rows, old_comment_ids, old_parent_ids = [], [], []
+        for article_id, r in zip(new_ids, records):
+            for c in r.get("comments") or []:
+                comment_rows.append({
+                    "article_id": article_id,
+                    "author_id": self._user_id(c.get("author")),
+                    "content": c.get("content") or "",
+                    "is_approved": c.get("is_approved", True),
+                    "parent_id": None,
+                    "created_at": _load_datetime(c.get("created_at")) or now,
+                    "updated_at": _load_datetime(c.get("updated_at")) or now,
+                })
+                old_comment_ids.append(c.get("id"))
+                old_parent_ids.append(c.get("parent_id"))
+        if comment_rows:
+            result = await db.execute(
+                insert(Comment).returning(Comment.id, sort_by_parameter_order=True), comment_rows
+            )
+            new_comment_ids = [row[0] for row in result.all()]
+            id_map = {old: new for old, new in zip(old_comment_ids, new_comment_ids) if old is not None}
+            parent_rows = [
+                {"id": new_id, "parent_id": id_map[old_parent]}
+                for new_id, old_parent in zip(new_comment_ids, old_parent_ids)
+                if old_parent is not None and old_parent in id_map
+            ]
+            if parent_rows:
+                # ORM 按主键批量 UPDATE（executemany）
+                await db.execute(update(Comment), parent_rows)
+
+        await db.commit()
+        self.stats["articles"] += len(new_ids)
+        self.stats["comments"] += len(comment_rows)
+        self.stats["tags"] += len(link_rows)
+
+    async def run(self, lines: AsyncIterable[Union[str, bytes]]) -> Dict[str, Any]:
+        """lines 可以是已解码的文本行，也可以是原始字节行（逐行按 UTF-8 解码）"""
+        db = self.db
+        try:
+            batch: List[Dict[str, Any]] = []
+            line_number = 0
+            async for raw in lines:
+                line_number += 1
+                try:
+                    line = (raw.decode("utf-8") if isinstance(raw, bytes) else raw).strip()
+                except UnicodeDecodeError:
+                    self._skip(line_number, "非法 UTF-8")
+                    continue
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    self._skip(line_number, "非法 JSON")
+                    continue
+                if not isinstance(record, dict):
+                    self._skip(line_number, "不是 JSON 对象")
+                    continue
+                if record.get("type") != "article" or not record.get("title"):
+                    if record.get("type") != "meta":
+                        self._skip(line_number, "不是文章记录或缺少标题")
+                    continue
+                batch.append(record)
+                if len(batch) >= self.batch_size:
+                    await self._flush(batch)
+                    batch = []
+            if batch:
+                await self._flush(batch)
+        except Exception:
+            await db.rollback()
+            raise
+        logger.info(f"NDJSON 导入完成: {self.stats}")
+        return {**self.stats, "skipped_line_numbers": self.skipped_line_numbers}
+
+
+async def iter_upload_lines(upload: Any, chunk_size: int = 64 * 1024) -> AsyncIterator[bytes]:
+    """按块读取上传文件并切分为字节行，不把整个文件读进内存（由 ArticleImporter 逐行解码）"""
+    buffer = b""
+    while True:
+        chunk = await upload.read(chunk_size)
+        if not chunk:
+            break
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line
+    if buffer:
+        yield buffer
+
+
+async def import_ndjson(
+    db: AsyncSession,
+    lines: AsyncIterable[Union[str, bytes]],
+    default_author_id: int,
+    batch_size: int = 500,
+) -> Dict[str, Any]:
+    """导入 NDJSON（见 ArticleImporter），返回统计信息"""
+    return await ArticleImporter(db, default_author_id, batch_size).run(lines)
@@ -0,0 +1,131 @@
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional, Set
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.core.article_cache import article_cache
+from app.core.config import settings
+from app.core.database import async_session
+from app.models.article import Article
+from app.utils.markdown_render import content_hash, render_markdown
+
+logger = logging.getLogger(__name__)
+
+
+class ArticleRenderer:
+    '''
+    文章 Markdown / LaTeX 预渲染
+
+    渲染在进程池中执行（spawn，子进程只导入 app.utils.markdown_render），不阻塞事件循环。
+    结果写回 article.content_html / content_toc / has_latex / latex_content，
+    并记录 content_hash；内容哈希未变化时直接跳过，不会重复渲染。
+    写路径（创建 / 更新）同步渲染；读路径发现哈希过期（历史文章 / RENDER_VERSION 升级）时
+    只调度后台任务 refresh()，本次响应仍返回已存储的结果，GET 请求不写库。
+    '''
+
+    def __init__(self):
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._refreshing: Set[int] = set()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=max(1, settings.article_render_workers),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._pool
+
+    async def render(self, content: str) -> Dict:
+        """在进程池中渲染一段 Markdown"""
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._get_pool(), render_markdown, content)
+        except BrokenProcessPool:
+            # 子进程异常退出后进程池不可再用，重建一次
+            logger.warning("渲染进程池已损坏，重建后重试")
+            self.shutdown()
+            return await loop.run_in_executor(self._get_pool(), render_markdown, content)
+
+    async def rendered_fields(self, content: str, current_hash: Optional[str] = None) -> Optional[Dict]:
+        """
+        返回需要写入 article 的渲染字段；
+        内容哈希与 current_hash 相同（内容未变化）时返回 None
+        """
+        if current_hash is not None and current_hash == content_hash(content):
+            return None
+        result = await self.render(content)
+        return {
+            "content_html": result["html"],
+            "content_toc": result["toc"],
+            "has_latex": result["has_latex"],
+            "latex_content": result["latex_content"],
+            "content_hash": result["content_hash"],
+        }
+
+    async def apply(self, article: Article) -> bool:
+        """按需渲染并写入 ORM 对象（不 commit），返回是否重新渲染"""
+        fields = await self.rendered_fields(article.content or "", article.content_hash)
+        if fields is None:
+            return False
+        for name, value in fields.items():
+            setattr(article, name, value)
+        return True
+
+    async def store(self, db: AsyncSession, article: Article) -> bool:
+        """
+        为已持久化的文章补渲染（历史数据 / 渲染版本升级），不 commit
+        预渲染不算内容变更，用 Core UPDATE 保持 updated_at 不变
+        """
+        fields = await self.rendered_fields(article.content or "", article.content_hash)
+        if fields is None:
+            return False
+        await db.execute(
+            update(Article)
+            .where(Article.id == article.id)
+            .values(**fields, updated_at=Article.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+        for name, value in fields.items():
+            set_committed_value(article, name, value)
+        return True
+
+    @staticmethod
+    def is_stale(article: Article) -> bool:
+        return article.content_hash != content_hash(article.content or "")
+
+    async def refresh(self, article_id: int) -> bool:
+        """
+        后台任务：用独立会话补渲染单篇文章并提交，成功后使详情缓存失效
+        同一篇文章已在渲染时直接返回，避免并发请求重复渲染
+        """
+        if article_id in self._refreshing:
+            return False
+        self._refreshing.add(article_id)
+        try:
+            async with async_session() as session:
+                article = await session.get(Article, article_id)
+                if article is None or not await self.store(session, article):
+                    return False
+                await session.commit()
+            await article_cache.invalidate_article(article_id, lists=False)
+            return True
+        except Exception as e:
+            logger.error(f"文章 {article_id} 补渲染失败: {e}")
+            return False
+        finally:
+            self._refreshing.discard(article_id)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+# 实例化
+article_renderer = ArticleRenderer()
@@ -0,0 +1,34 @@
+from typing import Iterable
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.article import Article
+from app.models.comment import Comment
+
+
+async def refresh_comment_counts(db: AsyncSession, article_ids: Iterable[int]):
+    """
+    在当前事务内按评论表重算 article.comment_count（不提交）
+
+    用相关子查询整体重算而不是 +1/-1，删除评论时级联删除的回复也能正确计入；
+    子查询走 comment(article_id, created_at, id) 索引，代价只与单篇文章的评论数相关。
+    """
+    ids = list(set(article_ids))
+    if not ids:
+        return
+    count_subquery = (
+        select(func.count(Comment.id))
+        .where(Comment.article_id == Article.id)
+        .scalar_subquery()
+    )
+    await db.execute(
+        update(Article)
+        .where(Article.id.in_(ids))
+        .values(
+            comment_count=count_subquery,
+            # 评论数不算文章内容变更，保持 updated_at 不变
+            updated_at=Article.updated_at,
+        )
+        .execution_options(synchronize_session=False)
+    )
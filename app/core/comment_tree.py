@@ -0,0 +1,112 @@
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import contains_eager
+
+from app.core.pagination import apply_keyset, build_page, encode_cursor
+from app.models.comment import Comment
+from app.schemas.article import CommentTreeNode, UserBasicInfo
+from app.schemas.pagination import CursorPage
+
+
+async def fetch_comment_tree(
+    db: AsyncSession,
+    article_id: int,
+    *,
+    parent_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: int = 20,
+    depth: int = 3,
+    replies_limit: int = 3,
+) -> CursorPage[CommentTreeNode]:
+    """
+    用一条递归 CTE 取出一页评论树
+
+    parent_id 为空时，根节点是按时间倒序分页的顶层评论；
+    否则根节点是 parent_id 的直接回复（按时间正序），用于“加载更多回复”。
+    每个节点最多带 replies_limit 条回复，树深最多 depth 层（含根节点）。
+    SQLite（>= 3.25，窗口函数）和 PostgreSQL 共用同一条语句。
+    """
+    is_reply_page = parent_id is not None
+
+    roots_query = select(Comment.id).where(
+        Comment.article_id == article_id,
+        Comment.parent_id == parent_id if is_reply_page else Comment.parent_id.is_(None),
+    )
+    roots = apply_keyset(
+        roots_query, Comment.created_at, Comment.id, cursor, limit, ascending=is_reply_page
+    ).cte("roots")
+
+    # 同一父评论下的回复按时间正序编号，只展开前 replies_limit 条
+    ranked = (
+        select(
+            Comment.id,
+            Comment.parent_id,
+            func.row_number().over(
+                partition_by=Comment.parent_id,
+                order_by=(Comment.created_at, Comment.id),
+            ).label("rn"),
+        )
+        .where(Comment.article_id == article_id, Comment.parent_id.is_not(None))
+        .cte("ranked")
+    )
+
+    tree = select(roots.c.id, literal(0).label("depth")).cte("tree", recursive=True)
+    tree = tree.union_all(
+        select(ranked.c.id, tree.c.depth + 1)
+        .join(tree, ranked.c.parent_id == tree.c.id)
+        .where(tree.c.depth + 1 < depth, ranked.c.rn <= replies_limit)
+    )
+
+    child_counts = (
+        select(Comment.parent_id, func.count().label("n"))
+        .where(Comment.article_id == article_id, Comment.parent_id.is_not(None))
+        .group_by(Comment.parent_id)
+        .cte("child_counts")
+    )
+
+    result = await db.execute(
+        select(Comment, tree.c.depth, func.coalesce(child_counts.c.n, 0))
+        .join(tree, tree.c.id == Comment.id)
+        .join(Comment.author)
+        .outerjoin(child_counts, child_counts.c.parent_id == Comment.id)
+        .options(contains_eager(Comment.author))
+        .order_by(tree.c.depth, Comment.created_at, Comment.id)
+    )
+
+    # 按 depth 排序后父节点一定先于子节点出现，一次遍历即可挂好整棵树
+    nodes: Dict[int, CommentTreeNode] = {}
+    top: List[CommentTreeNode] = []
+    for comment, node_depth, reply_count in result.all():
+        node = CommentTreeNode(
+            id=comment.id,
+            content=comment.content,
+            author=UserBasicInfo.model_validate(comment.author),
+            article_id=comment.article_id,
+            parent_id=comment.parent_id,
+            created_at=comment.created_at,
+            updated_at=comment.updated_at,
+            depth=node_depth,
+            reply_count=reply_count,
+            # 子节点挂好后再根据已加载的回复数计算
+            replies_cursor=None,
+        )
+        nodes[node.id] = node
+        if node_depth == 0:
+            top.append(node)
+        elif node.parent_id in nodes:
+            nodes[node.parent_id].replies.append(node)
+
+    for node in nodes.values():
+        if node.replies and node.reply_count > len(node.replies):
+            last = node.replies[-1]
+            node.replies_cursor = encode_cursor(last.created_at, last.id)
+        elif not node.replies and node.reply_count:
+            # 超出 depth 未展开：从第一条回复开始加载
+            node.replies_cursor = ""
+
+    if not is_reply_page:
+        # 顶层评论按时间倒序展示
+        top.reverse()
+    return build_page(top, limit)
@@ -85,6 +85,43 @@ class Settings(BaseSettings):
     notification_email_enabled: bool = Field(default=False, alias="NOTIFICATION_EMAIL_ENABLED")
     enable_notification_fetch: bool = Field(default=True, alias="ENABLE_NOTIFICATION_FETCH")
     enable_notification_push: bool = Field(default=True, alias="ENABLE_NOTIFICATION_PUSH")
+    # 文章浏览量写回缓冲：落库间隔（秒）
+    view_count_flush_interval: int = Field(default=30, alias="VIEW_COUNT_FLUSH_INTERVAL")
+    # 文章详情 / 列表读穿缓存过期时间（秒）
+    article_cache_ttl: int = Field(default=600, alias="ARTICLE_CACHE_TTL")
+    article_list_cache_ttl: int = Field(default=60, alias="ARTICLE_LIST_CACHE_TTL")
+    # Markdown 预渲染进程池大小
+    article_render_workers: int = Field(default=2, alias="ARTICLE_RENDER_WORKERS")
+    # 热门文章：日榜 / 周榜分数半衰期（小时）、衰减压缩任务间隔（秒）、每个榜单保留的文章数上限
+    trending_day_half_life_hours: float = Field(default=6, alias="TRENDING_DAY_HALF_LIFE_HOURS")
+    trending_week_half_life_hours: float = Field(default=48, alias="TRENDING_WEEK_HALF_LIFE_HOURS")
+    trending_compact_interval: int = Field(default=600, alias="TRENDING_COMPACT_INTERVAL")
+    trending_max_size: int = Field(default=5000, alias="TRENDING_MAX_SIZE")
+    # 相关文章：每篇保存的近邻数、文本相似度权重（其余为标签 Jaccard）
+    related_top_k: int = Field(default=10, alias="RELATED_TOP_K")
+    related_text_weight: float = Field(default=0.7, alias="RELATED_TEXT_WEIGHT")
+    # RSS / Atom 条目数；Redis 不可用时订阅源 / sitemap 的重新检查间隔（秒）
+    feed_item_count: int = Field(default=20, alias="FEED_ITEM_COUNT")
+    feed_refresh_interval: int = Field(default=300, alias="FEED_REFRESH_INTERVAL")
+    # 签名媒体链接：签名密钥（留空使用 secret_key）、有效期（秒，0 为不过期）、
+    # 是否由 nginx 通过 X-Accel-Redirect 发送文件及其 internal location 前缀
+    media_signing_key: str = Field(default="", alias="MEDIA_SIGNING_KEY")
+    media_url_ttl: int = Field(default=0, alias="MEDIA_URL_TTL")
+    media_x_accel: bool = Field(default=False, alias="MEDIA_X_ACCEL")
+    media_x_accel_prefix: str = Field(default="/_protected_media/", alias="MEDIA_X_ACCEL_PREFIX")
+    # 图片衍生版本：宽度档位、按 Accept 协商的格式（按优先级）、编码质量、进程池大小、上传后是否立即生成
+    media_image_widths: List[int] = Field(default=[320, 640, 1280], alias="MEDIA_IMAGE_WIDTHS")
+    media_image_formats: List[str] = Field(default=["avif", "webp"], alias="MEDIA_IMAGE_FORMATS")
+    media_image_quality: int = Field(default=75, alias="MEDIA_IMAGE_QUALITY")
+    media_image_workers: int = Field(default=2, alias="MEDIA_IMAGE_WORKERS")
+    media_image_eager: bool = Field(default=True, alias="MEDIA_IMAGE_EAGER")
+    # 媒体库不分页列表（full=true）最多返回的条数
+    media_list_max: int = Field(default=1000, alias="MEDIA_LIST_MAX")
+    # 搜索排序：标题 / 摘要 / 正文的相关度权重；时间加成的天数（0 关闭，发布当天分数最多翻倍，过了该天数加成减半）
+    search_weight_title: float = Field(default=10.0, alias="SEARCH_WEIGHT_TITLE")
+    search_weight_summary: float = Field(default=4.0, alias="SEARCH_WEIGHT_SUMMARY")
+    search_weight_content: float = Field(default=1.0, alias="SEARCH_WEIGHT_CONTENT")
+    search_recency_days: float = Field(default=0, alias="SEARCH_RECENCY_DAYS")
     
     # 支付宝配置
     alipay_app_id: str = Field(default="", alias="ALIPAY_APP_ID")
@@ -2,7 +2,8 @@ import asyncio
 from collections.abc import AsyncGenerator
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from app.core.config import settings
-from app.core.search import FTSSearch
+from app.core.search.index_state import sync_search_index
+from app.core.search.sqlite_search_impl import ensure_sqlite_functions, register_sqlite_functions
 from app.core.base import BaseModelMixin
 
 
@@ -14,6 +15,10 @@ engine = create_async_engine(
     future=True
 )
 
+# SQLite 全文索引的触发器调用 fts_segment()，每个连接都要注册
+if engine.dialect.name == "sqlite":
+    register_sqlite_functions(engine.sync_engine)
+
 # 创建会话工厂
 async_session = async_sessionmaker(
     engine,
@@ -32,15 +37,15 @@ async def create_db_and_tables():
     """创建数据库表"""
     async with engine.begin() as conn:
         await conn.run_sync(BaseModelMixin.metadata.create_all)
+        if engine.dialect.name == "sqlite":
+            # 触发器依赖 fts_segment()，缺失时所有文章写入都会失败，不能像下面那样降级继续运行
+            await conn.run_sync(ensure_sqlite_functions)
     
-    # 创建搜索索引
+    # 同步搜索索引：结构版本变化时全量重建，否则只补齐新增 / 修改的文章
     async with async_session() as session:
         try:
-            # 创建 FTS5 表
-            await FTSSearch.create_fts_table(session)
-            # 填充数据
-            await FTSSearch.populate_fts_table(session)
-            print("FTS5 search index setup completed successfully")
+            result = await sync_search_index(session)
+            print(f"Search index ready ({result['mode']}, {result['indexed']} articles indexed)")
         except Exception as e:
             print(f"Warning: FTS5 setup failed: {e}")
             print("Application will continue without FTS5 search functionality")
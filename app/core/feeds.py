@@ -0,0 +1,297 @@
+import asyncio
+import gzip
+import hashlib
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Dict, List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only, selectinload
+
+from app.core.config import settings
+from app.core.database import async_session
+from app.core.redis import redis_manager
+from app.models.article import Article, ArticleStatus
+from app.models.tag import ArticleTag
+
+logger = logging.getLogger(__name__)
+
+# 单个 sitemap 文件的 URL 上限（sitemaps.org 协议）
+SITEMAP_MAX_URLS = 50000
+
+RSS_MEDIA_TYPE = "application/rss+xml; charset=utf-8"
+ATOM_MEDIA_TYPE = "application/atom+xml; charset=utf-8"
+SITEMAP_MEDIA_TYPE = "application/xml; charset=utf-8"
+
+
+@dataclass
+class FeedDocument:
+    """预先序列化好的 XML 文档（同时保存 gzip 压缩后的字节）；两种表示各有自己的强 ETag"""
+    body: bytes
+    gzipped: bytes
+    etag: str
+    gzip_etag: str
+    last_modified: Optional[datetime]
+
+
+def _utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def _rfc822(value: datetime) -> str:
+    return format_datetime(_utc(value), usegmt=True)
+
+
+def _rfc3339(value: datetime) -> str:
+    return _utc(value).replace(microsecond=0).isoformat().replace("+00:00", "Z")
+
+
+def _attr(value: str) -> str:
+    return escape(value, {'"': "&quot;"})
+
+
+def _article_url(article_id: int) -> str:
+    return f"{settings.frontend_url.rstrip('/')}/article/{article_id}"
+
+
+def _make_document(xml: str, last_modified: Optional[datetime]) -> FeedDocument:
+    body = xml.encode("utf-8")
+    digest = hashlib.sha1(body).hexdigest()
+    return FeedDocument(
+        body=body,
+        gzipped=gzip.compress(body, compresslevel=9, mtime=0),
+        etag=f'"{digest}"',
+        gzip_etag=f'"{digest}-gz"',
+        last_modified=last_modified,
+    )
+
+
+class SiteFeeds:
+    '''
+    RSS / Atom / sitemap 生成
+
+    文档以 bytes（含 gzip 版本）保存在进程内，请求只做一次 Redis GET 比较代数；
+    文章发布 / 修改 / 删除时调用 invalidate()（INCR feed:gen），各进程在下一次请求时增量刷新：
+        feed / atom：只查最新 N 篇的 (id, updated_at)，未变化的条目复用已渲染的 XML 片段
+        sitemap：按 id 区间分桶（每桶 < 50000 个 URL），一条 GROUP BY 得到各桶的 (数量, 最大 updated_at, id 和)，
+                 只重建签名变化的桶；总 URL 数超过 50000 时 sitemap.xml 变为索引，子文件为 /sitemap-<桶号>.xml
+    Redis 不可用时退化为本进程内失效 + 定期检查（feed_refresh_interval 秒）。
+    '''
+    GEN_KEY = "feed:gen"
+
+    def __init__(self):
+        self._docs: Dict[str, FeedDocument] = {}
+        # (id, updated_at) -> (rss item, atom entry)
+        self._entries: Dict[Tuple[int, datetime], Tuple[str, str]] = {}
+        self._feed_signature: Optional[list] = None
+        # 桶号 -> (签名, 拼接好的 <url> 片段)
+        self._buckets: Dict[int, Tuple[tuple, str]] = {}
+        self._generation: Optional[str] = None
+        self._checked_at = 0.0
+        self._dirty = True
+        self._lock = asyncio.Lock()
+
+    async def invalidate(self):
+        """文章发布 / 修改 / 删除后调用"""
+        self._dirty = True
+        if redis_manager.redis is None:
+            return
+        try:
+            await redis_manager.redis.incr(self.GEN_KEY)
+        except Exception as e:
+            logger.warning(f"递增订阅源代数失败: {e}")
+
+    async def _current_generation(self) -> Optional[str]:
+        if redis_manager.redis is None:
+            return None
+        try:
+            return await redis_manager.redis.get(self.GEN_KEY) or "0"
+        except Exception as e:
+            logger.warning(f"读取订阅源代数失败: {e}")
+            return None
+
+    def _is_stale(self, generation: Optional[str]) -> bool:
+        if self._dirty or not self._docs:
+            return True
+        if generation is None:
+            return time.monotonic() - self._checked_at > settings.feed_refresh_interval
+        return generation != self._generation
+
+    async def document(self, name: str) -> Optional[FeedDocument]:
+        """返回 feed.xml / atom.xml / sitemap.xml / sitemap-<n>.xml，不存在时返回 None"""
+        generation = await self._current_generation()
+        if self._is_stale(generation):
+            async with self._lock:
+                generation = await self._current_generation()
+                if self._is_stale(generation):
+                    # 先清标记：刷新期间的新失效会让下一次请求再刷新一次
+                    self._dirty = False
+                    try:
+                        async with async_session() as db:
+                            await self._refresh_feeds(db)
+                            await self._refresh_sitemaps(db)
+                    except Exception:
+                        self._dirty = True
+                        raise
+                    self._generation = generation
+                    self._checked_at = time.monotonic()
+        return self._docs.get(name)
+
+    # ---------- RSS / Atom ----------
+
+    def _render_entry(self, article: Article) -> Tuple[str, str]:
+        url = escape(_article_url(article.id))
+        title = escape(article.title)
+        summary = escape(article.summary or "")
+        author = escape(article.author.username if article.author else "")
+        published = article.published_at or article.created_at
+        tags = [at.tag.name for at in article.tags if at.tag is not None]
+        rss = (
+            f"<item><title>{title}</title><link>{url}</link>"
+            f"<guid isPermaLink=\"true\">{url}</guid><pubDate>{_rfc822(published)}</pubDate>"
+            f"<description>{summary}</description>"
+            + "".join(f"<category>{escape(name)}</category>" for name in tags)
+            + "</item>"
+        )
+        atom = (
+            f"<entry><title>{title}</title><link href=\"{url}\"/><id>{url}</id>"
+            f"<published>{_rfc3339(published)}</published><updated>{_rfc3339(article.updated_at)}</updated>"
+            f"<author><name>{author}</name></author><summary>{summary}</summary>"
+            + "".join(f"<category term=\"{_attr(name)}\"/>" for name in tags)
+            + "</entry>"
+        )
+        return rss, atom
+
+    async def _refresh_feeds(self, db: AsyncSession):
+        result = await db.execute(
+            select(Article.id, Article.updated_at)
+            .where(Article.status == ArticleStatus.PUBLISHED)
+            .order_by(Article.created_at.desc(), Article.id.desc())
+            .limit(settings.feed_item_count)
+        )
+        latest = [(article_id, updated_at) for article_id, updated_at in result.all()]
+        if latest == self._feed_signature and "feed.xml" in self._docs:
+            return
+
+        missing = [article_id for article_id, updated_at in latest if (article_id, updated_at) not in self._entries]
+        if missing:
+            result = await db.execute(
+                select(Article)
+                .where(Article.id.in_(missing))
+                .options(
+                    load_only(Article.id, Article.title, Article.summary, Article.created_at,
+                              Article.published_at, Article.updated_at),
+                    selectinload(Article.author),
+                    selectinload(Article.tags).selectinload(ArticleTag.tag),
+                )
+            )
+            for article in result.scalars().all():
+                self._entries[(article.id, article.updated_at)] = self._render_entry(article)
+        # 只保留当前仍在订阅源中的片段
+        self._entries = {key: self._entries[key] for key in latest if key in self._entries}
+
+        entries = [self._entries[key] for key in latest if key in self._entries]
+        updated = max((updated_at for _, updated_at in latest), default=None)
+        site = escape(settings.frontend_url.rstrip("/"))
+        name = escape(settings.app_name)
+        rss = (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom"><channel>'
+            f"<title>{name}</title><link>{site}/</link><description>{name}</description>"
+            f'<atom:link href="{site}/feed.xml" rel="self" type="application/rss+xml"/>'
+            + (f"<lastBuildDate>{_rfc822(updated)}</lastBuildDate>" if updated else "")
+            + "".join(rss_item for rss_item, _ in entries)
+            + "</channel></rss>\n"
+        )
+        atom = (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<feed xmlns="http://www.w3.org/2005/Atom">'
+            f'<title>{name}</title><id>{site}/</id><link href="{site}/"/>'
+            f'<link href="{site}/atom.xml" rel="self"/>'
+            f"<updated>{_rfc3339(updated or datetime.now(timezone.utc))}</updated>"
+            + "".join(atom_entry for _, atom_entry in entries)
+            + "</feed>\n"
+        )
+        self._docs["feed.xml"] = _make_document(rss, updated)
+        self._docs["atom.xml"] = _make_document(atom, updated)
+        self._feed_signature = latest
+
+    # ---------- sitemap ----------
+
+    async def _refresh_sitemaps(self, db: AsyncSession):
+        bucket = (Article.id // SITEMAP_MAX_URLS).label("bucket")
+        result = await db.execute(
+            select(bucket, func.count(), func.max(Article.updated_at), func.sum(Article.id))
+            .where(Article.status == ArticleStatus.PUBLISHED)
+            .group_by(bucket)
+        )
+        signatures = {int(b): (count, last, total) for b, count, last, total in result.all()}
+        changed = [b for b, signature in signatures.items() if self._buckets.get(b, (None,))[0] != signature]
+        if not changed and set(signatures) == set(self._buckets) and "sitemap.xml" in self._docs:
+            return
+
+        for b in changed:
+            result = await db.execute(
+                select(Article.id, Article.updated_at)
+                .where(
+                    Article.status == ArticleStatus.PUBLISHED,
+                    Article.id >= b * SITEMAP_MAX_URLS,
+                    Article.id < (b + 1) * SITEMAP_MAX_URLS,
+                )
+                .order_by(Article.id)
+            )
+            urls = "".join(
+                f"<url><loc>{escape(_article_url(article_id))}</loc><lastmod>{_rfc3339(updated_at)}</lastmod></url>"
+                for article_id, updated_at in result.all()
+            )
+            self._buckets[b] = (signatures[b], urls)
+        for b in set(self._buckets) - set(signatures):
+            del self._buckets[b]
+
+        # 首页放在 0 号桶（id 从 1 开始，该桶最多 49999 篇文章）
+        home = f"<url><loc>{escape(settings.frontend_url.rstrip('/'))}/</loc></url>"
+        header = '<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+        footer = "</urlset>\n"
+        total = sum(signature[0] for signature, _ in self._buckets.values()) + 1
+        last_modified = max((signature[1] for signature, _ in self._buckets.values()), default=None)
+        chunk_docs = {name: doc for name, doc in self._docs.items() if name.startswith("sitemap-")}
+
+        if total <= SITEMAP_MAX_URLS:
+            body = header + home + "".join(urls for _, (_, urls) in sorted(self._buckets.items())) + footer
+            self._docs["sitemap.xml"] = _make_document(body, last_modified)
+            for name in chunk_docs:
+                del self._docs[name]
+            return
+
+        site = escape(settings.frontend_url.rstrip("/"))
+        for b in changed:
+            urls = (home if b == 0 else "") + self._buckets[b][1]
+            self._docs[f"sitemap-{b}.xml"] = _make_document(header + urls + footer, self._buckets[b][0][1])
+        for b, (signature, urls) in self._buckets.items():
+            # 由单文件切换为索引时，未变化的桶也需要生成子文件
+            if f"sitemap-{b}.xml" not in self._docs:
+                body = header + (home if b == 0 else "") + urls + footer
+                self._docs[f"sitemap-{b}.xml"] = _make_document(body, signature[1])
+        for name in chunk_docs:
+            if int(name[len("sitemap-"):-len(".xml")]) not in self._buckets:
+                del self._docs[name]
+        index: List[str] = [
+            f"<sitemap><loc>{site}/sitemap-{b}.xml</loc><lastmod>{_rfc3339(signature[1])}</lastmod></sitemap>"
+            for b, (signature, _) in sorted(self._buckets.items())
+        ]
+        body = (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+            + "".join(index)
+            + "</sitemapindex>\n"
+        )
+        self._docs["sitemap.xml"] = _make_document(body, last_modified)
+
+
+# 实例化
+site_feeds = SiteFeeds()
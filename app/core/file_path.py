@@ -5,6 +5,8 @@ from app.models.user import User
 
 BASE_DIR = Path(__file__).resolve().parents[2]
 UPLOAD_DIR = BASE_DIR / "uploads"
+# 内容寻址存储：uploads/blobs/<sha[0:2]>/<sha[2:4]>/<sha256><ext>，经 /uploads/ 静态路径访问
+BLOB_DIR = UPLOAD_DIR / "blobs"
 
 TYPE_DIRS = {
     "image": "images",
@@ -39,6 +41,12 @@ def get_save_path(current_user: User, file_type: str, filename: str) -> tuple[Pa
     return save_dir, file_url
 
 
+def get_blob_location(sha256: str, ext: str) -> tuple[Path, str]:
+    """返回 (本地路径, URL)；两级目录分片，避免单目录文件过多"""
+    relative = f"blobs/{sha256[:2]}/{sha256[2:4]}/{sha256}{ext.lower()}"
+    return UPLOAD_DIR / relative, f"/uploads/{relative}"
+
+
 def get_file_path_from_url(url: str) -> Path:
     if url.startswith("/uploads/"):
         relative_path = url[len("/uploads/"):]
@@ -0,0 +1,216 @@
+import asyncio
+import mimetypes
+import os
+import secrets
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+from urllib.parse import quote
+
+from fastapi import Request, Response
+from starlette.types import Receive, Scope, Send
+
+from app.core.http_cache import CACHE_MEDIA, _as_utc, is_not_modified, validator_headers
+
+'''
+本地文件下载（RFC 7233 Range 请求）
+
+    Range: bytes=a-b, c-, -n    单个区间返回 206 + Content-Range，多个区间返回 multipart/byteranges
+    If-Range                    校验器（强 ETag 或 Last-Modified）不匹配时忽略 Range，返回完整 200
+    不可满足的区间               416 + Content-Range: bytes */size
+区间按起点排序并合并重叠 / 相邻的部分，超过 MAX_RANGES 个时视为滥用，直接返回完整文件。
+
+文件内容的发送：ASGI 服务器声明 http.response.zerocopysend 扩展时交给服务器 os.sendfile 零拷贝发送；
+否则在线程池里 os.pread 分块读取（不移动文件偏移），块大小从 MIN_CHUNK_SIZE 起逐块翻倍到 MAX_CHUNK_SIZE，
+首块小以便尽快出首字节，大文件的后续块大以减少线程切换和 send 次数。
+'''
+
+MAX_RANGES = 16
+MIN_CHUNK_SIZE = 64 * 1024
+MAX_CHUNK_SIZE = 1024 * 1024
+
+ByteRange = Tuple[int, int]
+
+
+def parse_range(header: str, size: int) -> Optional[List[ByteRange]]:
+    """
+    解析 Range 头，返回合并后的闭区间 [(start, end)]
+
+    None 表示应忽略 Range（语法错误 / 单位不支持 / 区间过多），[] 表示没有可满足的区间
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or not spec.replace(",", "").strip():
+        return None
+    ranges: List[ByteRange] = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        first, sep, last = part.partition("-")
+        first, last = first.strip(), last.strip()
+        if not sep or not (first or last):
+            return None
+        try:
+            if first:
+                start = int(first)
+                end = int(last) if last else None
+                if end is not None and end < start:
+                    return None
+                if start >= size:
+                    continue
+                end = size - 1 if end is None else min(end, size - 1)
+            else:
+                # 后缀区间：最后 n 个字节
+                suffix = int(last)
+                if suffix <= 0 or size == 0:
+                    continue
+                start, end = max(size - suffix, 0), size - 1
+        except ValueError:
+            return None
+        ranges.append((start, end))
+    if len(ranges) > MAX_RANGES:
+        return None
+
+    merged: List[ByteRange] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _if_range_matches(request: Request, etag: str, last_modified: datetime) -> bool:
+    """If-Range 只接受强校验：ETag 逐字节相等，或 Last-Modified 精确相等"""
+    if_range = request.headers.get("if-range")
+    if if_range is None:
+        return True
+    if_range = if_range.strip()
+    if if_range.startswith('"') or if_range.startswith("W/"):
+        return not etag.startswith("W/") and if_range == etag
+    try:
+        return _as_utc(parsedate_to_datetime(if_range)) == _as_utc(last_modified)
+    except (TypeError, ValueError):
+        return False
+
+
+def content_disposition(disposition: str, filename: str) -> str:
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"{disposition}; filename*=utf-8''{quoted}"
+    return f'{disposition}; filename="{filename}"'
+
+
+class RangeFileResponse(Response):
+    '''按区间发送文件；parts 为 [(分段头, start, end)]，多段时末尾追加 trailer（结束分隔符）'''
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        parts: List[Tuple[bytes, int, int]],
+        status_code: int,
+        headers: dict,
+        media_type: str,
+        trailer: bytes = b"",
+    ):
+        self.path = path
+        self.parts = parts
+        self.trailer = trailer
+        self.status_code = status_code
+        self.media_type = media_type
+        self.background = None
+        self.init_headers(headers)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        zerocopy = "http.response.zerocopysend" in scope.get("extensions", {})
+        file = await asyncio.to_thread(open, self.path, "rb")
+        try:
+            for head, start, end in self.parts:
+                if head:
+                    await send({"type": "http.response.body", "body": head, "more_body": True})
+                if zerocopy:
+                    await send({
+                        "type": "http.response.zerocopysend",
+                        "file": file,
+                        "offset": start,
+                        "count": end - start + 1,
+                        "more_body": True,
+                    })
+                else:
+                    await self._send_chunks(send, file.fileno(), start, end)
+        finally:
+            await asyncio.to_thread(file.close)
+        await send({"type": "http.response.body", "body": self.trailer, "more_body": False})
+
+    @staticmethod
+    async def _send_chunks(send: Send, fd: int, start: int, end: int):
+        offset, chunk_size = start, MIN_CHUNK_SIZE
+        while offset <= end:
+            chunk = await asyncio.to_thread(os.pread, fd, min(chunk_size, end - offset + 1), offset)
+            if not chunk:
+                # 文件在发送过程中被截断
+                break
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            offset += len(chunk)
+            chunk_size = min(chunk_size * 2, MAX_CHUNK_SIZE)
+
+
+async def file_response(
+    request: Request,
+    path: Union[str, Path],
+    media_type: Optional[str] = None,
+    filename: Optional[str] = None,
+    disposition: str = "inline",
+    cache_control: str = CACHE_MEDIA,
+) -> Response:
+    """返回支持条件请求和 Range 的文件响应（200 / 206 / 304 / 416）"""
+    stat = await asyncio.to_thread(os.stat, path)
+    size = stat.st_size
+    etag = f'"{stat.st_mtime_ns:x}-{size:x}"'
+    last_modified = datetime.fromtimestamp(stat.st_mtime, timezone.utc)
+    media_type = media_type or mimetypes.guess_type(str(path))[0] or "application/octet-stream"
+
+    headers = validator_headers(etag, cache_control, last_modified)
+    headers["Accept-Ranges"] = "bytes"
+    if filename:
+        headers["Content-Disposition"] = content_disposition(disposition, filename)
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+
+    ranges = None
+    range_header = request.headers.get("range")
+    if range_header and _if_range_matches(request, etag, last_modified):
+        ranges = parse_range(range_header, size)
+
+    if ranges is None:
+        headers["Content-Length"] = str(size)
+        return RangeFileResponse(path, [(b"", 0, size - 1)] if size else [], 200, headers, media_type)
+
+    if not ranges:
+        headers["Content-Range"] = f"bytes */{size}"
+        return Response(status_code=416, headers=headers)
+
+    if len(ranges) == 1:
+        start, end = ranges[0]
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        headers["Content-Length"] = str(end - start + 1)
+        return RangeFileResponse(path, [(b"", start, end)], 206, headers, media_type)
+
+    boundary = secrets.token_hex(16)
+    parts = []
+    for i, (start, end) in enumerate(ranges):
+        # 每段之前是分隔符和段头，段与段之间以 CRLF 分开
+        head = (
+            f"--{boundary}\r\nContent-Type: {media_type}\r\n"
+            f"Content-Range: bytes {start}-{end}/{size}\r\n\r\n"
+        )
+        parts.append((("\r\n" + head if i else head).encode("latin-1"), start, end))
+    trailer = f"\r\n--{boundary}--\r\n".encode("latin-1")
+    headers["Content-Length"] = str(
+        sum(len(head) + end - start + 1 for head, start, end in parts) + len(trailer)
+    )
+    return RangeFileResponse(
+        path, parts, 206, headers, f"multipart/byteranges; boundary={boundary}", trailer=trailer
+    )
@@ -0,0 +1,112 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+from fastapi import Request, Response
+
+from app.core.serialization import PreEncodedJSONResponse, dump_json
+
+'''
+条件请求（ETag / Last-Modified / 304）与 Cache-Control
+
+两种校验器来源：
+    元数据：由 updated_at、评论数、列表代数等廉价字段拼出 ETag，命中时不需要加载关联对象
+    响应体：对序列化后的 JSON 求哈希（标签、搜索等没有合适元数据的接口）
+含实时浏览量的文章接口使用弱 ETag（W/），浏览量不参与校验。
+'''
+
+# 各路由的缓存策略
+CACHE_ARTICLE_DETAIL = "public, max-age=60, stale-while-revalidate=300"
+CACHE_ARTICLE_LIST = "public, max-age=30, stale-while-revalidate=60"
+CACHE_TAGS = "public, max-age=300, stale-while-revalidate=600"
+CACHE_SEARCH = "public, max-age=30"
+CACHE_TRENDING = "public, max-age=60"
+CACHE_RELATED = "public, max-age=300"
+CACHE_FEED = "public, max-age=300, stale-while-revalidate=3600"
+# 媒体文件名唯一且内容不会改变
+CACHE_MEDIA = "public, max-age=86400"
+
+
+def make_etag(*parts: Any, weak: bool = False) -> str:
+    raw = "|".join("" if part is None else str(part) for part in parts)
+    digest = hashlib.sha1(raw.encode("utf-8")).hexdigest()
+    return f'W/"{digest}"' if weak else f'"{digest}"'
+
+
+def _as_utc(value: datetime) -> datetime:
+    # 数据库中的时间没有时区信息，按 UTC 处理；HTTP 日期精度为秒
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).replace(microsecond=0)
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """If-None-Match 使用弱比较"""
+    if header.strip() == "*":
+        return True
+    target = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == target for tag in header.split(","))
+
+
+def accepts_gzip(request: Request) -> bool:
+    """解析 Accept-Encoding（含 q 值）：gzip;q=0 表示拒绝，未列出 gzip 时看 *"""
+    qualities: Dict[str, float] = {}
+    for item in request.headers.get("accept-encoding", "").split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding] = quality
+    for coding in ("gzip", "x-gzip", "*"):
+        if coding in qualities:
+            return qualities[coding] > 0
+    return False
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """按 RFC 7232：有 If-None-Match 时忽略 If-Modified-Since"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return _as_utc(last_modified) <= _as_utc(since)
+    return False
+
+
+def validator_headers(etag: str, cache_control: str, last_modified: Optional[datetime] = None) -> dict:
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(_as_utc(last_modified), usegmt=True)
+    return headers
+
+
+def set_validators(response: Response, etag: str, cache_control: str, last_modified: Optional[datetime] = None):
+    """把校验器写到 FastAPI 注入的 Response 上（正常 200 响应）"""
+    response.headers.update(validator_headers(etag, cache_control, last_modified))
+
+
+def not_modified(etag: str, cache_control: str, last_modified: Optional[datetime] = None) -> Response:
+    return Response(status_code=304, headers=validator_headers(etag, cache_control, last_modified))
+
+
+def conditional_json(request: Request, payload: Any, cache_control: str) -> Response:
+    """按响应体哈希生成强 ETag，匹配时返回 304，否则直接返回已序列化的 JSON"""
+    body = dump_json(payload)
+    etag = f'"{hashlib.sha1(body).hexdigest()}"'
+    if is_not_modified(request, etag):
+        return not_modified(etag, cache_control)
+    return PreEncodedJSONResponse(body, headers=validator_headers(etag, cache_control))
@@ -0,0 +1,196 @@
+import asyncio
+import functools
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import async_session
+from app.core.file_path import UPLOAD_DIR, get_file_path_from_url
+from app.models.media import MediaDerivative
+from app.utils.image_variants import render_variants
+
+logger = logging.getLogger(__name__)
+
+# 可生成衍生版本的原图扩展名 -> 客户端不支持新格式时回退的格式
+IMAGE_SUFFIXES = {
+    ".jpg": "jpeg",
+    ".jpeg": "jpeg",
+    ".png": "png",
+    ".webp": "jpeg",
+    ".avif": "jpeg",
+    ".bmp": "jpeg",
+    ".tif": "jpeg",
+    ".tiff": "jpeg",
+}
+
+
+class ImageVariants:
+    '''
+    图片衍生版本（缩放 + WebP / AVIF）
+
+    文件与原图放在同一目录：<原文件名>.w<宽度>.<格式>，同时记录到 media_derivative（source_url = MediaFile.url），
+    原文件被删除（blob 回收 / 旧文件删除）时由 purge() 一起删除。
+    生成在进程池中执行（spawn，子进程只导入 app.utils.image_variants）：
+        上传后：MEDIA_IMAGE_EAGER=true 时在后台生成全部 宽度 × 格式
+        请求时：缺少的版本按需生成，同一目标的并发请求只生成一次
+    请求的宽度向上取到最近的档位，格式按 Accept 协商，避免任意参数生成大量文件。
+    '''
+
+    def __init__(self):
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pending: Dict[str, asyncio.Task] = {}
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=max(1, settings.media_image_workers),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._pool
+
+    async def _run(self, source: str, variants: List[Tuple[str, int, str]]):
+        loop = asyncio.get_running_loop()
+        job = functools.partial(render_variants, source, variants, settings.media_image_quality)
+        try:
+            return await loop.run_in_executor(self._get_pool(), job)
+        except BrokenProcessPool:
+            logger.warning("图片处理进程池已损坏，重建后重试")
+            self.shutdown()
+            return await loop.run_in_executor(self._get_pool(), job)
+
+    @staticmethod
+    def is_image(path: Path) -> bool:
+        return path.suffix.lower() in IMAGE_SUFFIXES
+
+    @staticmethod
+    def fit_width(width: int) -> int:
+        """取不小于 width 的最小档位，超过最大档位时取最大档位"""
+        widths = sorted(settings.media_image_widths)
+        return next((w for w in widths if w >= width), widths[-1])
+
+    @staticmethod
+    def negotiate(accept: str, source: Path) -> str:
+        """按配置的优先级选择客户端明确接受（q > 0）的格式，都不接受时回退到与原图相近的格式"""
+        accepted = set()
+        for part in accept.lower().split(","):
+            media_type, *params = part.split(";")
+            quality = 1.0
+            for param in params:
+                name, _, value = param.strip().partition("=")
+                if name == "q":
+                    try:
+                        quality = float(value)
+                    except ValueError:
+                        quality = 0.0
+            if quality > 0:
+                accepted.add(media_type.strip())
+        for fmt in settings.media_image_formats:
+            if f"image/{fmt}" in accepted:
+                return fmt
+        return IMAGE_SUFFIXES.get(source.suffix.lower(), "jpeg")
+
+    @staticmethod
+    def variant_path(source: Path, width: int, fmt: str) -> Path:
+        return source.with_name(f"{source.name}.w{width}.{fmt}")
+
+    async def ensure(self, source_url: str, source: Path, width: int, fmt: str) -> Optional[Path]:
+        """返回指定版本的路径，不存在时生成；原图无法处理时返回 None"""
+        target = self.variant_path(source, width, fmt)
+        if await asyncio.to_thread(target.exists):
+            return target
+        produced = await self._render(source_url, source, [(target, width, fmt)])
+        return target if produced else None
+
+    async def generate(self, source_url: str, source: Path) -> int:
+        """生成全部 宽度 × 格式 中尚不存在的版本，返回生成数量（上传后的后台任务）"""
+        variants = [
+            (self.variant_path(source, width, fmt), width, fmt)
+            for width in sorted(settings.media_image_widths)
+            for fmt in settings.media_image_formats
+        ]
+        missing = [v for v in variants if not await asyncio.to_thread(v[0].exists)]
+        if not missing:
+            return 0
+        try:
+            return len(await self._render(source_url, source, missing))
+        except Exception as e:
+            logger.error(f"生成图片衍生版本失败: {source_url} -> {e}")
+            return 0
+
+    async def _render(self, source_url: str, source: Path, variants: Sequence[Tuple[Path, int, str]]):
+        key = "|".join(str(target) for target, _, _ in variants)
+        task = self._pending.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._render_and_record(source_url, source, variants))
+            self._pending[key] = task
+            task.add_done_callback(lambda _: self._pending.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _render_and_record(self, source_url: str, source: Path, variants: Sequence[Tuple[Path, int, str]]):
+        produced = await self._run(str(source), [(str(target), width, fmt) for target, width, fmt in variants])
+        if not produced:
+            return []
+        sizes = dict(produced)
+        rows = [
+            {
+                "source_url": source_url,
+                "width": width,
+                "format": fmt,
+                "path": target.relative_to(UPLOAD_DIR).as_posix(),
+                "size": sizes[str(target)],
+            }
+            for target, width, fmt in variants if str(target) in sizes
+        ]
+        dialect_insert = pg_insert if settings.is_postgres else sqlite_insert
+        statement = dialect_insert(MediaDerivative)
+        async with async_session() as db:
+            await db.execute(
+                statement.on_conflict_do_update(
+                    index_elements=["source_url", "width", "format"],
+                    set_={"size": statement.excluded.size, "updated_at": func.now()},
+                ),
+                rows,
+            )
+            await db.commit()
+            # 生成期间原文件被删除：清理刚写入的版本，避免留下孤儿文件
+            if not await asyncio.to_thread(source.exists):
+                await self.purge(db, [source_url])
+                await db.commit()
+                return []
+        return produced
+
+    async def purge(self, db: AsyncSession, source_urls: Iterable[str]) -> int:
+        """删除原文件对应的全部衍生版本（记录 + 文件），不提交"""
+        urls = [url for url in source_urls if url]
+        if not urls:
+            return 0
+        await db.execute(delete(MediaDerivative).where(MediaDerivative.source_url.in_(urls)))
+
+        def unlink() -> int:
+            removed = 0
+            # 按文件名匹配同目录下的全部版本，包括记录写入失败的文件
+            for url in urls:
+                source = get_file_path_from_url(url)
+                for path in source.parent.glob(f"{source.name}.w*"):
+                    path.unlink(missing_ok=True)
+                    removed += 1
+            return removed
+        return await asyncio.to_thread(unlink)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+# 实例化
+image_variants = ImageVariants()
@@ -0,0 +1,119 @@
+import base64
+import hashlib
+import hmac
+import time
+from pathlib import Path
+from typing import Optional
+from urllib.parse import quote, urlencode
+
+from fastapi import Request, Response
+
+from app.core.config import settings
+from app.core.file_path import UPLOAD_DIR
+from app.core.file_response import content_disposition, file_response
+from app.core.http_cache import CACHE_MEDIA
+
+SIGNED_MEDIA_PREFIX = "/api/v1/media/"
+
+
+class MediaSigner:
+    '''
+    签名媒体链接
+
+        /api/v1/media/<相对 uploads 的路径>?exp=<过期时间戳，0 为不过期>&sig=<签名>[&dl=<下载文件名>][&w=<图片宽度>]
+        sig = base64url(HMAC-SHA256(key, "路径\\n过期时间\\n下载文件名"))[:32]
+
+    校验只做一次 HMAC，不查数据库、不访问磁盘；通过后：
+        MEDIA_X_ACCEL=true   返回空响应 + X-Accel-Redirect，由 nginx 的 internal location 直接发送文件（sendfile / Range）
+        MEDIA_X_ACCEL=false  开发环境由 file_response 在进程内发送
+    '''
+    SIGNATURE_LENGTH = 32
+
+    @property
+    def _key(self) -> bytes:
+        return (settings.media_signing_key or settings.secret_key).encode("utf-8")
+
+    def _signature(self, relative: str, exp: int, dl: str) -> str:
+        message = f"{relative}\n{exp}\n{dl}".encode("utf-8")
+        digest = hmac.new(self._key, message, hashlib.sha256).digest()
+        return base64.urlsafe_b64encode(digest).decode("ascii")[:self.SIGNATURE_LENGTH]
+
+    def sign(
+        self,
+        url: str,
+        download_name: Optional[str] = None,
+        ttl: Optional[int] = None,
+        width: Optional[int] = None,
+    ) -> str:
+        """
+        把 /uploads/ 下的文件地址转为签名链接；其他地址（前端静态目录）原样返回
+
+        width 请求图片衍生版本（不参与签名，服务端只会取到配置的档位）
+        """
+        if not url.startswith("/uploads/"):
+            return url
+        relative = url[len("/uploads/"):]
+        ttl = settings.media_url_ttl if ttl is None else ttl
+        exp = int(time.time()) + ttl if ttl > 0 else 0
+        dl = download_name or ""
+        params = {"exp": exp, "sig": self._signature(relative, exp, dl)}
+        if dl:
+            params["dl"] = dl
+        if width:
+            params["w"] = width
+        return f"{SIGNED_MEDIA_PREFIX}{quote(relative)}?{urlencode(params)}"
+
+    def verify(self, relative: str, exp: int, sig: str, dl: str = "") -> bool:
+        if exp and exp < time.time():
+            return False
+        return hmac.compare_digest(self._signature(relative, exp, dl), sig)
+
+    @staticmethod
+    def resolve(relative: str) -> Optional[Path]:
+        """相对路径转为 uploads 下的本地路径，越界（..、绝对路径）时返回 None"""
+        path = (UPLOAD_DIR / relative).resolve()
+        if not path.is_relative_to(UPLOAD_DIR.resolve()):
+            return None
+        return path
+
+    async def serve(
+        self,
+        request: Request,
+        path: Path,
+        exp: int = 0,
+        media_type: Optional[str] = None,
+        download_name: Optional[str] = None,
+        vary: Optional[str] = None,
+    ) -> Response:
+        """发送 uploads 下的文件：启用 X-Accel 时交给 nginx，否则进程内发送"""
+        if exp:
+            cache_control = f"private, max-age={max(exp - int(time.time()), 0)}"
+        else:
+            cache_control = CACHE_MEDIA
+        disposition = "attachment" if download_name else "inline"
+
+        if settings.media_x_accel:
+            relative = path.resolve().relative_to(UPLOAD_DIR.resolve()).as_posix()
+            # 未指定 media_type 时不设置 Content-Type，由 nginx 按扩展名决定
+            headers = {
+                "X-Accel-Redirect": f"{settings.media_x_accel_prefix}{quote(relative)}",
+                "Cache-Control": cache_control,
+            }
+            if media_type:
+                headers["Content-Type"] = media_type
+            if download_name:
+                headers["Content-Disposition"] = content_disposition(disposition, download_name)
+            if vary:
+                headers["Vary"] = vary
+            return Response(headers=headers)
+
+        response = await file_response(
+            request, path, media_type, download_name, disposition=disposition, cache_control=cache_control
+        )
+        if vary:
+            response.headers["Vary"] = vary
+        return response
+
+
+# 实例化
+media_signer = MediaSigner()
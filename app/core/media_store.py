@@ -0,0 +1,143 @@
+import asyncio
+import logging
+import os
+import time
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from sqlalchemy import bindparam, delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.file_path import BLOB_DIR, UPLOAD_DIR, get_blob_location
+from app.core.image_variants import image_variants
+from app.models.media import MediaBlob
+from app.utils.file_ops import hash_upload, save_upload_stream
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StoredBlob:
+    sha256: str
+    size: int
+    url: str
+    path: Path
+    refcount: int
+    # 本次上传是否写了磁盘（False 表示命中已有内容）
+    written: bool
+
+
+class MediaStore:
+    '''
+    内容寻址的媒体存储
+
+    文件按 SHA-256 存放在 uploads/blobs/<2>/<2>/ 下，media_blob 记录引用计数，MediaFile.blob_sha256 引用它：
+        上传：先只读一遍计算哈希；内容已在磁盘上时不再写入，只做 upsert（refcount + 1）和插入 MediaFile
+        删除：refcount - 1，归零的 blob 由 collect() 回收（删行与删文件在同一事务内，先删文件后提交）
+    与回收并发的上传在提交后调用 ensure_stored()：refcount 为 1（新建 / 复活）且文件已被回收时重新写入。
+    '''
+    # 超过该时长的 .part 临时文件视为中断上传的残留
+    TEMP_MAX_AGE = 3600
+
+    @staticmethod
+    def _insert():
+        return pg_insert if settings.is_postgres else sqlite_insert
+
+    async def acquire(self, db: AsyncSession, file, max_size: int) -> StoredBlob:
+        """保存上传内容并增加引用计数（不提交）；超过 max_size 抛出 UploadTooLarge"""
+        sha256, size = await hash_upload(file, max_size)
+        ext = os.path.splitext(file.filename or "")[1]
+        relative = await db.scalar(select(MediaBlob.path).where(MediaBlob.sha256 == sha256))
+        if relative is None:
+            path, _ = get_blob_location(sha256, ext)
+            relative = path.relative_to(UPLOAD_DIR).as_posix()
+        path = UPLOAD_DIR / relative
+
+        written = False
+        if not await asyncio.to_thread(path.exists):
+            await save_upload_stream(file, path.parent, path.name, max_size)
+            written = True
+
+        result = await db.execute(
+            self._insert()(MediaBlob)
+            .values(sha256=sha256, size=size, path=relative, refcount=1)
+            .on_conflict_do_update(
+                index_elements=["sha256"],
+                set_={"refcount": MediaBlob.refcount + 1, "updated_at": func.now()},
+            )
+            .returning(MediaBlob.refcount, MediaBlob.path)
+        )
+        refcount, stored_relative = result.one()
+        if stored_relative != relative:
+            # 并发上传以另一个扩展名先插入了记录：以已有记录为准，丢弃本次写入的文件
+            if written:
+                await asyncio.to_thread(path.unlink, missing_ok=True)
+            relative, path, written = stored_relative, UPLOAD_DIR / stored_relative, False
+        return StoredBlob(
+            sha256=sha256, size=size, url=f"/uploads/{relative}", path=path, refcount=refcount, written=written,
+        )
+
+    async def ensure_stored(self, file, blob: StoredBlob, max_size: int):
+        """提交后调用：首个引用对应的文件若在此期间被回收，则重新写入"""
+        if blob.refcount != 1 or await asyncio.to_thread(blob.path.exists):
+            return
+        await file.seek(0)
+        await save_upload_stream(file, blob.path.parent, blob.path.name, max_size)
+        blob.written = True
+
+    async def release(self, db: AsyncSession, sha256s: Iterable[Optional[str]]):
+        """减少引用计数（不提交）；同一 blob 出现多次时按次数扣减"""
+        counts = Counter(sha for sha in sha256s if sha)
+        if not counts:
+            return
+        # Core 批量 UPDATE（executemany），不经过 ORM 的按主键批量更新
+        connection = await db.connection()
+        await connection.execute(
+            update(MediaBlob)
+            .where(MediaBlob.sha256 == bindparam("blob_sha256"))
+            .values(refcount=MediaBlob.refcount - bindparam("amount")),
+            [{"blob_sha256": sha, "amount": amount} for sha, amount in counts.items()],
+        )
+
+    async def collect(self, db: AsyncSession, sha256s: Optional[Iterable[Optional[str]]] = None) -> int:
+        """回收引用计数归零的 blob（可限定范围）并提交，返回回收数量"""
+        query = delete(MediaBlob).where(MediaBlob.refcount <= 0)
+        if sha256s is not None:
+            wanted = [sha for sha in sha256s if sha]
+            if not wanted:
+                return 0
+            query = query.where(MediaBlob.sha256.in_(wanted))
+        result = await db.execute(query.returning(MediaBlob.path))
+        paths: List[str] = list(result.scalars().all())
+        for relative in paths:
+            # 先删文件再提交：并发上传的 upsert 会等待本事务结束，之后看到的是“已回收”状态
+            await asyncio.to_thread((UPLOAD_DIR / relative).unlink, missing_ok=True)
+        await image_variants.purge(db, [f"/uploads/{relative}" for relative in paths])
+        await db.commit()
+        if paths:
+            logger.info(f"回收媒体文件 {len(paths)} 个")
+        return len(paths)
+
+    async def sweep_temp_files(self) -> int:
+        """清理中断上传留下的 .part 临时文件"""
+        def sweep() -> int:
+            removed = 0
+            cutoff = time.time() - self.TEMP_MAX_AGE
+            for path in BLOB_DIR.glob("*/*/.*.part"):
+                try:
+                    if path.stat().st_mtime < cutoff:
+                        path.unlink()
+                        removed += 1
+                except FileNotFoundError:
+                    continue
+            return removed
+        return await asyncio.to_thread(sweep)
+
+
+# 实例化
+media_store = MediaStore()
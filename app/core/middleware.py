@@ -27,13 +27,16 @@ PUBLIC_PATHS = {
     "/set-flash","/show","/admin/somepage",
     "/api/v1/auth/login", "/api/v1/auth/register", "/api/v1/auth/config",
     "/api/v1/auth/refresh", "/api/v1/auth/forgot-password", "/api/v1/auth/reset-password",
-    "/api/v1/auth/send-verification-code", "/api/v1/notifications", "/api/v1/tags/popular"
+    "/api/v1/auth/send-verification-code", "/api/v1/notifications", "/api/v1/tags/popular",
+    "/feed.xml", "/atom.xml", "/sitemap.xml"
 }
 
 PREFIX_PATHS = [
     "/uploads/", "/wss/ws", "/static", "/statics",
     "/api/v1/search/", "/api/v1/oauth/", "/api/v1/config/", "/api/v1/donation/","/api/v1/admin/",
-    "/api/v1/articles/images/", "/api/v1/articles/videos/", "/api/v1/articles/pdfs/", "/api/v1/articles/media/list"
+    "/api/v1/articles/images/", "/api/v1/articles/videos/", "/api/v1/articles/pdfs/", "/api/v1/articles/media/list",
+    "/api/v1/media/",
+    "/sitemap-"
 ]
 
 
@@ -68,6 +71,10 @@ class AuthMiddleware(BaseHTTPMiddleware):
                     return True
                 if path.startswith("/api/v1/articles/") and path.endswith("/comments") and len(path.split("/")) == 6:
                     return True
+                if path.startswith("/api/v1/articles/") and path.endswith("/comments/tree") and len(path.split("/")) == 7:
+                    return True
+                if path.startswith("/api/v1/articles/") and path.endswith("/related") and len(path.split("/")) == 6:
+                    return True
                 if path.startswith("/api/v1/tags"):
                     return True
 
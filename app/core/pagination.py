@@ -0,0 +1,115 @@
+# app/core/pagination.py
+import base64
+from datetime import datetime, timezone
+from typing import Any, Callable, Optional, Sequence, Tuple, TypeVar
+
+from sqlalchemy import String, and_, literal, or_
+from sqlalchemy.sql import Select
+
+from app.core.config import settings
+from app.core.exceptions import ValidationError
+from app.schemas.pagination import CursorPage
+
+T = TypeVar("T")
+SelectT = TypeVar("SelectT", bound=Select)
+
+'''
+基于 (created_at, id) 的游标（keyset）分页
+
+游标是 "<created_at ISO>|<id>" 的 urlsafe base64，对调用方不透明。
+按 created_at DESC, id DESC 排序，下一页条件为
+    created_at < :ts OR (created_at = :ts AND id < :id)
+可以直接走 (created_at, id) 上的索引，第 500 页和第 1 页代价相同。
+
+接口约定：不传 cursor 时保持原有 offset 分页和列表响应；
+传 cursor（第一页传空字符串）时返回 CursorPage {items, next_cursor}。
+每页多取一条：取到第 limit + 1 条才说明还有下一页，这一条不返回。
+'''
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, int]]:
+    """解析游标；None / 空字符串表示第一页"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+        ts, row_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(ts), int(row_id)
+    except Exception:
+        raise ValidationError("Invalid cursor")
+
+
+def _bind_timestamp(ts: datetime) -> Any:
+    """
+    SQLite 中 server_default 写入的时间是 'YYYY-MM-DD HH:MM:SS' 文本，
+    而 SQLAlchemy 绑定 datetime 会带上 '.000000'，按文本比较会错位，
+    因此在 SQLite 下按存储格式绑定字符串。
+    """
+    if settings.is_postgres:
+        return ts
+    text_ts = ts.strftime("%Y-%m-%d %H:%M:%S")
+    if ts.microsecond:
+        text_ts += f".{ts.microsecond:06d}"
+    return text_ts
+
+
+def timestamp_param(ts: datetime) -> Any:
+    """ORM 查询中与 server_default 时间列比较的参数（SQLite 下带时区的时间先转为 UTC 文本）"""
+    if settings.is_postgres:
+        return ts
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return literal(_bind_timestamp(ts), String)
+
+
+def apply_keyset(
+    query: SelectT, created_col: Any, id_col: Any, cursor: Optional[str], limit: int, ascending: bool = False
+) -> SelectT:
+    """给 ORM 查询加上 seek 条件、排序和 limit + 1（ascending=True 时按时间正序翻页）"""
+    position = decode_cursor(cursor)
+    if position is not None:
+        ts, row_id = position
+        ts_value = timestamp_param(ts)
+        if ascending:
+            query = query.where(
+                or_(created_col > ts_value, and_(created_col == ts_value, id_col > row_id))
+            )
+        else:
+            query = query.where(
+                or_(created_col < ts_value, and_(created_col == ts_value, id_col < row_id))
+            )
+    if ascending:
+        return query.order_by(created_col.asc(), id_col.asc()).limit(limit + 1)
+    return query.order_by(created_col.desc(), id_col.desc()).limit(limit + 1)
+
+
+def keyset_sql(cursor: Optional[str], created_expr: str, id_expr: str) -> Tuple[str, dict]:
+    """原生 SQL 版本：返回 (追加的 WHERE 片段, 参数)，第一页返回空片段"""
+    position = decode_cursor(cursor)
+    if position is None:
+        return "", {}
+    ts, row_id = position
+    fragment = (
+        f" AND ({created_expr} < :cursor_ts"
+        f" OR ({created_expr} = :cursor_ts AND {id_expr} < :cursor_id))"
+    )
+    return fragment, {"cursor_ts": _bind_timestamp(ts), "cursor_id": row_id}
+
+
+def build_page(
+    items: Sequence[T],
+    limit: int,
+    key: Callable[[T], Tuple[datetime, int]] = lambda item: (item.created_at, item.id),  # type: ignore[attr-defined]
+) -> CursorPage:
+    """items 为多取一条的查询结果；有第 limit + 1 条时去掉它，并用本页最后一条生成 next_cursor"""
+    page = list(items[:limit])
+    next_cursor = None
+    if len(items) > limit and page:
+        next_cursor = encode_cursor(*key(page[-1]))
+    return CursorPage(items=page, next_cursor=next_cursor)
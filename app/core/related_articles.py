@@ -0,0 +1,256 @@
+import asyncio
+import logging
+from typing import Dict, List, Set, Tuple
+
+import numpy as np
+from sqlalchemy import delete, insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer, selectinload
+
+from app.core.config import settings
+from app.core.database import async_session
+from app.core.serialization import article_list_items
+from app.models.article import Article, ArticleStatus
+from app.models.related import ArticleRelated, ArticleRelatedState
+from app.models.tag import ArticleTag
+from app.schemas.article import RelatedArticle
+from app.utils.similarity import (
+    TfidfBuilder, blended_scores, document_signature, document_terms, tag_matrix, top_k
+)
+
+logger = logging.getLogger(__name__)
+
+Neighbors = Dict[int, List[Tuple[int, float]]]
+
+
+class RelatedArticles:
+    '''
+    相关文章离线计算（只针对已发布文章）
+
+    每次运行先流式计算全部已发布文章的字段摘要（只做 SHA-1，不分词）并与 article_related_state 比较，
+    没有变化时直接结束；有变化时才分词并重建 TF-IDF / 标签矩阵（idf 依赖全集），
+    但只重算“受影响”文章的近邻行并写回：
+        变化：标题 / 摘要 / 正文 / 标签摘要与 article_related_state 不一致（含新发布）
+        引用：已存列表中包含变化 / 下线文章的文章
+        挤入：变化文章对其相似度超过其当前第 K 名分数的文章
+    full=True 时全部重算（每日任务，修正 idf 漂移）。
+    '''
+    MIN_SCORE = 0.05
+    # 每块计算的行数，稠密分数块大小为 BLOCK_SIZE × 文章数
+    BLOCK_SIZE = 256
+    LOAD_BATCH_SIZE = 500
+    WRITE_BATCH_SIZE = 500
+
+    @staticmethod
+    async def _load_tags(db: AsyncSession) -> Dict[int, List[int]]:
+        tags: Dict[int, List[int]] = {}
+        result = await db.execute(select(ArticleTag.article_id, ArticleTag.tag_id))
+        for article_id, tag_id in result.all():
+            tags.setdefault(article_id, []).append(tag_id)
+        return tags
+
+    def _stream_published(self, db: AsyncSession):
+        return db.stream(
+            select(Article.id, Article.title, Article.summary, Article.content)
+            .where(Article.status == ArticleStatus.PUBLISHED)
+            .order_by(Article.id)
+            .execution_options(yield_per=self.LOAD_BATCH_SIZE)
+        )
+
+    async def _load_signatures(self, db: AsyncSession) -> Dict[int, str]:
+        """只计算字段摘要，用于判断是否需要加载语料"""
+        tags = await self._load_tags(db)
+        signatures: Dict[int, str] = {}
+        loop = asyncio.get_running_loop()
+        stream = await self._stream_published(db)
+        async for partition in stream.partitions(self.LOAD_BATCH_SIZE):
+            rows = [tuple(row) for row in partition]
+            signatures.update(await loop.run_in_executor(None, self._sign, rows, tags))
+        return signatures
+
+    @staticmethod
+    def _sign(rows, tags) -> Dict[int, str]:
+        return {
+            article_id: document_signature(title, summary, content, tags.get(article_id, []))
+            for article_id, title, summary, content in rows
+        }
+
+    async def _load_corpus(self, db: AsyncSession):
+        tags = await self._load_tags(db)
+        ids: List[int] = []
+        signatures: Dict[int, str] = {}
+        builder = TfidfBuilder()
+        loop = asyncio.get_running_loop()
+        stream = await self._stream_published(db)
+        async for partition in stream.partitions(self.LOAD_BATCH_SIZE):
+            rows = [tuple(row) for row in partition]
+            # 分词是纯 CPU 计算，放到线程池中，避免阻塞事件循环
+            prepared = await loop.run_in_executor(None, self._prepare, rows, tags)
+            for (article_id, *_), (terms, signature) in zip(rows, prepared):
+                ids.append(article_id)
+                signatures[article_id] = signature
+                builder.add(terms)
+        return ids, signatures, builder, [tags.get(article_id, []) for article_id in ids]
+
+    @staticmethod
+    def _prepare(rows, tags):
+        return [
+            (document_terms(title, summary, content),
+             document_signature(title, summary, content, tags.get(article_id, [])))
+            for article_id, title, summary, content in rows
+        ]
+
+    def _compute(
+        self,
+        ids: List[int],
+        builder: TfidfBuilder,
+        tag_lists: List[List[int]],
+        changed: Set[int],
+        removed: Set[int],
+        stored: Neighbors,
+        full: bool,
+    ) -> Neighbors:
+        """在线程池中执行：返回需要重写的文章 -> 新的近邻列表"""
+        k = settings.related_top_k
+        text = builder.build()
+        tags = tag_matrix(tag_lists)
+        position = {article_id: i for i, article_id in enumerate(ids)}
+
+        if full:
+            affected = set(ids)
+        else:
+            affected = set(changed)
+            stale = changed | removed
+            affected |= {
+                article_id for article_id, items in stored.items()
+                if article_id in position and any(related_id in stale for related_id, _ in items)
+            }
+            # 各文章进入其榜单需要超过的分数：榜单未满时为 MIN_SCORE
+            thresholds = np.full(len(ids), self.MIN_SCORE)
+            for article_id, items in stored.items():
+                if article_id in position and len(items) >= k:
+                    thresholds[position[article_id]] = items[-1][1]
+            changed_rows = np.asarray(sorted(position[a] for a in changed), dtype=np.int64)
+            for start in range(0, len(changed_rows), self.BLOCK_SIZE):
+                block = blended_scores(
+                    text, tags, changed_rows[start:start + self.BLOCK_SIZE], settings.related_text_weight
+                )
+                hit = np.flatnonzero((block > thresholds[None, :]).any(axis=0))
+                affected.update(ids[j] for j in hit)
+
+        rows = np.asarray(sorted(position[a] for a in affected), dtype=np.int64)
+        neighbors: Neighbors = {}
+        for start in range(0, len(rows), self.BLOCK_SIZE):
+            chunk = rows[start:start + self.BLOCK_SIZE]
+            block = blended_scores(text, tags, chunk, settings.related_text_weight)
+            for offset, i in enumerate(chunk):
+                neighbors[ids[i]] = [
+                    (ids[j], score) for j, score in top_k(block[offset], k, int(i), self.MIN_SCORE)
+                ]
+        return neighbors
+
+    async def update(self, full: bool = False) -> Dict[str, int]:
+        """增量（或全量）重算相关文章，返回统计信息"""
+        async with async_session() as db:
+            result = await db.execute(select(ArticleRelatedState.article_id, ArticleRelatedState.signature))
+            stored_signatures: Dict[int, str] = {article_id: signature for article_id, signature in result.all()}
+            full = full or not stored_signatures
+            if not full:
+                signatures = await self._load_signatures(db)
+                if signatures == stored_signatures:
+                    return {"articles": len(signatures), "changed": 0, "recomputed": 0}
+
+            ids, signatures, builder, tag_lists = await self._load_corpus(db)
+            removed = set(stored_signatures) - set(signatures)
+            changed = {a for a, signature in signatures.items() if stored_signatures.get(a) != signature}
+
+            stored: Neighbors = {}
+            if not full:
+                result = await db.execute(
+                    select(ArticleRelated.article_id, ArticleRelated.related_id, ArticleRelated.score)
+                    .order_by(ArticleRelated.article_id, ArticleRelated.rank)
+                )
+                for article_id, related_id, score in result.all():
+                    stored.setdefault(article_id, []).append((related_id, score))
+
+            neighbors: Neighbors = {}
+            if len(ids) > 1:
+                loop = asyncio.get_running_loop()
+                neighbors = await loop.run_in_executor(
+                    None, self._compute, ids, builder, tag_lists, changed, removed, stored, full
+                )
+
+            # 全量模式会清空状态表，需要写回全部摘要，否则下次增量会把所有文章当作变化
+            states = signatures if full else {a: signatures[a] for a in changed}
+            await self._store(db, neighbors, removed, states, full)
+        stats = {"articles": len(ids), "changed": len(changed), "recomputed": len(neighbors)}
+        logger.info(f"相关文章计算完成: {stats}")
+        return stats
+
+    async def _store(
+        self,
+        db: AsyncSession,
+        neighbors: Neighbors,
+        removed: Set[int],
+        signatures: Dict[int, str],
+        full: bool,
+    ):
+        """同一事务内替换受影响文章的近邻行和状态摘要"""
+        if full:
+            await db.execute(delete(ArticleRelated))
+            await db.execute(delete(ArticleRelatedState))
+        else:
+            rewrite = list(set(neighbors) | removed)
+            for start in range(0, len(rewrite), self.WRITE_BATCH_SIZE):
+                chunk = rewrite[start:start + self.WRITE_BATCH_SIZE]
+                await db.execute(delete(ArticleRelated).where(ArticleRelated.article_id.in_(chunk)))
+            stale_states = list(removed | set(signatures))
+            for start in range(0, len(stale_states), self.WRITE_BATCH_SIZE):
+                chunk = stale_states[start:start + self.WRITE_BATCH_SIZE]
+                await db.execute(delete(ArticleRelatedState).where(ArticleRelatedState.article_id.in_(chunk)))
+
+        rows = [
+            {"article_id": article_id, "related_id": related_id, "rank": rank, "score": score}
+            for article_id, items in neighbors.items()
+            for rank, (related_id, score) in enumerate(items)
+        ]
+        for start in range(0, len(rows), self.WRITE_BATCH_SIZE):
+            await db.execute(insert(ArticleRelated), rows[start:start + self.WRITE_BATCH_SIZE])
+        state_rows = [{"article_id": a, "signature": s} for a, s in signatures.items()]
+        for start in range(0, len(state_rows), self.WRITE_BATCH_SIZE):
+            await db.execute(insert(ArticleRelatedState), state_rows[start:start + self.WRITE_BATCH_SIZE])
+        await db.commit()
+
+    async def fetch(self, db: AsyncSession, article_id: int, limit: int) -> List[RelatedArticle]:
+        """读取预计算的近邻（按名次），过滤已下线的文章"""
+        result = await db.execute(
+            select(Article, ArticleRelated.score)
+            .join(ArticleRelated, ArticleRelated.related_id == Article.id)
+            .where(ArticleRelated.article_id == article_id, Article.status == ArticleStatus.PUBLISHED)
+            .order_by(ArticleRelated.rank)
+            .limit(limit)
+            .options(
+                defer(Article.content),
+                defer(Article.latex_content),
+                selectinload(Article.author),
+                selectinload(Article.tags).selectinload(ArticleTag.tag)
+            )
+        )
+        rows = result.all()
+        items = article_list_items(article for article, _ in rows)
+        return [
+            RelatedArticle.model_validate({**dict(item), "score": score})
+            for item, (_, score) in zip(items, rows)
+        ]
+
+    @staticmethod
+    async def forget(db: AsyncSession, article_id: int):
+        """删除文章时清理相关行（SQLite 默认不执行外键级联），不提交"""
+        await db.execute(delete(ArticleRelated).where(
+            or_(ArticleRelated.article_id == article_id, ArticleRelated.related_id == article_id)
+        ))
+        await db.execute(delete(ArticleRelatedState).where(ArticleRelatedState.article_id == article_id))
+
+
+# 实例化
+related_articles = RelatedArticles()
@@ -1,15 +1,18 @@
 # app/core/search/base.py
 
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Dict, List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.article import ArticleStatus
-from app.schemas.article import ArticleListResponse
+from app.schemas.article import ArticleSearchResult
 
 
 class BaseFTSSearch(ABC):
     """全文搜索接口统一规范"""
 
+    # 索引结构版本（表 / 触发器 / 分词方式变化时加一），与 search_index_state 中记录的不同时启动时全量重建
+    INDEX_VERSION: int = 1
+
     @staticmethod
     @abstractmethod
     async def create_fts_table(db: AsyncSession):
@@ -28,6 +31,30 @@ class BaseFTSSearch(ABC):
         """填充搜索索引数据"""
         pass
 
+    @staticmethod
+    @abstractmethod
+    async def index_exists(db: AsyncSession) -> bool:
+        """索引表和同步触发器是否齐全"""
+        pass
+
+    @staticmethod
+    @abstractmethod
+    async def stats(db: AsyncSession) -> Dict[str, int]:
+        """已发布文章中已建立索引的数量：{"indexed_articles": ..., "published_articles": ...}"""
+        pass
+
+    @staticmethod
+    @abstractmethod
+    async def rebuild_index(db: AsyncSession):
+        """删除并重建索引结构，再为全部文章建立索引（不 commit）"""
+        pass
+
+    @staticmethod
+    @abstractmethod
+    async def reindex_articles(db: AsyncSession, article_ids: List[int]):
+        """重新索引指定文章（不 commit）"""
+        pass
+
     @staticmethod
     @abstractmethod
     async def search_articles(
@@ -37,9 +64,14 @@ class BaseFTSSearch(ABC):
         limit: int = 10,
         status: Optional[ArticleStatus] = None,
         author: Optional[str] = None,
-        tag: Optional[str] = None
-    ) -> List[ArticleListResponse]:
-        """执行搜索文章"""
+        tag: Optional[str] = None,
+        cursor: Optional[str] = None
+    ) -> List[ArticleSearchResult]:
+        """执行搜索文章
+
+        结果按相关度（标题 > 摘要 > 正文加权，可选时间加成）在索引查询中排序分页，带 score；
+        cursor 不为 None 时按 (created_at, id) 游标分页，结果按时间倒序，忽略 skip
+        """
         pass
 
     @staticmethod
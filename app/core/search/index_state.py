@@ -0,0 +1,89 @@
+from typing import List
+
+from sqlalchemy import func, or_, select, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.search import FTSSearch
+from app.models.article import Article
+from app.models.search_index import SearchIndexState
+
+'''
+全文索引的启动同步
+
+search_index_state 记录索引结构版本（INDEX_VERSION）和高水位（已索引文章的最大 updated_at / id）：
+    版本不同、索引表或触发器缺失、显式 /search/init   删除并全量重建
+    否则                                             只重新索引高水位之后新增 / 修改的文章
+平时的增删改由触发器同步，这里只补齐触发器之外写入的数据（索引缺失期间、外部脚本直接写库等）。
+
+多个 worker 同时启动时在同一个事务里串行执行：
+PostgreSQL 用事务级咨询锁；SQLite 没有咨询锁，事务的第一条语句写 search_index_state 即取得数据库写锁，
+其他进程的写事务等到提交后再读到最新状态，发现已是最新版本后只做增量（通常为空）。
+'''
+
+INDEX_NAME = "articles"
+REINDEX_BATCH_SIZE = 500
+# pg_advisory_xact_lock 的键，全局唯一即可
+_PG_LOCK_KEY = 0x5EA2C4
+
+
+async def _lock_state(db: AsyncSession):
+    if settings.is_postgres:
+        await db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _PG_LOCK_KEY})
+    dialect_insert = pg_insert if settings.is_postgres else sqlite_insert
+    await db.execute(
+        dialect_insert(SearchIndexState).values(name=INDEX_NAME).on_conflict_do_nothing(index_elements=["name"])
+    )
+
+
+async def _changed_article_ids(db: AsyncSession) -> List[int]:
+    # 直接与库中保存的值比较，不经过 Python 的时间类型转换（SQLite 中 updated_at 是文本）；
+    # 用 >=：与高水位同一时刻写入的文章可能晚于记录提交，宁可重复索引这一刻的少量文章
+    state = select(SearchIndexState).where(SearchIndexState.name == INDEX_NAME)
+    indexed_until = state.with_only_columns(SearchIndexState.indexed_until).scalar_subquery()
+    last_id = state.with_only_columns(SearchIndexState.last_id).scalar_subquery()
+    result = await db.execute(
+        select(Article.id)
+        .where(or_(indexed_until.is_(None), Article.updated_at >= indexed_until, Article.id > last_id))
+        .order_by(Article.id)
+    )
+    return list(result.scalars())
+
+
+async def sync_search_index(db: AsyncSession, rebuild: bool = False) -> dict:
+    """
+    启动时（或 /search/init 时 rebuild=True）同步全文索引并提交，返回 {"mode": "rebuild" | "incremental", "indexed": n}
+    """
+    try:
+        await _lock_state(db)
+        version = (await db.execute(
+            select(SearchIndexState.version).where(SearchIndexState.name == INDEX_NAME)
+        )).scalar_one()
+
+        if rebuild or version != FTSSearch.INDEX_VERSION or not await FTSSearch.index_exists(db):
+            await FTSSearch.rebuild_index(db)
+            mode = "rebuild"
+            indexed = (await db.execute(select(func.count()).select_from(Article))).scalar_one()
+        else:
+            mode = "incremental"
+            article_ids = await _changed_article_ids(db)
+            for start in range(0, len(article_ids), REINDEX_BATCH_SIZE):
+                await FTSSearch.reindex_articles(db, article_ids[start:start + REINDEX_BATCH_SIZE])
+            indexed = len(article_ids)
+
+        await db.execute(
+            update(SearchIndexState)
+            .where(SearchIndexState.name == INDEX_NAME)
+            .values(
+                version=FTSSearch.INDEX_VERSION,
+                indexed_until=select(func.max(Article.updated_at)).scalar_subquery(),
+                last_id=select(func.coalesce(func.max(Article.id), 0)).scalar_subquery(),
+            )
+        )
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    return {"mode": mode, "indexed": indexed}
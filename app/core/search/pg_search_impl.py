@@ -1,31 +1,126 @@
 import re
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text, select
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import defer, selectinload
 from collections import Counter
 
 from app.core.search.fts_base_interface import BaseFTSSearch
+from app.core.pagination import keyset_sql
 from app.models.article import Article, ArticleStatus
 from app.models.tag import Tag, ArticleTag
-from app.schemas.article import ArticleListResponse, UserBasicInfo, TagInfo
+from app.core.config import settings
+from app.core.serialization import search_result_items
+from app.schemas.article import ArticleSearchResult
+from app.utils.segment import CJK_RANGES, segment_query
+
+# 参与检索的文本列；只有这些列变化时才重新计算 tsvector
+_INDEXED_COLUMNS = ("title", "content", "summary")
+_TRIGGER_NAMES = ("article_tsv_insert", "article_tsv_update")
+
+
+# 各列在 tsvector 中的权重标签，排序时 ts_rank_cd 按 SEARCH_WEIGHT_* 给标签赋值（D 未使用）
+_WEIGHT_LABELS = {"title": "A", "summary": "B", "content": "C"}
+
+
+def _tsvector_sql(config: str, row: str = "") -> str:
+    """
+    按列 setweight 后拼接的 tsvector；row 为 "NEW." 时用于触发器函数，为空时用于直接 UPDATE
+
+    tsv_zh（simple）的每列先经 cjk_segment() 切分
+    """
+    parts = []
+    for column in _INDEXED_COLUMNS:
+        document = f"coalesce({row}{column}, '')"
+        if config == "simple":
+            document = f"cjk_segment({document})"
+        parts.append(f"setweight(to_tsvector('{config}', {document}), '{_WEIGHT_LABELS[column]}')")
+    return " || ".join(parts)
+
+
+_SET_TSVECTOR_SQL = f"tsv_zh = {_tsvector_sql('simple')}, tsv_en = {_tsvector_sql('english')}"
+
+# simple 解析器不切分中文，连续汉字会成为一个词。与 app/utils/segment.segment_text 相同的规则：
+# 每段连续汉字替换为空格分隔的字二元组，段尾的字单独再出现一次（单字查询按前缀匹配时能命中段尾），
+# 其余文本原样保留（字符范围直接嵌入 CJK_RANGES）
+_CJK_SEGMENT_SQL = f"""
+    CREATE OR REPLACE FUNCTION cjk_segment(doc text) RETURNS text AS $$
+        SELECT coalesce(string_agg(
+            m[1] || ' ' || CASE
+                WHEN length(m[2]) > 1 THEN (
+                    SELECT string_agg(substr(m[2], i, 2), ' ' ORDER BY i)
+                    FROM generate_series(1, length(m[2]) - 1) AS i
+                ) || ' ' || right(m[2], 1)
+                ELSE m[2]
+            END,
+            ' ' ORDER BY n
+        ), '')
+        FROM regexp_matches(doc, '([^{CJK_RANGES}]*)([{CJK_RANGES}]*)', 'g') WITH ORDINALITY AS r(m, n)
+    $$ LANGUAGE sql IMMUTABLE PARALLEL SAFE;
+"""
 
 
 class PostgresFTSSearch(BaseFTSSearch):
     """基于 PostgreSQL tsvector 的全文搜索实现（支持中英文）"""
 
+    # 触发器 / tsvector 计算方式变化时加一（2：tsv_zh 中文二元组切分，3：按列加权，4：索引段尾单字）
+    INDEX_VERSION = 4
+
     @staticmethod
-    async def drop_fts_table(db: AsyncSession):
-        """删除全文索引和触发器（如果存在）"""
+    async def _drop(db: AsyncSession):
         drop_sqls = [
-            "DROP TRIGGER IF EXISTS article_tsv_update ON article",
+            *(f"DROP TRIGGER IF EXISTS {name} ON article" for name in _TRIGGER_NAMES),
             "DROP FUNCTION IF EXISTS update_article_tsvector",
+            "DROP FUNCTION IF EXISTS cjk_segment",
             "DROP INDEX IF EXISTS idx_article_tsv_zh",
             "DROP INDEX IF EXISTS idx_article_tsv_en"
         ]
+        for sql in drop_sqls:
+            await db.execute(text(sql))
+
+    @staticmethod
+    async def _create(db: AsyncSession):
+        """
+        创建 GIN 索引和 tsvector 更新触发器
+
+        更新触发器限定 UPDATE OF title, content, summary，并且值确实变化时才触发：
+        浏览量、状态、updated_at 等元数据更新不再重新分词整篇正文，也不产生新的 GIN 索引项
+        """
+        await db.execute(text(_CJK_SEGMENT_SQL))
+        await db.execute(text(f"""
+            CREATE OR REPLACE FUNCTION update_article_tsvector() RETURNS trigger AS $$
+            BEGIN
+                NEW.tsv_zh := {_tsvector_sql('simple', 'NEW.')};
+                NEW.tsv_en := {_tsvector_sql('english', 'NEW.')};
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql;
+        """))
+        await db.execute(text("""
+            CREATE TRIGGER article_tsv_insert
+            BEFORE INSERT ON article
+            FOR EACH ROW EXECUTE FUNCTION update_article_tsvector();
+        """))
+        changed = " OR ".join(f"OLD.{column} IS DISTINCT FROM NEW.{column}" for column in _INDEXED_COLUMNS)
+        await db.execute(text(f"""
+            CREATE TRIGGER article_tsv_update
+            BEFORE UPDATE OF {", ".join(_INDEXED_COLUMNS)} ON article
+            FOR EACH ROW WHEN ({changed})
+            EXECUTE FUNCTION update_article_tsvector();
+        """))
+        await db.execute(text("CREATE INDEX IF NOT EXISTS idx_article_tsv_zh ON article USING GIN(tsv_zh)"))
+        await db.execute(text("CREATE INDEX IF NOT EXISTS idx_article_tsv_en ON article USING GIN(tsv_en)"))
+
+    @staticmethod
+    async def _populate(db: AsyncSession):
+        # 更新触发器只在文本变化时触发，这里直接赋值
+        await db.execute(text(f"UPDATE article SET {_SET_TSVECTOR_SQL}"))
+
+    @staticmethod
+    async def drop_fts_table(db: AsyncSession):
+        """删除全文索引和触发器（如果存在）"""
         try:
-            for sql in drop_sqls:
-                await db.execute(text(sql))
+            await PostgresFTSSearch._drop(db)
             await db.commit()
             print("✅ 已删除 PostgreSQL FTS 结构")
         except Exception as e:
@@ -36,27 +131,8 @@ class PostgresFTSSearch(BaseFTSSearch):
     async def create_fts_table(db: AsyncSession):
         """创建 GIN 索引和 tsvector 更新触发器（支持中英文）"""
         try:
-            await PostgresFTSSearch.drop_fts_table(db)
-            await db.execute(text("""
-                CREATE OR REPLACE FUNCTION update_article_tsvector() RETURNS trigger AS $$
-                BEGIN
-                    NEW.tsv_zh := to_tsvector('simple', coalesce(NEW.title, '') || ' ' || coalesce(NEW.content, '') || ' ' || coalesce(NEW.summary, ''));
-                    NEW.tsv_en := to_tsvector('english', coalesce(NEW.title, '') || ' ' || coalesce(NEW.content, '') || ' ' || coalesce(NEW.summary, ''));
-                    RETURN NEW;
-                END
-                $$ LANGUAGE plpgsql;
-            """))
-            await db.execute(text("""
-                CREATE TRIGGER article_tsv_update
-                BEFORE INSERT OR UPDATE ON article
-                FOR EACH ROW EXECUTE FUNCTION update_article_tsvector();
-            """))
-            await db.execute(text("""
-                CREATE INDEX IF NOT EXISTS idx_article_tsv_zh ON article USING GIN(tsv_zh);
-            """))
-            await db.execute(text("""
-                CREATE INDEX IF NOT EXISTS idx_article_tsv_en ON article USING GIN(tsv_en);
-            """))
+            await PostgresFTSSearch._drop(db)
+            await PostgresFTSSearch._create(db)
             await db.commit()
             print("✅ PostgreSQL FTS 结构创建成功")
         except Exception as e:
@@ -65,15 +141,93 @@ class PostgresFTSSearch(BaseFTSSearch):
 
     @staticmethod
     async def populate_fts_table(db: AsyncSession):
-        """手动触发更新所有现有数据的 tsvector"""
+        """重新计算所有现有数据的 tsvector"""
         try:
-            await db.execute(text("UPDATE article SET title = title"))
+            await PostgresFTSSearch._populate(db)
             await db.commit()
             print("✅ 已更新所有文章的 tsvector 字段")
         except Exception as e:
             await db.rollback()
             print(f"❌ 更新 tsvector 失败: {e}")
 
+    @staticmethod
+    async def index_exists(db: AsyncSession) -> bool:
+        # 被 ALTER TABLE ... DISABLE TRIGGER 禁用（tgenabled = 'D'）的触发器不同步索引，视为缺失，启动时重建
+        result = await db.execute(
+            text(
+                "SELECT count(*) FROM pg_trigger"
+                " WHERE tgname = ANY(:names) AND NOT tgisinternal AND tgenabled <> 'D'"
+            ),
+            {"names": list(_TRIGGER_NAMES)},
+        )
+        return result.scalar_one() == len(_TRIGGER_NAMES)
+
+    @staticmethod
+    async def stats(db: AsyncSession) -> Dict[str, int]:
+        # tsvector 存在 article 表的列上，已计算 tsv_zh 的行即已建立索引
+        result = await db.execute(text(
+            "SELECT COUNT(*), COUNT(tsv_zh) FROM article WHERE status = 'PUBLISHED'"
+        ))
+        published, indexed = result.one()
+        return {"indexed_articles": indexed, "published_articles": published}
+
+    @staticmethod
+    async def rebuild_index(db: AsyncSession):
+        await PostgresFTSSearch._drop(db)
+        await PostgresFTSSearch._create(db)
+        await PostgresFTSSearch._populate(db)
+
+    @staticmethod
+    async def reindex_articles(db: AsyncSession, article_ids: List[int]):
+        await db.execute(
+            text(f"UPDATE article SET {_SET_TSVECTOR_SQL} WHERE id = ANY(:ids)"), {"ids": article_ids}
+        )
+
+    @staticmethod
+    def build_search_query(search_term: str) -> str:
+        """
+        构建 tsv_zh 的 tsquery：与索引相同的切分，汉字二元组按 <-> 相邻匹配，英文词前缀匹配
+
+        返回空字符串表示关键词无法走索引
+        """
+        query_parts = []
+        for term in segment_query(search_term):
+            tokens = [f"'{token}'" for token in term.tokens]
+            if term.prefix:
+                tokens[-1] += ":*"
+            query_parts.append("(" + " <-> ".join(tokens) + ")")
+        return " & ".join(query_parts)
+
+    @staticmethod
+    def _score_sql() -> str:
+        """
+        相关度分数：中英文两个 tsvector 的 ts_rank_cd 取较大值（标准化 1：除以 1 + log(文档长度)）。
+        开启时间加成时乘以 1 + d / (d + 发布天数)：发布当天翻倍，过了 d 天加成减半
+        """
+        score = (
+            "greatest(ts_rank_cd(CAST(:weights AS float4[]), a.tsv_zh, zq, 1), "
+            "ts_rank_cd(CAST(:weights AS float4[]), a.tsv_en, eq, 1))"
+        )
+        if settings.search_recency_days > 0:
+            age = "greatest(CAST(extract(epoch FROM now() - coalesce(a.published_at, a.created_at)) AS float8) / 86400, 0)"
+            days = "CAST(:recency_days AS float8)"
+            score = f"{score} * (1 + {days} / ({days} + {age}))"
+        return score
+
+    @staticmethod
+    def _score_params() -> dict:
+        # 权重数组顺序为 {D, C, B, A}，按最大值缩放到 (0, 1]
+        weights = {
+            "A": settings.search_weight_title,
+            "B": settings.search_weight_summary,
+            "C": settings.search_weight_content,
+        }
+        top = max(weights.values()) or 1.0
+        return {
+            "weights": [0.1, weights["C"] / top, weights["B"] / top, weights["A"] / top],
+            "recency_days": settings.search_recency_days,
+        }
+
     @staticmethod
     async def search_articles(
         db: AsyncSession,
@@ -82,23 +236,21 @@ class PostgresFTSSearch(BaseFTSSearch):
         limit: int = 10,
         status: Optional[ArticleStatus] = None,
         author: Optional[str] = None,
-        tag: Optional[str] = None
-    ) -> List[ArticleListResponse]:
+        tag: Optional[str] = None,
+        cursor: Optional[str] = None
+    ) -> List[ArticleSearchResult]:
         """使用 PostgreSQL FTS 查询文章（中英文支持）"""
         assert query is not None
-        if not query.strip():
+        zh_query = PostgresFTSSearch.build_search_query(query)
+        if not zh_query:
             return []
 
-        ts_query = query.strip()
-        sql = """
-            SELECT  a.id
-            FROM article a
-            WHERE (
-                a.tsv_zh @@ plainto_tsquery('simple', :query)
-                OR a.tsv_en @@ plainto_tsquery('english', :query)
-            )
+        sql = f"""
+            SELECT  a.id, {PostgresFTSSearch._score_sql()} AS score
+            FROM article a, to_tsquery('simple', :zh_query) AS zq, plainto_tsquery('english', :query) AS eq
+            WHERE (a.tsv_zh @@ zq OR a.tsv_en @@ eq)
         """
-        params: dict[str, str | int] = {"query": ts_query}
+        params: dict[str, Any] = {"query": query.strip(), "zh_query": zh_query, **PostgresFTSSearch._score_params()}
 
         if status:
             sql += " AND a.status = :status"
@@ -125,26 +277,37 @@ class PostgresFTSSearch(BaseFTSSearch):
             """
             params["tag"] = tag
 
-        sql += " ORDER BY a.created_at DESC LIMIT :limit OFFSET :skip"
-        params["limit"] = limit
-        params["skip"] = skip
+        if cursor is not None:
+            fragment, cursor_params = keyset_sql(cursor, "a.created_at", "a.id")
+            sql += fragment + " ORDER BY a.created_at DESC, a.id DESC LIMIT :limit"
+            params.update(cursor_params)
+            # 多取一条，由 build_page 判断是否还有下一页
+            params["limit"] = limit + 1
+        else:
+            # 在索引查询里排序分页，只取当前页的 id
+            sql += " ORDER BY score DESC, a.created_at DESC LIMIT :limit OFFSET :skip"
+            params["skip"] = skip
+            params["limit"] = limit
 
         try:
             result = await db.execute(text(sql), params)
-            article_ids = [row[0] for row in result.fetchall()]
+            scores = {row[0]: row[1] for row in result.fetchall()}
         except Exception as e:
+            # 由搜索接口捕获后降级为 LIKE
             print(f"❌ PostgreSQL FTS 搜索失败，降级使用 LIKE: {e}")
-            return []
+            raise
 
-        if not article_ids:
+        if not scores:
             return []
+        article_ids = list(scores)
 
         result = await db.execute(
             select(Article)
             .options(
+                defer(Article.content),
+                defer(Article.latex_content),
                 selectinload(Article.author),
-                selectinload(Article.tags).selectinload(ArticleTag.tag),
-                selectinload(Article.comments)
+                selectinload(Article.tags).selectinload(ArticleTag.tag)
             )
             .where(Article.id.in_(article_ids))
         )
@@ -153,38 +316,24 @@ class PostgresFTSSearch(BaseFTSSearch):
         article_dict = {a.id: a for a in articles}
         sorted_articles = [article_dict[aid] for aid in article_ids if aid in article_dict]
 
-        return [
-            ArticleListResponse(
-                id=article.id,
-                title=article.title,
-                summary=article.summary,
-                status=article.status,
-                author=UserBasicInfo.model_validate(article.author),
-                tags=[TagInfo.model_validate(at.tag) for at in article.tags if at.tag],
-                created_at=article.created_at,
-                updated_at=article.updated_at,
-                view_count=0,
-                comment_count=len(article.comments or [])
-            )
-            for article in sorted_articles
-        ]
+        return search_result_items(sorted_articles, scores)
 
     @staticmethod
     async def get_search_suggestions(db: AsyncSession, query: str, limit: int = 5) -> List[str]:
         """返回匹配的标题建议（支持中英文）"""
-        if not query.strip():
+        zh_query = PostgresFTSSearch.build_search_query(query)
+        if not zh_query:
             return []
 
         try:
-            result = await db.execute(text("""
-                SELECT DISTINCT title FROM article
-                WHERE (
-                    tsv_zh @@ plainto_tsquery('simple', :query)
-                    OR tsv_en @@ plainto_tsquery('english', :query)
-                ) AND status = 'PUBLISHED'
-                ORDER BY created_at DESC
+            result = await db.execute(text(f"""
+                SELECT a.title, max({PostgresFTSSearch._score_sql()}) AS score
+                FROM article a, to_tsquery('simple', :zh_query) AS zq, plainto_tsquery('english', :query) AS eq
+                WHERE (a.tsv_zh @@ zq OR a.tsv_en @@ eq) AND a.status = 'PUBLISHED'
+                GROUP BY a.title
+                ORDER BY score DESC
                 LIMIT :limit
-            """), {"query": query.strip(), "limit": limit})
+            """), {"query": query.strip(), "zh_query": zh_query, "limit": limit, **PostgresFTSSearch._score_params()})
             return [row[0] for row in result.fetchall()]
         except Exception as e:
             print(f"❌ 获取搜索建议失败: {e}")
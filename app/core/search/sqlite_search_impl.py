@@ -1,85 +1,215 @@
 import re
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import text, select
-from sqlalchemy.orm import selectinload
+from sqlalchemy import bindparam, event, text, select
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import defer, selectinload
 from collections import Counter
 
 from app.core.search.fts_base_interface import BaseFTSSearch
+from app.core.pagination import keyset_sql
 from app.models.article import Article, ArticleStatus
 from app.models.tag import Tag, ArticleTag
-from app.schemas.article import ArticleListResponse, UserBasicInfo, TagInfo
+from app.core.config import settings
+from app.core.serialization import search_result_items
+from app.schemas.article import ArticleSearchResult
+from app.utils.segment import segment_query, segment_text
+
+'''
+SQLite FTS5 全文搜索
+
+运行要求：索引视图和 article 上的三个触发器调用 Python 函数 fts_segment()，它只存在于注册过的连接上。
+    应用：app.core.database 的引擎在每个连接上注册，启动时 ensure_sqlite_functions() 校验，缺失则拒绝启动
+    alembic：在线迁移同样注册并校验；SQLite 不支持离线迁移（生成的 SQL 交给 sqlite3 执行时没有该函数）
+    其他连接（sqlite3 命令行、自建引擎的脚本 / 测试）：写 article 会报 no such function: fts_segment，
+        自建引擎需先调用 register_sqlite_functions()；只读查询不受影响
+不改为保存切分后文本的影子列：外部内容表的意义就是索引之外不再复制一份正文。
+'''
+
+
+# unicode61 不切分中文，连续汉字会成为一个 token。索引的文本先经 fts_segment()（app/utils/segment.py）
+# 按字二元组切分：每个连接打开时注册该函数（register_sqlite_functions），触发器和下面的视图都调用它。
+# 外部内容表指向切分后的视图：索引只保存倒排数据，不复制一份标题 / 正文 / 摘要，
+# rowid 即 article.id；状态 / 作者 / 时间在查询时 JOIN article 读取。
+_SOURCE_VIEW_SQL = """
+    CREATE VIEW articles_fts_source AS
+    SELECT id, fts_segment(title) AS title, fts_segment(content) AS content, fts_segment(summary) AS summary
+    FROM article
+"""
+
+_FTS_TABLE_SQL = """
+    CREATE VIRTUAL TABLE articles_fts USING fts5(
+        title,
+        content,
+        summary,
+        content='articles_fts_source',
+        content_rowid='id'
+    )
+"""
+
+# 外部内容表的同步协议：删除旧索引项要用 'delete' 命令并提供建立索引时的原值，值不一致会损坏索引。
+# 因此文本的每次变化都必须经过触发器；触发器缺失时 index_exists() 为 False，启动时全量 rebuild。
+# 更新触发器只监听 title / content / summary 且值确实变化时才执行，浏览量、状态等元数据更新不触碰索引。
+_TRIGGER_SQLS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS articles_ai AFTER INSERT ON article BEGIN
+        INSERT INTO articles_fts(rowid, title, content, summary)
+        VALUES (new.id, fts_segment(new.title), fts_segment(new.content), fts_segment(new.summary));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS articles_ad AFTER DELETE ON article BEGIN
+        INSERT INTO articles_fts(articles_fts, rowid, title, content, summary)
+        VALUES ('delete', old.id, fts_segment(old.title), fts_segment(old.content), fts_segment(old.summary));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS articles_au AFTER UPDATE OF title, content, summary ON article
+    WHEN new.title IS NOT old.title OR new.content IS NOT old.content OR new.summary IS NOT old.summary
+    BEGIN
+        INSERT INTO articles_fts(articles_fts, rowid, title, content, summary)
+        VALUES ('delete', old.id, fts_segment(old.title), fts_segment(old.content), fts_segment(old.summary));
+        INSERT INTO articles_fts(rowid, title, content, summary)
+        VALUES (new.id, fts_segment(new.title), fts_segment(new.content), fts_segment(new.summary));
+    END
+    """,
+]
+
+
+_TRIGGER_NAMES = ("articles_ai", "articles_ad", "articles_au")
+
+
+def register_sqlite_functions(engine: Engine):
+    """
+    为引擎的每个新连接注册 fts_segment()
+
+    article 的插入 / 删除 / 文本更新会触发调用它的触发器，所有写 article 的连接（应用、alembic）都要注册；
+    没有注册的连接（如 sqlite3 命令行）写 article 会报 no such function: fts_segment
+    """
+    @event.listens_for(engine, "connect")
+    def _register(dbapi_connection, connection_record):
+        dbapi_connection.create_function("fts_segment", 1, segment_text, deterministic=True)
+
+
+def ensure_sqlite_functions(connection: Connection):
+    """确认连接上已注册 fts_segment()，否则抛出 RuntimeError（索引触发器依赖它，写 article 会全部失败）"""
+    try:
+        connection.exec_driver_sql("SELECT fts_segment('')")
+    except OperationalError as e:
+        raise RuntimeError(
+            "SQLite 连接没有注册 fts_segment()：全文索引触发器依赖它，写 article 会失败。"
+            "请使用 app.core.database 的引擎，或先对引擎调用 register_sqlite_functions()"
+        ) from e
 
 
 class SQLiteFTSSearch(BaseFTSSearch):
+    # 表结构 / 触发器 / 切分方式变化时加一（2：外部内容表，3：中文二元组切分，4：索引段尾单字）
+    INDEX_VERSION = 4
+
+    @staticmethod
+    async def _drop(db: AsyncSession):
+        for name in _TRIGGER_NAMES:
+            await db.execute(text(f"DROP TRIGGER IF EXISTS {name}"))
+        await db.execute(text("DROP TABLE IF EXISTS articles_fts"))
+        await db.execute(text("DROP VIEW IF EXISTS articles_fts_source"))
+
+    @staticmethod
+    async def _create(db: AsyncSession):
+        await db.execute(text(_SOURCE_VIEW_SQL))
+        await db.execute(text(_FTS_TABLE_SQL))
+        for sql in _TRIGGER_SQLS:
+            await db.execute(text(sql))
+
+    @staticmethod
+    async def _populate(db: AsyncSession):
+        # 与触发器一致，索引全部文章（草稿发布时只改 status，不会再写索引），查询时按状态过滤；
+        # rebuild 清空索引后从 articles_fts_source 视图重新读取全部行
+        await db.execute(text("INSERT INTO articles_fts(articles_fts) VALUES ('rebuild')"))
+
     @staticmethod
     async def drop_fts_table(db: AsyncSession):
         async with db.begin():
-            await db.execute(text("DROP TRIGGER IF EXISTS articles_ai"))
-            await db.execute(text("DROP TRIGGER IF EXISTS articles_ad"))
-            await db.execute(text("DROP TRIGGER IF EXISTS articles_au"))
-            await db.execute(text("DROP TABLE IF EXISTS articles_fts"))
+            await SQLiteFTSSearch._drop(db)
 
     @staticmethod
     async def create_fts_table(db: AsyncSession):
-        await SQLiteFTSSearch.drop_fts_table(db)
         async with db.begin():
-            await db.execute(text("""
-                CREATE VIRTUAL TABLE articles_fts USING fts5(
-                    id UNINDEXED,
-                    title,
-                    content,
-                    summary,
-                    author_id UNINDEXED,
-                    status UNINDEXED,
-                    created_at UNINDEXED,
-                    updated_at UNINDEXED
-                )
-            """))
-            await db.execute(text("""
-                CREATE TRIGGER articles_ai AFTER INSERT ON article BEGIN
-                    INSERT INTO articles_fts(id, title, content, summary, author_id, status, created_at, updated_at)
-                    VALUES (new.id, new.title, new.content, new.summary, new.author_id, new.status, new.created_at, new.updated_at);
-                END
-            """))
-            await db.execute(text("""
-                CREATE TRIGGER articles_ad AFTER DELETE ON article BEGIN
-                    DELETE FROM articles_fts WHERE id = old.id;
-                END
-            """))
-            await db.execute(text("""
-                CREATE TRIGGER articles_au AFTER UPDATE ON article BEGIN
-                    UPDATE articles_fts SET
-                        title = new.title,
-                        content = new.content,
-                        summary = new.summary,
-                        author_id = new.author_id,
-                        status = new.status,
-                        updated_at = new.updated_at
-                    WHERE id = new.id;
-                END
-            """))
+            await SQLiteFTSSearch._drop(db)
+            await SQLiteFTSSearch._create(db)
 
     @staticmethod
     async def populate_fts_table(db: AsyncSession):
         async with db.begin():
-            await db.execute(text("DELETE FROM articles_fts"))
-            await db.execute(text("""
-                INSERT INTO articles_fts(id, title, content, summary, author_id, status, created_at, updated_at)
-                SELECT id, title, content, summary, author_id, status, created_at, updated_at
-                FROM article WHERE status = 'PUBLISHED'
-            """))
+            await SQLiteFTSSearch._populate(db)
+
+    @staticmethod
+    async def index_exists(db: AsyncSession) -> bool:
+        result = await db.execute(text(
+            "SELECT count(*) FROM sqlite_master"
+            " WHERE name IN ('articles_fts', 'articles_fts_source') OR (type = 'trigger' AND name IN :names)"
+        ).bindparams(bindparam("names", expanding=True)), {"names": list(_TRIGGER_NAMES)})
+        return result.scalar_one() == len(_TRIGGER_NAMES) + 2
+
+    @staticmethod
+    async def stats(db: AsyncSession) -> Dict[str, int]:
+        # 外部内容表的行数就是 article 的行数，已索引的文档以 docsize 表为准；索引包含草稿，只统计已发布的部分
+        result = await db.execute(text(
+            "SELECT COUNT(*), COUNT(d.id) FROM article a"
+            " LEFT JOIN articles_fts_docsize d ON d.id = a.id WHERE a.status = 'PUBLISHED'"
+        ))
+        published, indexed = result.one()
+        return {"indexed_articles": indexed, "published_articles": published}
+
+    @staticmethod
+    async def rebuild_index(db: AsyncSession):
+        await SQLiteFTSSearch._drop(db)
+        await SQLiteFTSSearch._create(db)
+        await SQLiteFTSSearch._populate(db)
+
+    @staticmethod
+    async def reindex_articles(db: AsyncSession, article_ids: List[int]):
+        # 触发器齐全时索引内容与 article 当前值一致，按当前值 'delete' 再插入是安全的
+        params = {"ids": article_ids}
+        await db.execute(text("""
+            INSERT INTO articles_fts(articles_fts, rowid, title, content, summary)
+            SELECT 'delete', id, title, content, summary FROM articles_fts_source WHERE id IN :ids
+        """).bindparams(bindparam("ids", expanding=True)), params)
+        await db.execute(text("""
+            INSERT INTO articles_fts(rowid, title, content, summary)
+            SELECT id, title, content, summary FROM articles_fts_source WHERE id IN :ids
+        """).bindparams(bindparam("ids", expanding=True)), params)
 
     @staticmethod
     def build_search_query(search_term: str) -> str:
-        """构建搜索查询：分词并前缀匹配"""
-        search_term = re.sub(r'[^\w\s]', ' ', search_term).strip()
-        if not search_term:
-            return ""
-        words = search_term.split()
-        query_parts = [f'"{word}"*' for word in words if len(word) >= 2]
+        """构建搜索查询：与索引相同的切分，汉字按二元组短语匹配，英文词前缀匹配"""
+        query_parts = []
+        for term in segment_query(search_term):
+            phrase = '"' + " ".join(term.tokens) + '"'
+            query_parts.append(phrase + "*" if term.prefix else phrase)
         return " AND ".join(query_parts)
 
+    @staticmethod
+    def _score_sql() -> str:
+        """
+        相关度分数：bm25() 越小越相关，取负数；列权重按 articles_fts 的列顺序（title, content, summary）传入。
+        开启时间加成时乘以 1 + d / (d + 发布天数)：发布当天翻倍，过了 d 天加成减半
+        """
+        score = "-bm25(articles_fts, :w_title, :w_content, :w_summary)"
+        if settings.search_recency_days > 0:
+            age = "max(julianday('now') - julianday(coalesce(a.published_at, a.created_at)), 0)"
+            score = f"{score} * (1 + :recency_days / (:recency_days + {age}))"
+        return score
+
+    @staticmethod
+    def _score_params() -> dict:
+        return {
+            "w_title": settings.search_weight_title,
+            "w_content": settings.search_weight_content,
+            "w_summary": settings.search_weight_summary,
+            "recency_days": settings.search_recency_days,
+        }
+
     @staticmethod
     async def search_articles(
         db: AsyncSession,
@@ -88,19 +218,21 @@ class SQLiteFTSSearch(BaseFTSSearch):
         limit: int = 10,
         status: Optional[ArticleStatus] = None,
         author: Optional[str] = None,
-        tag: Optional[str] = None
-    ) -> List[ArticleListResponse]:
+        tag: Optional[str] = None,
+        cursor: Optional[str] = None
+    ) -> List[ArticleSearchResult]:
         assert query is not None
         fts_query = SQLiteFTSSearch.build_search_query(query)
         if not fts_query:
             return []
 
-        sql = """
-            SELECT a.id FROM articles_fts fts
-            JOIN article a ON fts.id = a.id
-            WHERE fts MATCH :query
+        # FTS5 的 MATCH / bm25() 只认表名，不能用别名
+        sql = f"""
+            SELECT a.id, {SQLiteFTSSearch._score_sql()} AS score FROM articles_fts
+            JOIN article a ON a.id = articles_fts.rowid
+            WHERE articles_fts MATCH :query
         """
-        params: dict[str, str | int] = {"query": fts_query}
+        params: dict[str, Any] = {"query": fts_query, **SQLiteFTSSearch._score_params()}
 
         if status:
             sql += " AND a.status = :status"
@@ -122,40 +254,37 @@ class SQLiteFTSSearch(BaseFTSSearch):
                 )
             """
             params["tag"] = tag
-        sql += " ORDER BY bm25(fts) DESC, a.created_at DESC LIMIT :limit OFFSET :skip"
-        params["limit"] = limit
-        params["skip"] = skip
+        if cursor is not None:
+            fragment, cursor_params = keyset_sql(cursor, "a.created_at", "a.id")
+            sql += fragment + " ORDER BY a.created_at DESC, a.id DESC LIMIT :limit"
+            params.update(cursor_params)
+            # 多取一条，由 build_page 判断是否还有下一页
+            params["limit"] = limit + 1
+        else:
+            # 在索引查询里排序分页，只取当前页的 id
+            sql += " ORDER BY score DESC, a.created_at DESC LIMIT :limit OFFSET :skip"
+            params["skip"] = skip
+            params["limit"] = limit
 
         result = await db.execute(text(sql), params)
-        article_ids = [row[0] for row in result.fetchall()]
-        if not article_ids:
+        scores = {row[0]: row[1] for row in result.fetchall()}
+        if not scores:
             return []
+        article_ids = list(scores)
 
         result = await db.execute(
             select(Article).options(
+                defer(Article.content),
+                defer(Article.latex_content),
                 selectinload(Article.author),
-                selectinload(Article.tags).selectinload(ArticleTag.tag),
-                selectinload(Article.comments)
+                selectinload(Article.tags).selectinload(ArticleTag.tag)
             ).where(Article.id.in_(article_ids))
         )
         articles = result.scalars().all()
         article_map = {a.id: a for a in articles}
         sorted_articles = [article_map[i] for i in article_ids if i in article_map]
 
-        return [
-            ArticleListResponse(
-                id=a.id,
-                title=a.title,
-                summary=a.summary,
-                status=a.status,
-                author=UserBasicInfo.model_validate(a.author),
-                tags=[TagInfo.model_validate(at.tag) for at in a.tags if at.tag],
-                created_at=a.created_at,
-                updated_at=a.updated_at,
-                view_count=a.view_count,
-                comment_count=len(a.comments or [])
-            ) for a in sorted_articles
-        ]
+        return search_result_items(sorted_articles, scores)
 
     @staticmethod
     async def get_search_suggestions(db: AsyncSession, query: str, limit: int = 5) -> List[str]:
@@ -163,13 +292,19 @@ class SQLiteFTSSearch(BaseFTSSearch):
         if not fts_query:
             return []
 
-        sql = """
-            SELECT DISTINCT title FROM articles_fts fts
-            WHERE fts MATCH :query
-            ORDER BY bm25(fts) DESC
+        # bm25() 不能出现在聚合中：先物化每篇文章的得分（普通子查询会被展开），再按标题取最高分
+        sql = f"""
+            WITH hits AS MATERIALIZED (
+                SELECT a.title, {SQLiteFTSSearch._score_sql()} AS score FROM articles_fts
+                JOIN article a ON a.id = articles_fts.rowid
+                WHERE articles_fts MATCH :query AND a.status = 'PUBLISHED'
+            )
+            SELECT title, max(score) AS best FROM hits
+            GROUP BY title
+            ORDER BY best DESC
             LIMIT :limit
         """
-        result = await db.execute(text(sql), {"query": fts_query, "limit": limit})
+        result = await db.execute(text(sql), {"query": fts_query, "limit": limit, **SQLiteFTSSearch._score_params()})
         return [row[0] for row in result.fetchall()]
 
     @staticmethod
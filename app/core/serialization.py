@@ -0,0 +1,82 @@
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Type, TypeVar
+
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+from pydantic_core import to_json
+
+from app.schemas.article import ArticleListResponse, ArticleSearchResult
+
+'''
+列表接口的序列化层
+
+- TypeAdapter 按类型只构建一次（lru_cache），整页数据一次 validate_python(from_attributes=True)，
+  嵌套的作者 / 标签直接从 ORM 属性读取，不再逐行 model_validate
+- 直接返回已编码的 bytes（pydantic-core 序列化），FastAPI 不会再按 response_model 校验、
+  也不会再走 jsonable_encoder；response_model 仍保留用于 OpenAPI 文档
+- 其余接口的默认响应类是 ORJSONResponse（见 app/main.py）
+'''
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+@lru_cache(maxsize=None)
+def adapter_for(tp: Any) -> TypeAdapter:
+    return TypeAdapter(tp)
+
+
+def validate_many(model: Type[ModelT], rows: Iterable[Any]) -> List[ModelT]:
+    """整批校验：rows 可以是 ORM 对象或 dict（嵌套字段同样按属性读取）"""
+    return adapter_for(List[model]).validate_python(list(rows), from_attributes=True)  # type: ignore[valid-type]
+
+
+def _list_item(a: Any) -> dict:
+    return {
+        "id": a.id,
+        "title": a.title,
+        "summary": a.summary,
+        "status": a.status,
+        "author": a.author,
+        "tags": [at.tag for at in a.tags if at.tag is not None],
+        "created_at": a.created_at,
+        "updated_at": a.updated_at,
+        "view_count": a.view_count or 0,
+        "comment_count": a.comment_count or 0,
+    }
+
+
+def article_list_items(articles: Iterable[Any]) -> List[ArticleListResponse]:
+    """把 ORM Article（已加载 author / tags.tag）批量转换为 ArticleListResponse"""
+    return validate_many(ArticleListResponse, (_list_item(a) for a in articles))
+
+
+def search_result_items(articles: Iterable[Any], scores: Dict[int, float]) -> List[ArticleSearchResult]:
+    """同 article_list_items，附带全文检索查询算出的相关度分数"""
+    return validate_many(ArticleSearchResult, ({**_list_item(a), "score": scores.get(a.id)} for a in articles))
+
+
+def dump_json(payload: Any, tp: Any = None) -> bytes:
+    """指定 tp 时用对应 TypeAdapter 序列化，否则由 pydantic-core 按运行时类型序列化"""
+    if tp is not None:
+        return adapter_for(tp).dump_json(payload)
+    return to_json(payload)
+
+
+class PreEncodedJSONResponse(Response):
+    """内容已经是 JSON bytes 的响应"""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dump_json(content)
+
+
+def json_response(
+    payload: Any,
+    tp: Any = None,
+    status_code: int = 200,
+    headers: Optional[Mapping[str, str]] = None,
+) -> Response:
+    """序列化一次并直接返回，跳过 FastAPI 的 response_model 二次校验"""
+    return PreEncodedJSONResponse(dump_json(payload, tp), status_code=status_code, headers=headers)
@@ -0,0 +1,79 @@
+from typing import Dict, Iterable, List
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.tag import ArticleTag, Tag
+
+'''
+标签批量解析 / 关联同步
+
+所有函数只在调用方的事务内执行，不 commit：
+创建 / 更新文章、后台管理、批量导入都可以把文章写入和标签处理放进同一个事务。
+'''
+
+
+def normalize_tag_names(names: Iterable[str] | None) -> List[str]:
+    """去空白、去空串、保序去重"""
+    seen: Dict[str, None] = {}
+    for name in names or []:
+        name = (name or "").strip()
+        if name:
+            seen.setdefault(name, None)
+    return list(seen)
+
+
+async def resolve_tags(db: AsyncSession, names: Iterable[str] | None) -> Dict[str, int]:
+    """
+    把标签名解析为 {name: tag_id}，不存在的标签批量创建
+
+    一次 IN 查询取已有标签；缺失的用 ON CONFLICT (name) DO NOTHING 批量插入，
+    并发请求同时创建同名标签时不会因唯一约束失败，最后再查一次补齐 id。
+    """
+    wanted = normalize_tag_names(names)
+    if not wanted:
+        return {}
+
+    result = await db.execute(select(Tag.name, Tag.id).where(Tag.name.in_(wanted)))
+    resolved: Dict[str, int] = {name: tag_id for name, tag_id in result.all()}
+
+    missing = [name for name in wanted if name not in resolved]
+    if missing:
+        dialect_insert = pg_insert if settings.is_postgres else sqlite_insert
+        await db.execute(
+            dialect_insert(Tag)
+            .values([{"name": name} for name in missing])
+            .on_conflict_do_nothing(index_elements=["name"])
+        )
+        result = await db.execute(select(Tag.name, Tag.id).where(Tag.name.in_(missing)))
+        resolved.update({name: tag_id for name, tag_id in result.all()})
+
+    return {name: resolved[name] for name in wanted if name in resolved}
+
+
+async def sync_article_tags(db: AsyncSession, article_id: int, names: Iterable[str] | None) -> Dict[str, int]:
+    """按差异同步文章的标签关联：只删除多余的、只插入新增的"""
+    tag_ids = await resolve_tags(db, names)
+    wanted = set(tag_ids.values())
+
+    result = await db.execute(select(ArticleTag.tag_id).where(ArticleTag.article_id == article_id))
+    existing = set(result.scalars().all())
+
+    stale = existing - wanted
+    if stale:
+        await db.execute(
+            delete(ArticleTag).where(
+                ArticleTag.article_id == article_id,
+                ArticleTag.tag_id.in_(stale)
+            )
+        )
+    added = [tag_id for tag_id in tag_ids.values() if tag_id not in existing]
+    if added:
+        await db.execute(
+            insert(ArticleTag),
+            [{"article_id": article_id, "tag_id": tag_id} for tag_id in added]
+        )
+    return tag_ids
@@ -0,0 +1,208 @@
+import logging
+import math
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer, selectinload
+
+from app.core.config import settings
+from app.core.redis import redis_manager
+from app.core.serialization import article_list_items
+from app.models.article import Article, ArticleStatus
+from app.models.tag import ArticleTag
+from app.schemas.article import TrendingArticle, TrendingResponse
+
+logger = logging.getLogger(__name__)
+
+# 榜单窗口：Redis 中的衰减半衰期取自配置，数据库兜底时按固定时间范围统计
+WINDOWS = {
+    "day": timedelta(days=1),
+    "week": timedelta(days=7),
+}
+
+
+class Trending:
+    '''
+    热门文章榜（指数时间衰减）
+
+    存储规则（每个窗口一组）：
+        article:trending:{window}         ZSET，member=article_id，score=相对 epoch 放大后的分数
+        article:trending:{window}:epoch   分数基准时间（unix 秒）
+
+    前向衰减：t 时刻的事件按 weight * e^((t - epoch) / tau) 累加（ZINCRBY），
+    旧分数无需逐个重算，排名始终正确；展示分数 = score * e^(-(now - epoch) / tau)。
+    compact 定时任务用 ZUNIONSTORE 的 WEIGHTS 一次把整个榜单乘回 now 基准，
+    同时删掉衰减到阈值以下的文章并截断长度，防止分数溢出和集合无限增长。
+    '''
+    KEY_PREFIX = "article:trending"
+
+    # 各类事件的权重
+    VIEW_WEIGHT = 1.0
+    COMMENT_WEIGHT = 5.0
+    DONATION_WEIGHT = 20.0
+
+    # 衰减到该分数以下的文章在 compact 时移出榜单
+    MIN_SCORE = 0.05
+
+    @staticmethod
+    def _tau(window: str) -> float:
+        hours = {
+            "day": settings.trending_day_half_life_hours,
+            "week": settings.trending_week_half_life_hours,
+        }[window]
+        return hours * 3600 / math.log(2)
+
+    def _key(self, window: str) -> str:
+        return f"{self.KEY_PREFIX}:{window}"
+
+    def _epoch_key(self, window: str) -> str:
+        return f"{self.KEY_PREFIX}:{window}:epoch"
+
+    async def _epochs(self, now: float) -> Dict[str, float]:
+        """读取各窗口的基准时间，不存在时以当前时间初始化（SET NX，多进程只有一个生效）"""
+        redis = redis_manager.redis
+        if redis is None:
+            return {}
+        windows = list(WINDOWS)
+        values = await redis.mget([self._epoch_key(w) for w in windows])
+        epochs = {}
+        for window, value in zip(windows, values):
+            if value is None:
+                await redis.set(self._epoch_key(window), now, nx=True)
+                value = await redis.get(self._epoch_key(window))
+            epochs[window] = float(value)
+        return epochs
+
+    async def record(self, article_id: int, weight: float):
+        """
+        记录一次事件，日榜 / 周榜一起累加（两次往返：读 epoch + 管道 ZINCRBY）
+
+        与 compact 并发时，事件可能按旧 epoch 放大，误差不超过 e^(compact 间隔 / tau)，可忽略
+        """
+        if redis_manager.redis is None:
+            return
+        now = time.time()
+        try:
+            epochs = await self._epochs(now)
+            pipe = redis_manager.redis.pipeline(transaction=False)
+            for window, epoch in epochs.items():
+                pipe.zincrby(self._key(window), weight * math.exp((now - epoch) / self._tau(window)), str(article_id))
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"热门榜单累加失败: {e}")
+
+    async def record_view(self, article_id: int):
+        await self.record(article_id, self.VIEW_WEIGHT)
+
+    async def record_comment(self, article_id: int):
+        await self.record(article_id, self.COMMENT_WEIGHT)
+
+    async def record_donation(self, article_id: Optional[int]):
+        if article_id:
+            await self.record(article_id, self.DONATION_WEIGHT)
+
+    async def remove(self, article_id: int):
+        """文章删除后移出所有榜单"""
+        if redis_manager.redis is None:
+            return
+        try:
+            pipe = redis_manager.redis.pipeline(transaction=False)
+            for window in WINDOWS:
+                pipe.zrem(self._key(window), str(article_id))
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"移出热门榜单失败: {e}")
+
+    async def top(self, window: str, limit: int) -> Optional[List[Tuple[int, float]]]:
+        """
+        取榜单前 limit 名（ZREVRANGE，O(log n + limit)），返回 [(article_id, 当前分数)]
+
+        Redis 不可用时返回 None，由调用方走数据库兜底
+        """
+        if redis_manager.redis is None:
+            return None
+        try:
+            epoch = await redis_manager.redis.get(self._epoch_key(window))
+            rows = await redis_manager.redis.zrevrange(self._key(window), 0, limit - 1, withscores=True)
+        except Exception as e:
+            logger.warning(f"读取热门榜单失败: {e}")
+            return None
+        if not rows or epoch is None:
+            return []
+        factor = math.exp(-(time.time() - float(epoch)) / self._tau(window))
+        return [(int(member), score * factor) for member, score in rows]
+
+    async def compact(self) -> Dict[str, int]:
+        """把各榜单分数统一衰减到当前时间并清理尾部，返回每个窗口剩余的文章数"""
+        if redis_manager.redis is None:
+            return {}
+        redis = redis_manager.redis
+        now = time.time()
+        remaining = {}
+        for window, epoch in (await self._epochs(now)).items():
+            key = self._key(window)
+            factor = math.exp(-(now - epoch) / self._tau(window))
+            pipe = redis.pipeline(transaction=True)
+            pipe.zunionstore(key, {key: factor})
+            pipe.zremrangebyscore(key, "-inf", f"({self.MIN_SCORE}")
+            # 只保留分数最高的 trending_max_size 篇
+            pipe.zremrangebyrank(key, 0, -(settings.trending_max_size + 1))
+            pipe.set(self._epoch_key(window), now)
+            pipe.zcard(key)
+            results = await pipe.execute()
+            remaining[window] = results[-1]
+        return remaining
+
+    async def _fetch_articles(self, db: AsyncSession, query) -> List[Article]:
+        result = await db.execute(
+            query.where(Article.status == ArticleStatus.PUBLISHED).options(
+                defer(Article.content),
+                defer(Article.latex_content),
+                selectinload(Article.author),
+                selectinload(Article.tags).selectinload(ArticleTag.tag)
+            )
+        )
+        return list(result.scalars().all())
+
+    async def _from_database(self, db: AsyncSession, window: str, limit: int) -> List[TrendingArticle]:
+        """兜底：窗口内发布的文章按 浏览量 + 评论数加权 排序（只扫描 published_at 索引范围内的行）"""
+        since = datetime.now(timezone.utc) - WINDOWS[window]
+        score = Article.view_count * self.VIEW_WEIGHT + Article.comment_count * self.COMMENT_WEIGHT
+        articles = await self._fetch_articles(
+            db,
+            select(Article)
+            .where(Article.published_at >= since)
+            .order_by(score.desc(), Article.id.desc())
+            .limit(limit)
+        )
+        items = article_list_items(articles)
+        return [
+            TrendingArticle.model_validate({**dict(item), "score": float(
+                item.view_count * self.VIEW_WEIGHT + item.comment_count * self.COMMENT_WEIGHT
+            )})
+            for item in items
+        ]
+
+    async def fetch(self, db: AsyncSession, window: str, limit: int) -> TrendingResponse:
+        """返回榜单（已补齐文章信息）；Redis 不可用或榜单为空时用数据库兜底"""
+        # 多取一些，抵消草稿 / 已删除的文章
+        ranked = await self.top(window, limit * 2)
+        if ranked:
+            scores = dict(ranked)
+            articles = await self._fetch_articles(db, select(Article).where(Article.id.in_(scores)))
+            articles.sort(key=lambda a: scores[a.id], reverse=True)
+            items = [
+                TrendingArticle.model_validate({**dict(item), "score": scores[item.id]})
+                for item in article_list_items(articles[:limit])
+            ]
+            if items:
+                return TrendingResponse(window=window, source="redis", items=items)
+        items = await self._from_database(db, window, limit)
+        return TrendingResponse(window=window, source="database", items=items)
+
+
+# 实例化
+trending = Trending()
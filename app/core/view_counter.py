@@ -0,0 +1,178 @@
+import logging
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Dict, Iterable, Optional, Tuple, cast
+
+from redis.exceptions import ResponseError, WatchError
+from sqlalchemy import bindparam, delete, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.article_cache import article_cache
+from app.core.config import settings
+from app.core.database import async_session
+from app.core.redis import redis_manager
+from app.models.article import Article
+from app.models.view_flush import ArticleViewFlush
+
+logger = logging.getLogger(__name__)
+
+
+class ViewCounter:
+    '''
+    文章浏览量写回缓冲（write-behind）
+
+    存储规则：
+        article:views:pending   Hash，field=article_id，value=待落库增量（HINCRBY）
+        article:views:flushing  Hash，flush 过程中的快照（RENAMENX 得到，保证原子交接且不覆盖已有快照），
+                                另有 _batch 字段保存快照的批次号
+
+    快照落库时把批次号写入 article_view_flush（与 UPDATE 同一事务），落库成功后再删除快照；
+    删除失败或多个进程同时 flush 同一快照时，批次号已存在，不会重复累加。
+    展示用的待落库增量包含 pending 和 flushing 两部分，flush 期间浏览量不会回落。
+    Redis 不可用时退化为进程内累加器，由同一个 flush 任务落库。
+    '''
+    PENDING_KEY = "article:views:pending"
+    FLUSHING_KEY = "article:views:flushing"
+    BATCH_FIELD = "_batch"
+    # 批次号只需覆盖快照清理失败到下一次 flush 之间，保留一天足够
+    BATCH_RETENTION = timedelta(days=1)
+
+    def __init__(self):
+        self._local: Dict[int, int] = defaultdict(int)
+
+    async def incr(self, article_id: int, amount: int = 1):
+        """记录一次浏览（不访问数据库）"""
+        if redis_manager.redis is not None:
+            try:
+                await cast(Awaitable[int], redis_manager.redis.hincrby(self.PENDING_KEY, str(article_id), amount))
+                return
+            except Exception as e:
+                logger.warning(f"Redis 浏览量累加失败，改用进程内计数: {e}")
+        self._local[article_id] += amount
+
+    async def pending(self, article_id: int) -> int:
+        """获取单篇文章尚未落库的浏览量增量"""
+        return (await self.pending_many([article_id])).get(article_id, 0)
+
+    async def pending_many(self, article_ids: Iterable[int]) -> Dict[int, int]:
+        """批量获取尚未落库的浏览量增量（pending + flushing，一次往返两条 HMGET）"""
+        ids = list(article_ids)
+        deltas = {aid: self._local.get(aid, 0) for aid in ids}
+        if not ids or redis_manager.redis is None:
+            return deltas
+        fields = [str(aid) for aid in ids]
+        try:
+            pipe = redis_manager.redis.pipeline(transaction=False)
+            pipe.hmget(self.PENDING_KEY, fields)
+            pipe.hmget(self.FLUSHING_KEY, fields)
+            pending, flushing = await pipe.execute()
+        except Exception as e:
+            logger.warning(f"读取待落库浏览量失败: {e}")
+            return deltas
+        for aid, *values in zip(ids, pending, flushing):
+            deltas[aid] += sum(int(value) for value in values if value)
+        return deltas
+
+    async def _drain_redis(self) -> Tuple[Optional[str], Dict[int, int]]:
+        """把 Redis 中的待落库增量原子地切换到 flushing 快照并读出，返回 (批次号, 增量)"""
+        redis = redis_manager.redis
+        assert redis is not None
+        try:
+            # 检查和切换必须是一条命令：flushing 快照已存在（上次 flush 中途失败，或其他进程正在 flush）时
+            # RENAMENX 返回 0 且不覆盖它，本次处理已有快照，新的增量留在 pending 等下一次
+            await redis.renamenx(self.PENDING_KEY, self.FLUSHING_KEY)
+        except ResponseError:
+            # pending 不存在，只可能有遗留的快照
+            pass
+        async with redis.pipeline(transaction=True) as pipe:
+            try:
+                # 快照可能刚被其他进程落库并删除，WATCH 避免为已删除的快照重新写入批次号
+                await pipe.watch(self.FLUSHING_KEY)
+                if not await pipe.exists(self.FLUSHING_KEY):
+                    return None, {}
+                pipe.multi()
+                pipe.hsetnx(self.FLUSHING_KEY, self.BATCH_FIELD, uuid.uuid4().hex)
+                pipe.hgetall(self.FLUSHING_KEY)
+                _, raw = await pipe.execute()
+            except WatchError:
+                # 其他进程同时在处理这个快照，交给它
+                return None, {}
+        batch_id = raw.pop(self.BATCH_FIELD, None)
+        return batch_id, {int(k): int(v) for k, v in raw.items() if int(v)}
+
+    @staticmethod
+    async def _claim_batch(session: AsyncSession, batch_id: str) -> bool:
+        """记录快照批次号（不提交）；已存在说明该快照已经落库，返回 False"""
+        dialect_insert = pg_insert if settings.is_postgres else sqlite_insert
+        result = await session.execute(
+            dialect_insert(ArticleViewFlush).values(batch_id=batch_id).on_conflict_do_nothing()
+        )
+        await session.execute(delete(ArticleViewFlush).where(
+            ArticleViewFlush.created_at < datetime.now(timezone.utc) - ViewCounter.BATCH_RETENTION
+        ))
+        return result.rowcount == 1
+
+    async def flush(self) -> int:
+        """将累计的浏览量用一条批量 UPDATE 写回 article.view_count，返回落库文章数"""
+        local, self._local = self._local, defaultdict(int)
+
+        batch_id: Optional[str] = None
+        from_redis: Dict[int, int] = {}
+        if redis_manager.redis is not None:
+            try:
+                batch_id, from_redis = await self._drain_redis()
+            except Exception as e:
+                logger.warning(f"读取 Redis 浏览量缓冲失败: {e}")
+
+        if not local and batch_id is None:
+            return 0
+
+        # Core 批量 UPDATE（executemany），不经过 ORM 的按主键批量更新
+        stmt = (
+            update(Article)
+            .where(Article.id == bindparam("article_id"))
+            .values(
+                view_count=Article.view_count + bindparam("delta"),
+                # 浏览量不算内容变更，保持 updated_at 不变
+                updated_at=Article.updated_at,
+            )
+        )
+        deltas: Dict[int, int] = defaultdict(int)
+        try:
+            async with async_session() as session:
+                if batch_id is not None and await self._claim_batch(session, batch_id):
+                    for aid, amount in from_redis.items():
+                        deltas[aid] += amount
+                for aid, amount in local.items():
+                    deltas[aid] += amount
+                if deltas:
+                    connection = await session.connection()
+                    await connection.execute(
+                        stmt, [{"article_id": aid, "delta": amount} for aid, amount in deltas.items()]
+                    )
+                await session.commit()
+        except Exception as e:
+            logger.error(f"浏览量落库失败，增量已放回缓冲: {e}")
+            for aid, amount in local.items():
+                self._local[aid] += amount
+            return 0
+
+        if batch_id is not None and redis_manager.redis is not None:
+            try:
+                await redis_manager.redis.delete(self.FLUSHING_KEY)
+            except Exception as e:
+                # 批次号已落库，下次 flush 读到同一快照时只会删除它
+                logger.error(f"清理浏览量 flushing 快照失败: {e}")
+        if not deltas:
+            return 0
+        # 详情 / 列表缓存里保存的是已落库浏览量，返回前叠加的缓冲增量在落库后变小，不重建会让展示的浏览量回落；
+        # 列表代数每个 flush 周期（VIEW_COUNT_FLUSH_INTERVAL）最多递增一次
+        await article_cache.invalidate_articles(deltas.keys())
+        return len(deltas)
+
+
+# 实例化
+view_counter = ViewCounter()
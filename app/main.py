@@ -27,7 +27,7 @@ if os.getenv('NO_PROXY') is not None:
 import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, ORJSONResponse
 from fastapi.exceptions import RequestValidationError
 from pydantic import ValidationError
 from starlette.middleware.base import BaseHTTPMiddleware
@@ -38,6 +38,13 @@ from app.core.apscheduler.registry import start_scheduler, stop_scheduler
 from app.core.config import settings
 from app.core.database import engine, create_db_and_tables, async_session
 from app.core.redis import redis_manager
+from app.core.view_counter import view_counter
+from app.core.article_cache import article_cache
+from app.core.article_render import article_renderer
+from app.core.feeds import site_feeds
+from app.core.media_store import media_store
+from app.core.image_variants import image_variants
+from app.core.comment_count import refresh_comment_counts
 from app.core.middleware import setup_middleware
 from app.core.exceptions import BlogException
 from app.api.v1.auth import router as auth_router
@@ -50,6 +57,8 @@ from app.api.v1.oauth import router as oauth_router
 from app.api.v1.config import router as config_router
 from app.api.v1.donation import router as donation_router
 from app.api.v1.admin import router as admin_router
+from app.api.v1.feed import router as feed_router
+from app.api.v1.media import router as media_router
 from sqladmin import Admin, ModelView, action
 from sqladmin.authentication import AuthenticationBackend
 from starlette.responses import RedirectResponse
@@ -196,12 +205,23 @@ async def lifespan(app: FastAPI):
                     await session.execute(stmt)
                     
                     await session.commit()
+                    await article_cache.invalidate_articles(pks_int)
+                    await site_feeds.invalidate()
                     return True
                 except Exception as e:
                     await session.rollback()
                     print(f"删除文章失败: {e}")
                     return False
 
+        async def after_model_change(self, data: dict, model: Article, is_created: bool, request: Request) -> None:
+            # 后台修改内容后补做预渲染（内容未变时跳过）
+            async with async_session() as session:
+                article = await session.get(Article, model.id)
+                if article is not None and await article_renderer.store(session, article):
+                    await session.commit()
+            await article_cache.invalidate_article(model.id)
+            await site_feeds.invalidate()
+
     class TagAdmin(ModelView, model=Tag):
         column_list = ["id", "name", "description", "created_at"]
         form_columns = ["name", "description"]
@@ -240,6 +260,8 @@ async def lifespan(app: FastAPI):
             """自定义删除方法，删除评论时也删除子评论"""
             async with async_session() as session:
                 try:
+                    result = await session.execute(select(Comment.article_id).where(Comment.id.in_(pks)))
+                    article_ids = {row[0] for row in result.fetchall()}
                     for pk in pks:
                         # 删除子评论
                         await session.execute(delete(Comment).where(Comment.parent_id == pk))
@@ -247,13 +269,21 @@ async def lifespan(app: FastAPI):
                         # 删除评论本身
                         await session.execute(delete(Comment).where(Comment.id == pk))
                     
+                    await refresh_comment_counts(session, article_ids)
                     await session.commit()
+                    await article_cache.invalidate_articles(article_ids)
                     return True
                 except Exception as e:
                     await session.rollback()
                     print(f"删除评论失败: {e}")
                     return False
 
+        async def after_model_change(self, data: dict, model: Comment, is_created: bool, request: Request) -> None:
+            async with async_session() as session:
+                await refresh_comment_counts(session, [model.article_id])
+                await session.commit()
+            await article_cache.invalidate_article(model.article_id)
+
     class MediaFileAdmin(ModelView, model=MediaFile):
         column_list = ["id", "filename", "type", "url", "size", "upload_time", "description", "uploader_id", "uploader"]
         column_formatters = {
@@ -286,6 +316,9 @@ async def lifespan(app: FastAPI):
                             media_files.append(media)
 
                     for media in media_files:
+                        # 内容寻址文件由引用计数回收，不直接删除文件本体
+                        if media.blob_sha256:
+                            continue
                         # 类型安全检查 url 和 uploader_id
                         if not media.url:
                             print(f"⚠️ MediaFile {media.id} url 为空，跳过删除物理文件")
@@ -306,10 +339,14 @@ async def lifespan(app: FastAPI):
                             print(f"⚠️ 删除物理文件失败: {media.filename} -> {e}")
 
                     # 批量删除数据库对象
+                    blob_sha256s = [media.blob_sha256 for media in media_files if media.blob_sha256]
+                    await media_store.release(session, blob_sha256s)
+                    await image_variants.purge(session, [media.url for media in media_files if not media.blob_sha256])
                     for media in media_files:
                         await session.delete(media)
 
                     await session.commit()
+                    await media_store.collect(session, blob_sha256s)
                     return True
 
                 except Exception as e:
@@ -573,6 +610,14 @@ async def lifespan(app: FastAPI):
     # Stop scheduler
     await stop_scheduler()
     print("Scheduler stopped")
+
+    # Flush buffered view counts
+    await view_counter.flush()
+    print("View counts flushed")
+
+    # Stop render process pool
+    article_renderer.shutdown()
+    image_variants.shutdown()
     
     # Disconnect from Redis
     await redis_manager.disconnect()
@@ -586,7 +631,8 @@ app = FastAPI(
     description="A complete FastAPI blog system with JWT authentication, articles, comments, and tags",
     version="1.0.0",
     debug=settings.debug,
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # 挂载 uploads 静态资源目录
@@ -692,6 +738,8 @@ app.include_router(oauth_router, prefix="/api/v1")
 app.include_router(config_router, prefix="/api/v1")
 app.include_router(donation_router, prefix="/api/v1")
 app.include_router(admin_router,prefix="/api/v1")
+app.include_router(media_router, prefix="/api/v1")
+app.include_router(feed_router)
 
 
 
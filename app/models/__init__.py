@@ -1,10 +1,13 @@
 from .article import Article
 from .comment import Comment
 from .donation import DonationGoal,DonationConfig, DonationRecord
-from .media import MediaFile
+from .media import MediaBlob, MediaDerivative, MediaFile
+from .related import ArticleRelated, ArticleRelatedState
+from .search_index import SearchIndexState
 from .system_notification import SystemNotification
 from .tag import Tag,ArticleTag
 from .user import User,OAuthAccount
+from .view_flush import ArticleViewFlush
 
 __all_models__ = [
     User,
@@ -13,7 +16,13 @@ __all_models__ = [
     Comment,
     Tag,
     ArticleTag,
+    MediaBlob,
     MediaFile,
+    MediaDerivative,
+    ArticleRelated,
+    ArticleRelatedState,
+    SearchIndexState,
+    ArticleViewFlush,
     DonationConfig,
     DonationGoal,
     DonationRecord,
@@ -3,7 +3,7 @@ from typing import Optional, List, TYPE_CHECKING, Any
 from pydantic import BaseModel
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from enum import Enum
-from sqlalchemy import Column, DateTime, ForeignKey, Index, Text, func
+from sqlalchemy import JSON, Column, DateTime, ForeignKey, Index, String, Text, func
 from sqlalchemy.dialects.postgresql import TSVECTOR
 from app.core.config import settings
 from app.core.base import BaseModelMixin
@@ -40,13 +40,22 @@ class Article(ArticleBase, BaseModelMixin):
     author_id: Mapped[int] = mapped_column(ForeignKey("user.id"))
     published_at: Mapped[Optional[datetime]] = mapped_column(default=None, nullable=True, comment="发布时间")
     view_count: Mapped[int] = mapped_column(default=0, comment="浏览量")
+    comment_count: Mapped[int] = mapped_column(default=0, server_default="0", comment="评论数（冗余计数，随评论增删在同一事务内维护）")
+    # 写入时预渲染（见 app/core/article_render.py），内容哈希不变则不重新渲染
+    content_hash: Mapped[Optional[str]] = mapped_column(String(64), default=None, nullable=True, comment="预渲染对应的内容哈希")
+    content_html: Mapped[Optional[str]] = mapped_column(Text, default=None, nullable=True, deferred=True, comment="预渲染HTML")
+    content_toc: Mapped[Optional[list]] = mapped_column(JSON, default=None, nullable=True, deferred=True, comment="目录（标题层级/锚点）")
 
     # ✅ 永远声明字段，避免 Alembic 忽略字段变化
     # Full-text search columns (手动注入 Column 类型)
     tsv_zh = fts["tsv_zh"]
     tsv_en = fts["tsv_en"]
 
-    __table_args__ = tuple(fts["indexes"])  # 添加 GIN 索引（仅 PostgreSQL 下有效）
+    __table_args__ = (
+        *fts["indexes"],  # 添加 GIN 索引（仅 PostgreSQL 下有效）
+        Index("idx_article_created_at_id", "created_at", "id"),  # 游标分页
+        Index("idx_article_published_at", "published_at"),  # 热门榜单的数据库兜底按发布时间取窗口
+    )
     # print(f"🧪 IS_POSTGRES={settings.is_postgres}, DB={settings.database_url}")
 
     # relationships
@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import Optional, List, TYPE_CHECKING
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.core.base import BaseModelMixin
 
@@ -20,6 +20,10 @@ class Comment(BaseModelMixin):
     parent_id: Mapped[Optional[int]] = mapped_column(ForeignKey("comment.id", ondelete="CASCADE"), default=None)
     is_approved: Mapped[bool] = mapped_column(default=True)
 
+    __table_args__ = (
+        Index("idx_comment_article_created_at_id", "article_id", "created_at", "id"),  # 游标分页
+    )
+
     # relationships
     article: Mapped[Optional["Article"]] = relationship(back_populates="comments")
     author: Mapped[Optional["User"]] = relationship(back_populates="comments")
@@ -3,7 +3,7 @@ from typing import TYPE_CHECKING, Optional
 from decimal import Decimal
 from enum import Enum
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import DateTime, ForeignKey, func, String, Boolean, Text
+from sqlalchemy import DateTime, ForeignKey, Index, func, String, Boolean, Text
 from app.core.base import BaseModelMixin
 
 if TYPE_CHECKING:
@@ -56,9 +56,16 @@ class DonationRecord(BaseModelMixin):
     user: Mapped[Optional["User"]] = relationship(back_populates="donations")
     
     goal_id: Mapped[Optional[int]] = mapped_column(ForeignKey("donation_goal.id"), comment="关联捐赠目标ID", default=None)
+    article_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("article.id", ondelete="SET NULL"), comment="打赏的文章ID（计入热门榜）", default=None
+    )
     
     paid_at: Mapped[Optional[datetime]] = mapped_column(default=None, comment="支付完成时间")
 
+    __table_args__ = (
+        Index("idx_donation_record_created_at_id", "created_at", "id"),  # 游标分页
+    )
+
 
 class DonationGoal(BaseModelMixin):
     __tablename__ = "donation_goal"
@@ -1,8 +1,8 @@
-from typing import Optional, TYPE_CHECKING
+from typing import List, Optional, TYPE_CHECKING
 from enum import Enum
 from datetime import datetime
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import DateTime, ForeignKey, func
+from sqlalchemy import DateTime, ForeignKey, Index, String, UniqueConstraint, func
 from app.core.base import BaseModelMixin
 
 if TYPE_CHECKING:
@@ -13,6 +13,15 @@ class MediaType(str, Enum):
     video = "video"
     pdf = "pdf"
 
+class MediaBlob(BaseModelMixin):
+    """按内容寻址的文件实体：相同内容只存一份，由 MediaFile 引用计数"""
+    __tablename__ = "media_blob"
+    sha256: Mapped[str] = mapped_column(String(64), primary_key=True)
+    size: Mapped[int] = mapped_column()
+    path: Mapped[str] = mapped_column(comment="相对 uploads 目录的存储路径（blobs/ab/cd/<sha256><ext>）")
+    refcount: Mapped[int] = mapped_column(default=0, server_default="0", comment="引用该内容的 MediaFile 数")
+
+
 class MediaFile(BaseModelMixin):
     __tablename__ = "media_file"
     id: Mapped[int] = mapped_column(default=None, primary_key=True)
@@ -23,6 +32,34 @@ class MediaFile(BaseModelMixin):
     upload_time: Mapped[datetime] = mapped_column( DateTime(timezone=True),nullable=False,server_default=func.now())
     description: Mapped[Optional[str]] =mapped_column()
     uploader_id: Mapped[Optional[int]] = mapped_column(ForeignKey("user.id"),default=None)
+    # 为空表示内容寻址存储之前上传的文件（url 指向独立文件）
+    blob_sha256: Mapped[Optional[str]] = mapped_column(String(64), ForeignKey("media_blob.sha256"), default=None, index=True)
     uploader: Mapped[Optional["User"]] = relationship(back_populates="media_files")
+    # 图片衍生版本按原文件 URL 关联（内容相同的文件共享）
+    derivatives: Mapped[List["MediaDerivative"]] = relationship(
+        primaryjoin="foreign(MediaDerivative.source_url) == MediaFile.url", viewonly=True
+    )
     # 可选：定义关系
-    # uploader: Optional["User"] = relationship(back_populates="media_files") 
\ No newline at end of file
+    # uploader: Optional["User"] = relationship(back_populates="media_files")
+
+    __table_args__ = (
+        # 媒体库按上传时间倒序翻页 / 按上传者过滤；get_media 按 (type, filename) 查找，也支持文件名前缀过滤
+        Index("idx_media_file_upload_time", "upload_time", "id"),
+        Index("idx_media_file_uploader_time", "uploader_id", "upload_time"),
+        Index("idx_media_file_type_filename", "type", "filename"),
+    )
+
+
+class MediaDerivative(BaseModelMixin):
+    """图片衍生版本（缩放 / WebP / AVIF），与原文件放在同一目录，原文件删除时一起删除"""
+    __tablename__ = "media_derivative"
+    id: Mapped[int] = mapped_column(default=None, primary_key=True)
+    source_url: Mapped[str] = mapped_column(comment="原文件 URL（与 MediaFile.url 相同）")
+    width: Mapped[int] = mapped_column(comment="目标宽度档位（原图更窄时不放大）")
+    format: Mapped[str] = mapped_column(String(8))
+    path: Mapped[str] = mapped_column(comment="相对 uploads 目录的存储路径")
+    size: Mapped[int] = mapped_column()
+
+    __table_args__ = (
+        UniqueConstraint("source_url", "width", "format", name="uq_media_derivative_variant"),
+    )
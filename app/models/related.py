@@ -0,0 +1,24 @@
+from sqlalchemy import ForeignKey, Index, String
+from sqlalchemy.orm import Mapped, mapped_column
+from app.core.base import BaseModelMixin
+
+
+class ArticleRelated(BaseModelMixin):
+    """相关文章（离线计算的 top-K 近邻，见 app/core/related_articles.py）"""
+    __tablename__ = "article_related"
+    id: Mapped[int] = mapped_column(default=None, primary_key=True)
+    article_id: Mapped[int] = mapped_column(ForeignKey("article.id", ondelete="CASCADE"))
+    related_id: Mapped[int] = mapped_column(ForeignKey("article.id", ondelete="CASCADE"))
+    rank: Mapped[int] = mapped_column(comment="名次，从 0 开始")
+    score: Mapped[float] = mapped_column(comment="TF-IDF 余弦与标签 Jaccard 的加权分数")
+
+    __table_args__ = (
+        Index("idx_article_related_article_rank", "article_id", "rank"),
+    )
+
+
+class ArticleRelatedState(BaseModelMixin):
+    """每篇文章上次参与计算时的字段摘要，增量更新只重算摘要变化的文章"""
+    __tablename__ = "article_related_state"
+    article_id: Mapped[int] = mapped_column(ForeignKey("article.id", ondelete="CASCADE"), primary_key=True)
+    signature: Mapped[str] = mapped_column(String(40), comment="标题 / 摘要 / 正文 / 标签的 SHA-1")
@@ -0,0 +1,18 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import DateTime, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.base import BaseModelMixin
+
+
+class SearchIndexState(BaseModelMixin):
+    """全文索引的结构版本和已索引到的位置，启动时据此决定全量重建还是增量补齐"""
+    __tablename__ = "search_index_state"
+    name: Mapped[str] = mapped_column(String(32), primary_key=True)
+    version: Mapped[int] = mapped_column(default=0, server_default="0", comment="建立索引时的 INDEX_VERSION，0 表示尚未建立")
+    indexed_until: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), default=None, comment="已索引文章的最大 updated_at"
+    )
+    last_id: Mapped[int] = mapped_column(default=0, server_default="0", comment="已索引文章的最大 id")
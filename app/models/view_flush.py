@@ -0,0 +1,10 @@
+from sqlalchemy import String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.base import BaseModelMixin
+
+
+class ArticleViewFlush(BaseModelMixin):
+    """已落库的浏览量快照批次（与批量 UPDATE 同一事务写入），快照清理失败后重复 flush 时据此跳过"""
+    __tablename__ = "article_view_flush"
+    batch_id: Mapped[str] = mapped_column(String(32), primary_key=True)
@@ -94,16 +94,70 @@ class ArticleListResponse(BaseModel):
         from_attributes = True
 
 
+class ArticleSearchResult(ArticleListResponse):
+    """搜索结果：按相关度排序时附带分数（越大越相关，已包含时间加成）"""
+    score: Optional[float] = None
+
+
+class TocEntry(BaseModel):
+    """目录项"""
+    level: int
+    id: str
+    title: str
+
+
+class ArticleBatchItem(BaseModel):
+    """批量获取的文章投影（稀疏字段集，未请求的字段不出现在响应中）"""
+    id: int
+    title: Optional[str] = None
+    summary: Optional[str] = None
+    status: Optional[ArticleStatus] = None
+    author: Optional[UserBasicInfo] = None
+    tags: Optional[List[TagInfo]] = None
+    view_count: Optional[int] = None
+    comment_count: Optional[int] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    content: Optional[str] = None
+
+
+class ArticleBatchResponse(BaseModel):
+    """批量获取文章响应模型"""
+    items: List[ArticleBatchItem] = []
+    missing: List[int] = Field(default=[], description="不存在的文章ID")
+
+
+class TrendingArticle(ArticleListResponse):
+    """热门文章项"""
+    score: float = Field(description="按时间衰减后的热度分数")
+
+
+class RelatedArticle(ArticleListResponse):
+    """相关文章项"""
+    score: float = Field(description="TF-IDF 余弦与标签 Jaccard 的加权相似度")
+
+
+class TrendingResponse(BaseModel):
+    """热门文章榜响应模型"""
+    window: str
+    source: str = Field(description="redis：实时衰减榜单；database：Redis 不可用时的数据库兜底")
+    items: List[TrendingArticle] = []
+
+
 class ArticleDetailResponse(BaseModel):
     """文章详情响应模型"""
     id: int
     title: str
     content: str
+    content_html: Optional[str] = None
+    toc: List[TocEntry] = []
+    has_latex: bool = False
     summary: Optional[str] = None
     status: ArticleStatus
     author: UserBasicInfo
     tags: List[TagInfo] = []
-    comments: List[CommentBasicInfo] = []
+    comments: List[CommentBasicInfo] = Field(default=[], description="已废弃，始终为空；评论请使用 /{article_id}/comments/tree")
+    comment_count: int = 0
     created_at: datetime
     updated_at: datetime
     view_count: int = 0
@@ -112,6 +166,21 @@ class ArticleDetailResponse(BaseModel):
         from_attributes = True
 
 
+class CommentTreeNode(BaseModel):
+    """评论树节点"""
+    id: int
+    content: str
+    author: UserBasicInfo
+    article_id: int
+    parent_id: Optional[int] = None
+    created_at: datetime
+    updated_at: datetime
+    depth: int = 0
+    reply_count: int = Field(0, description="直接回复总数")
+    replies: List['CommentTreeNode'] = []
+    replies_cursor: Optional[str] = Field(None, description="还有未加载的回复时，用于“加载更多回复”的游标")
+
+
 class CommentCreate(BaseModel):
     """创建评论请求模型"""
     content: str = Field(..., min_length=1, max_length=1000, description="评论内容")
@@ -134,4 +203,5 @@ class CommentResponse(BaseModel):
 
 
 # 解决循环引用
-CommentResponse.model_rebuild() 
\ No newline at end of file
+CommentResponse.model_rebuild()
+CommentTreeNode.model_rebuild() 
\ No newline at end of file
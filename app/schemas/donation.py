@@ -54,6 +54,7 @@ class DonationRecordCreate(BaseModel):
     currency: str = "CNY"
     payment_method: PaymentMethod
     goal_id: Optional[int] = None
+    article_id: Optional[int] = None
 
 
 class DonationRecordOut(BaseModel):
@@ -69,6 +70,7 @@ class DonationRecordOut(BaseModel):
     transaction_id: Optional[str] = None
     user_id: Optional[int] = None
     goal_id: Optional[int] = None
+    article_id: Optional[int] = None
     created_at: datetime
     updated_at: datetime
     paid_at: Optional[datetime] = None
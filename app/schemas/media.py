@@ -0,0 +1,33 @@
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+from app.models.media import MediaType
+from app.models.user import UserRole
+from app.schemas.pagination import CursorPage
+
+
+class MediaFileItem(BaseModel):
+    """媒体库列表项"""
+    id: int
+    filename: str
+    type: MediaType
+    size: int
+    upload_time: float = Field(..., description="上传时间（Unix 时间戳）")
+    url: str
+    signed_url: str
+    thumbnail_url: Optional[str] = Field(None, description="图片最小档位缩略图的签名链接")
+    uploader_id: Optional[int] = None
+    uploader_username: Optional[str] = None
+    uploader_role: Optional[UserRole] = None
+
+
+class MediaTypeTotal(BaseModel):
+    """按类型汇总的文件数和字节数"""
+    type: MediaType
+    count: int
+    bytes: int
+
+
+class MediaPage(CursorPage[MediaFileItem]):
+    """媒体库分页响应；汇总只在第一页（cursor 为空）返回"""
+    totals: Optional[List[MediaTypeTotal]] = None
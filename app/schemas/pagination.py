@@ -0,0 +1,10 @@
+from typing import Generic, List, Optional, TypeVar
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+
+class CursorPage(BaseModel, Generic[T]):
+    """游标分页响应模型"""
+    items: List[T] = []
+    next_cursor: Optional[str] = None
@@ -1,9 +1,109 @@
+import asyncio
+import hashlib
+import os
 import subprocess
+import uuid
+from dataclasses import dataclass
 from pathlib import Path
+from typing import BinaryIO
+
+# 流式上传每次读取 / 写入的块大小，单个上传的内存占用以此为上限
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
 
 class PermissionDenied(Exception):
     pass
 
+
+class UploadTooLarge(Exception):
+    def __init__(self, max_size: int):
+        super().__init__(f"upload exceeds {max_size} bytes")
+        self.max_size = max_size
+
+
+@dataclass
+class SavedUpload:
+    path: Path
+    size: int
+    sha256: str
+
+
+def _open_temp(save_dir: Path, temp_path: Path) -> BinaryIO:
+    save_dir.mkdir(parents=True, exist_ok=True)
+    return open(temp_path, "xb")
+
+
+def _write_chunk(fp: BinaryIO, digest, chunk: bytes):
+    # hashlib 处理大块数据时会释放 GIL，哈希和写盘一起放在线程里
+    digest.update(chunk)
+    fp.write(chunk)
+
+
+def _commit_temp(fp: BinaryIO, temp_path: Path, target: Path):
+    fp.flush()
+    os.fsync(fp.fileno())
+    fp.close()
+    os.replace(temp_path, target)
+
+
+def _discard_temp(fp: BinaryIO, temp_path: Path):
+    fp.close()
+    temp_path.unlink(missing_ok=True)
+
+
+def _hash_chunk(digest, chunk: bytes):
+    digest.update(chunk)
+
+
+async def hash_upload(file, max_size: int, chunk_size: int = UPLOAD_CHUNK_SIZE) -> tuple[str, int]:
+    """
+    只读一遍 UploadFile 计算 SHA-256 和大小（不写盘），读完后回到开头；
+    超过 max_size 立即抛出 UploadTooLarge
+    """
+    digest = hashlib.sha256()
+    size = 0
+    await file.seek(0)
+    while chunk := await file.read(chunk_size):
+        size += len(chunk)
+        if size > max_size:
+            raise UploadTooLarge(max_size)
+        await asyncio.to_thread(_hash_chunk, digest, chunk)
+    await file.seek(0)
+    return digest.hexdigest(), size
+
+
+async def save_upload_stream(
+    file,
+    save_dir: Path,
+    filename: str,
+    max_size: int,
+    chunk_size: int = UPLOAD_CHUNK_SIZE,
+) -> SavedUpload:
+    """
+    分块读取 UploadFile 并写入 save_dir/filename
+    - 写盘在线程池中执行，不阻塞事件循环；内存占用不超过 chunk_size
+    - 边写边计算 SHA-256
+    - 累计大小超过 max_size 立即中止（不依赖 file.size），抛出 UploadTooLarge
+    - 先写同目录下的临时文件，完成后 os.replace 原子替换；失败时删除临时文件
+    """
+    target = save_dir / filename
+    temp_path = save_dir / f".{filename}.{uuid.uuid4().hex}.part"
+    digest = hashlib.sha256()
+    size = 0
+    fp = await asyncio.to_thread(_open_temp, save_dir, temp_path)
+    try:
+        while chunk := await file.read(chunk_size):
+            size += len(chunk)
+            if size > max_size:
+                raise UploadTooLarge(max_size)
+            await asyncio.to_thread(_write_chunk, fp, digest, chunk)
+        await asyncio.to_thread(_commit_temp, fp, temp_path, target)
+    except BaseException:
+        await asyncio.to_thread(_discard_temp, fp, temp_path)
+        raise
+    return SavedUpload(path=target, size=size, sha256=digest.hexdigest())
+
+
 async def delete_file(
     file_path: Path,
     current_user_id: int,
@@ -0,0 +1,81 @@
+import os
+import uuid
+from typing import List, Optional, Sequence, Tuple
+
+from PIL import Image, ImageOps
+
+'''
+图片衍生版本生成（纯函数，在进程池子进程中执行，只依赖 Pillow）
+
+按宽度等比缩小（不放大），并转码为 WebP / AVIF 等格式；
+同一张原图的多个版本只解码一次。先写临时文件再 os.replace，读取方不会看到写了一半的文件。
+'''
+
+# Pillow 的保存格式名
+PIL_FORMATS = {
+    "avif": "AVIF",
+    "webp": "WEBP",
+    "jpeg": "JPEG",
+    "png": "PNG",
+}
+
+# 不透明才能保存的格式
+_OPAQUE_FORMATS = {"jpeg"}
+
+# 单张图片的像素上限，超过时不生成（防止解压炸弹占满子进程内存）
+MAX_PIXELS = 64_000_000
+
+
+def _prepare(image: Image.Image, fmt: str) -> Image.Image:
+    if fmt in _OPAQUE_FORMATS:
+        if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+            image = image.convert("RGBA")
+            background = Image.new("RGB", image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel("A"))
+            return background
+        return image.convert("RGB") if image.mode != "RGB" else image
+    if image.mode not in ("RGB", "RGBA"):
+        has_alpha = image.mode in ("LA", "PA") or "transparency" in image.info
+        return image.convert("RGBA" if has_alpha else "RGB")
+    return image
+
+
+def render_variants(
+    source: str,
+    variants: Sequence[Tuple[str, int, str]],
+    quality: int,
+) -> Optional[List[Tuple[str, int]]]:
+    """
+    variants 为 [(目标路径, 宽度, 格式)]，返回成功生成的 [(目标路径, 字节数)]
+
+    原图不是可处理的静态图片（无法识别 / 动图 / 像素过多）时返回 None
+    """
+    try:
+        with Image.open(source) as opened:
+            if getattr(opened, "is_animated", False):
+                return None
+            if opened.width * opened.height > MAX_PIXELS:
+                return None
+            opened.load()
+            image = ImageOps.exif_transpose(opened)
+    except (OSError, Image.DecompressionBombError, SyntaxError):
+        return None
+
+    produced = []
+    for target, width, fmt in variants:
+        if width < image.width:
+            height = max(1, round(image.height * width / image.width))
+            resized = image.resize((width, height), Image.Resampling.LANCZOS, reducing_gap=3.0)
+        else:
+            resized = image
+        output = _prepare(resized, fmt)
+        temp = os.path.join(os.path.dirname(target), f".{os.path.basename(target)}.{uuid.uuid4().hex}.part")
+        try:
+            output.save(temp, PIL_FORMATS[fmt], quality=quality, optimize=fmt in ("jpeg", "png"))
+            os.replace(temp, target)
+        except (OSError, KeyError, ValueError):
+            if os.path.exists(temp):
+                os.unlink(temp)
+            continue
+        produced.append((target, os.path.getsize(target)))
+    return produced
@@ -0,0 +1,117 @@
+import hashlib
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Dict, List
+
+import nh3
+from markdown_it import MarkdownIt
+from mdit_py_plugins.amsmath import amsmath_plugin
+from mdit_py_plugins.dollarmath import dollarmath_plugin
+
+'''
+Markdown + LaTeX 渲染（纯函数，供进程池调用）
+
+本模块不依赖 app 内其它模块，子进程（spawn）导入时不会触发配置加载 / 数据库连接。
+数学公式不在服务端排版，只保留为带 class 的 span/div（math inline / math block / math amsmath），
+前端 KaTeX / MathJax 直接按 class 渲染，不再需要解析整篇 Markdown。
+'''
+
+# 渲染规则变化时递增，content_hash 随之变化，已存储的 HTML 会被重新渲染
+RENDER_VERSION = "2"
+
+_MATH_TOKENS = {"math_inline", "math_inline_double", "math_block", "math_block_label", "amsmath"}
+
+_ALLOWED_TAGS = {
+    "a", "abbr", "b", "blockquote", "br", "code", "del", "div", "em", "h1", "h2", "h3",
+    "h4", "h5", "h6", "hr", "i", "img", "li", "ol", "p", "pre", "s", "span", "strong",
+    "sub", "sup", "table", "tbody", "td", "th", "thead", "tr", "ul",
+}
+_ALLOWED_ATTRIBUTES = {
+    "*": {"class", "id"},
+    "a": {"href", "title"},
+    "img": {"src", "alt", "title"},
+    # 不允许 style（任意 CSS 可做遮罩 / position:fixed），表格对齐改用 align（见 render_markdown）
+    "td": {"align"},
+    "th": {"align"},
+    "ol": {"start"},
+}
+
+
+def content_hash(content: str) -> str:
+    """内容哈希（包含渲染版本），用于判断是否需要重新渲染"""
+    return hashlib.sha256(f"{RENDER_VERSION}\0{content}".encode("utf-8")).hexdigest()
+
+
+@lru_cache(maxsize=1)
+def _parser() -> MarkdownIt:
+    # 允许文章内嵌 HTML（已有文章里有 <img> / <br> 等），安全性由 nh3 白名单过滤保证
+    md = MarkdownIt("commonmark", {"html": True, "linkify": False, "typographer": False})
+    md.enable("table").enable("strikethrough")
+    dollarmath_plugin(md, allow_labels=True, allow_space=True, allow_digits=True, double_inline=True)
+    amsmath_plugin(md)
+    return md
+
+
+def _slugify(text: str) -> str:
+    text = unicodedata.normalize("NFKC", text).strip().lower()
+    # 保留中文等字母数字字符，其它字符折叠为 -
+    slug = re.sub(r"[^\w]+", "-", text, flags=re.UNICODE).strip("-")
+    return slug or "section"
+
+
+def render_markdown(content: str) -> Dict:
+    """
+    渲染 Markdown，返回 dict（可跨进程 pickle）：
+        html           经过白名单过滤的 HTML
+        toc            [{"level": 2, "id": "...", "title": "..."}]
+        has_latex      是否包含数学公式
+        latex_content  提取出的公式源码（每条之间空一行），没有公式时为 None
+        content_hash   见 content_hash()
+    """
+    md = _parser()
+    env: Dict = {}
+    tokens = md.parse(content, env)
+
+    toc: List[Dict] = []
+    used_ids: Dict[str, int] = {}
+    formulas: List[str] = []
+    for i, token in enumerate(tokens):
+        if token.type == "heading_open":
+            inline = tokens[i + 1]
+            title = "".join(
+                child.content for child in (inline.children or [])
+                if child.type in ("text", "code_inline", "math_inline", "math_inline_double")
+            ).strip() or inline.content
+            slug = _slugify(title)
+            count = used_ids.get(slug, 0)
+            used_ids[slug] = count + 1
+            anchor = slug if count == 0 else f"{slug}-{count}"
+            token.attrSet("id", anchor)
+            toc.append({"level": int(token.tag[1]), "id": anchor, "title": title})
+        if token.type in ("th_open", "td_open"):
+            # markdown-it 用 style="text-align:..." 表示列对齐
+            style = token.attrs.pop("style", None)
+            if isinstance(style, str) and style.startswith("text-align:"):
+                token.attrSet("align", style.removeprefix("text-align:"))
+        if token.type in _MATH_TOKENS:
+            formulas.append(token.content.strip())
+        for child in token.children or []:
+            if child.type in _MATH_TOKENS:
+                formulas.append(child.content.strip())
+
+    raw_html = md.renderer.render(tokens, md.options, env)
+    html = nh3.clean(
+        raw_html,
+        tags=_ALLOWED_TAGS,
+        attributes=_ALLOWED_ATTRIBUTES,
+        url_schemes={"http", "https", "mailto"},
+        link_rel="noopener noreferrer",
+    )
+    return {
+        "html": html,
+        "toc": toc,
+        "has_latex": bool(formulas),
+        "latex_content": "\n\n".join(formulas) if formulas else None,
+        "content_hash": content_hash(content),
+    }
@@ -0,0 +1,64 @@
+import re
+from functools import lru_cache
+from typing import List, NamedTuple, Optional, Tuple
+
+'''
+全文检索的中文切分（纯函数，SQLite / PostgreSQL 共用）
+
+连续汉字按字二元组切分（与 app/utils/similarity.py 相同），其余文本原样交给 unicode61 / simple 解析器：
+    文档  "学习量子力学"  ->  "学习 习量 量子 子力 力学 学"
+    查询  "量子力学"      ->  短语 "量子 子力 力学"（相邻出现，即原文包含这段汉字）
+不依赖词典，任意长度 >= 2 的汉字子串都能命中索引。
+单个汉字按前缀匹配：段内的字都是某个二元组的首字，段尾的字没有以它开头的二元组，
+因此文档切分时在每段末尾再索引一次最后一个字（"数学" -> "数学 学"），查询 "学" 也能命中。
+切分规则变化后已有索引不再一致，需要同时升级 SQLiteFTSSearch / PostgresFTSSearch 的 INDEX_VERSION。
+'''
+
+# CJK 扩展 A、基本区、兼容区；PostgreSQL 的 cjk_segment() 直接嵌入这个字符串，保证两端一致
+CJK_RANGES = "\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff"
+_CJK_RE = re.compile(f"[{CJK_RANGES}]+")
+_QUERY_PART_RE = re.compile(f"[{CJK_RANGES}]+|[^{CJK_RANGES}]+")
+
+
+class QueryTerm(NamedTuple):
+    """查询词项：tokens 必须相邻出现；prefix 为 True 时最后一个 token 按前缀匹配"""
+    tokens: Tuple[str, ...]
+    prefix: bool
+
+
+def cjk_bigrams(run: str) -> List[str]:
+    if len(run) == 1:
+        return [run]
+    return [run[i:i + 2] for i in range(len(run) - 1)]
+
+
+def _document_tokens(run: str) -> List[str]:
+    tokens = cjk_bigrams(run)
+    if len(run) > 1:
+        tokens.append(run[-1])
+    return tokens
+
+
+def segment_text(text: Optional[str]) -> str:
+    """文档切分：连续汉字替换为空格分隔的二元组，段尾的字单独再索引一次"""
+    if not text:
+        return ""
+    return _CJK_RE.sub(lambda m: " " + " ".join(_document_tokens(m.group())) + " ", text)
+
+
+@lru_cache(maxsize=1024)
+def segment_query(query: str) -> Tuple[QueryTerm, ...]:
+    """
+    查询切分（进程内缓存，热门搜索词不重复切分）
+
+    连续汉字 -> 二元组短语；单个汉字和英文 / 数字词 -> 前缀匹配；单个字母 / 数字忽略。
+    返回空元组表示关键词无法走全文索引
+    """
+    terms = []
+    for word in re.sub(r"[^\w\s]", " ", query).split():
+        for part in _QUERY_PART_RE.findall(word):
+            if _CJK_RE.fullmatch(part):
+                terms.append(QueryTerm(tuple(cjk_bigrams(part)), prefix=len(part) == 1))
+            elif len(part.strip("_")) >= 2:
+                terms.append(QueryTerm((part.strip("_"),), prefix=True))
+    return tuple(terms)
@@ -0,0 +1,139 @@
+import hashlib
+import math
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+
+'''
+相关文章计算（纯函数，NumPy / SciPy）
+
+文本相似度：标题 / 摘要 / 正文分词后按权重合并词频，构建稀疏 TF-IDF 矩阵（亚线性 tf、平滑 idf、
+行 L2 归一化），两篇文章的余弦相似度即两行的点积。
+标签相似度：文章 × 标签的 0/1 稀疏矩阵，交集 = T·Tᵀ，Jaccard = 交集 / (|A| + |B| - 交集)。
+最终分数 = text_weight * 余弦 + (1 - text_weight) * Jaccard。
+'''
+
+# 英文 / 数字词、连续汉字（按字二元组切分）
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9_+#]*|[\u3400-\u9fff]+")
+_URL_RE = re.compile(r"https?://\S+|!\[[^\]]*\]\([^)]*\)")
+_STOPWORDS = frozenset(
+    "the and for are but not you your with this that from have has was were will can its "
+    "into about there their what when which who how all any also http https www com".split()
+)
+
+# 各字段词频的放大倍数
+TITLE_BOOST = 3
+SUMMARY_BOOST = 2
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    if not text:
+        return []
+    tokens = []
+    for match in _TOKEN_RE.findall(_URL_RE.sub(" ", text.lower())):
+        if "\u3400" <= match[0] <= "\u9fff":
+            if len(match) == 1:
+                tokens.append(match)
+            else:
+                tokens.extend(match[i:i + 2] for i in range(len(match) - 1))
+        elif len(match) > 1 and match not in _STOPWORDS:
+            tokens.append(match)
+    return tokens
+
+
+def document_terms(title: str, summary: Optional[str], content: str) -> Counter:
+    terms = Counter(tokenize(content))
+    for token in tokenize(summary):
+        terms[token] += SUMMARY_BOOST
+    for token in tokenize(title):
+        terms[token] += TITLE_BOOST
+    return terms
+
+
+def document_signature(title: str, summary: Optional[str], content: str, tag_ids: Iterable[int]) -> str:
+    """参与计算的字段摘要，未变化的文章在增量更新时跳过"""
+    raw = "\0".join([title or "", summary or "", content or "", ",".join(map(str, sorted(tag_ids)))])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class TfidfBuilder:
+    '''逐篇累加词频（只保存 词id / 次数 数组），最后一次性构建 CSR 矩阵'''
+
+    def __init__(self):
+        self.vocabulary: Dict[str, int] = {}
+        self._indptr = [0]
+        self._indices: List[int] = []
+        self._counts: List[int] = []
+
+    def add(self, terms: Counter):
+        vocabulary = self.vocabulary
+        for term, count in terms.items():
+            index = vocabulary.get(term)
+            if index is None:
+                index = vocabulary[term] = len(vocabulary)
+            self._indices.append(index)
+            self._counts.append(count)
+        self._indptr.append(len(self._indices))
+
+    def build(self) -> sparse.csr_matrix:
+        n_docs = len(self._indptr) - 1
+        tf = sparse.csr_matrix(
+            (np.asarray(self._counts, dtype=np.float64),
+             np.asarray(self._indices, dtype=np.int64),
+             np.asarray(self._indptr, dtype=np.int64)),
+            shape=(n_docs, max(len(self.vocabulary), 1)),
+        )
+        tf.data = 1.0 + np.log(tf.data)
+        df = np.bincount(tf.indices, minlength=tf.shape[1])
+        idf = np.log((1.0 + n_docs) / (1.0 + df)) + 1.0
+        return normalize_rows(tf @ sparse.diags(idf))
+
+
+def normalize_rows(matrix: sparse.csr_matrix) -> sparse.csr_matrix:
+    matrix = sparse.csr_matrix(matrix)
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.csr_matrix(sparse.diags(1.0 / norms) @ matrix)
+
+
+def tag_matrix(tag_lists: Sequence[Iterable[int]]) -> sparse.csr_matrix:
+    indptr, indices = [0], []
+    columns: Dict[int, int] = {}
+    for tags in tag_lists:
+        for tag_id in set(tags):
+            indices.append(columns.setdefault(tag_id, len(columns)))
+        indptr.append(len(indices))
+    return sparse.csr_matrix(
+        (np.ones(len(indices)), np.asarray(indices, dtype=np.int64), np.asarray(indptr, dtype=np.int64)),
+        shape=(len(tag_lists), max(len(columns), 1)),
+    )
+
+
+def blended_scores(
+    text: sparse.csr_matrix,
+    tags: sparse.csr_matrix,
+    rows: np.ndarray,
+    text_weight: float,
+) -> np.ndarray:
+    """rows 对全体文章的相似度（len(rows) × N 稠密矩阵），调用方按块传入 rows 控制内存"""
+    cosine = (text[rows] @ text.T).toarray()
+    inter = (tags[rows] @ tags.T).toarray()
+    sizes = np.asarray(tags.sum(axis=1)).ravel()
+    union = sizes[rows][:, None] + sizes[None, :] - inter
+    jaccard = np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+    return text_weight * cosine + (1.0 - text_weight) * jaccard
+
+
+def top_k(scores: np.ndarray, k: int, exclude: int, min_score: float) -> List[Tuple[int, float]]:
+    """单行分数取前 k（argpartition，O(N)），不含 exclude 自身与低于 min_score 的项"""
+    scores = scores.copy()
+    scores[exclude] = -math.inf
+    k = min(k, len(scores) - 1)
+    if k <= 0:
+        return []
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+    return [(int(j), float(scores[j])) for j in candidates if scores[j] >= min_score]
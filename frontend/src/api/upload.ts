@@ -25,7 +25,7 @@ export const uploadPdf = (file: File) => {
 };
 
 export const getMediaList = () => {
-  return request.get("/articles/media/list");
+  return request.get("/articles/media/list?full=true");
 };
 
 export const getPdf = (filename: string) => {
@@ -33,7 +33,7 @@ export const getPdf = (filename: string) => {
 };
 
 export const getUserMediaList = (uploader_id: number) => {
-  return request.get(`/articles/media/list?uploader_id=${uploader_id}`);
+  return request.get(`/articles/media/list?uploader_id=${uploader_id}&full=true`);
 };
 
 export const getAdminUserId = async () => {
@@ -0,0 +1,78 @@
+# projects/myblog/scripts/article_io.py
+"""
+文章 NDJSON 导入导出命令行
+
+    python scripts/article_io.py export -o articles.ndjson [--status published]
+    python scripts/article_io.py import articles.ndjson --author admin [--batch-size 1000]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from contextlib import nullcontext
+
+# 👇 把项目根目录添加到 sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import select  # noqa: E402
+
+from app.core.article_io import export_ndjson, import_ndjson  # noqa: E402
+from app.core.database import async_session  # noqa: E402
+from app.models import __all_models__  # noqa: F401,E402
+from app.models.article import ArticleStatus  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+
+async def run_export(output: str, status: str | None):
+    count = 0
+    started = time.perf_counter()
+    async with async_session() as db:
+        with (open(output, "wb") if output != "-" else nullcontext(sys.stdout.buffer)) as fp:
+            async for line in export_ndjson(db, status=ArticleStatus(status) if status else None):
+                fp.write(line)
+                count += 1
+    print(f"✅ 导出 {count - 1} 篇文章，用时 {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+
+async def _read_lines(path: str):
+    # 按字节读取，非法 UTF-8 的行由导入器跳过并报告行号
+    with open(path, "rb") as fp:
+        for line in fp:
+            yield line
+
+
+async def run_import(path: str, author: str, batch_size: int):
+    started = time.perf_counter()
+    async with async_session() as db:
+        result = await db.execute(select(User.id).where(User.username == author))
+        author_id = result.scalar_one_or_none()
+        if author_id is None:
+            print(f"❌ 用户 {author} 不存在")
+            sys.exit(1)
+        stats = await import_ndjson(db, _read_lines(path), author_id, batch_size=batch_size)
+    print(f"✅ 导入完成 {stats}，用时 {time.perf_counter() - started:.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="文章 NDJSON 导入导出")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_export = sub.add_parser("export", help="导出文章 / 标签 / 评论")
+    p_export.add_argument("-o", "--output", default="-", help="输出文件，默认标准输出")
+    p_export.add_argument("--status", choices=[s.value for s in ArticleStatus], help="只导出指定状态")
+
+    p_import = sub.add_parser("import", help="导入 export 生成的 NDJSON")
+    p_import.add_argument("path", help="NDJSON 文件路径")
+    p_import.add_argument("--author", default="admin", help="找不到原作者时归属的用户名")
+    p_import.add_argument("--batch-size", type=int, default=1000, help="每个事务导入的文章数")
+
+    args = parser.parse_args()
+    if args.command == "export":
+        asyncio.run(run_export(args.output, args.status))
+    else:
+        asyncio.run(run_import(args.path, args.author, args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+# projects/myblog/scripts/bench_fts_storage.py
+"""
+SQLite 全文索引存储对比：独立 FTS5 表（复制一份标题 / 正文 / 摘要）  vs  外部内容表（当前结构）
+
+外部内容表按当前实现建立：content 指向 articles_fts_source 视图，文本经 fts_segment() 中文二元组切分。
+独立表的触发器同样经 fts_segment() 切分后写入，两种结构的索引内容和切分开销相同，只比较存储方式的差异。
+
+在临时数据库里生成同一份语料，分别比较：
+    插入吞吐（经触发器同步索引）、正文更新吞吐、VACUUM 后的文件大小与各表占用（需要 dbstat）
+
+    python scripts/bench_fts_storage.py [--articles 5000] [--words 1500] [--batch 500]
+
+已有数据库的迁移不需要手动操作：SQLiteFTSSearch.INDEX_VERSION 升级后，
+启动时 sync_search_index 发现 search_index_state 中的版本不同，会删除旧表并按外部内容表全量重建；
+旧表释放的页面留在空闲列表中，需要回收磁盘空间时停服执行一次 sqlite3 blog.db "VACUUM"。
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+# 👇 把项目根目录添加到 sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.search.sqlite_search_impl import _FTS_TABLE_SQL, _SOURCE_VIEW_SQL, _TRIGGER_SQLS  # noqa: E402
+from app.utils.segment import segment_text  # noqa: E402
+
+ARTICLE_SQL = """
+    CREATE TABLE article (
+        id INTEGER PRIMARY KEY,
+        title TEXT NOT NULL,
+        content TEXT NOT NULL,
+        summary TEXT,
+        status TEXT NOT NULL DEFAULT 'PUBLISHED',
+        view_count INTEGER NOT NULL DEFAULT 0
+    )
+"""
+
+# 改为外部内容表之前的结构（独立表，按 id 列定位），写入的文本与外部内容表一样先切分
+STANDALONE_SQLS = [
+    "CREATE VIRTUAL TABLE articles_fts USING fts5(id UNINDEXED, title, content, summary)",
+    """
+    CREATE TRIGGER articles_ai AFTER INSERT ON article BEGIN
+        INSERT INTO articles_fts(id, title, content, summary)
+        VALUES (new.id, fts_segment(new.title), fts_segment(new.content), fts_segment(new.summary));
+    END
+    """,
+    """
+    CREATE TRIGGER articles_ad AFTER DELETE ON article BEGIN
+        DELETE FROM articles_fts WHERE id = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER articles_au AFTER UPDATE OF title, content, summary ON article
+    WHEN new.title IS NOT old.title OR new.content IS NOT old.content OR new.summary IS NOT old.summary
+    BEGIN
+        UPDATE articles_fts
+        SET title = fts_segment(new.title), content = fts_segment(new.content), summary = fts_segment(new.summary)
+        WHERE id = new.id;
+    END
+    """,
+]
+
+LAYOUTS = {
+    "standalone": STANDALONE_SQLS,
+    "external": [_SOURCE_VIEW_SQL, _FTS_TABLE_SQL, *_TRIGGER_SQLS],
+}
+
+
+def make_corpus(n: int, words: int, seed: int = 42):
+    """生成长文语料：英文词表 + 常用汉字，正文约 words 个词"""
+    rng = random.Random(seed)
+    vocabulary = [
+        "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(3, 10)))
+        for _ in range(20000)
+    ]
+    hanzi = [chr(c) for c in range(0x4E00, 0x4E00 + 3000)]
+
+    def sentence(length: int) -> str:
+        return " ".join(
+            rng.choice(vocabulary) if rng.random() < 0.7 else "".join(rng.choices(hanzi, k=rng.randint(2, 4)))
+            for _ in range(length)
+        )
+
+    return [
+        (i + 1, sentence(rng.randint(4, 12)), sentence(rng.randint(words // 2, words * 3 // 2)), sentence(40))
+        for i in range(n)
+    ]
+
+
+def table_sizes(conn: sqlite3.Connection):
+    try:
+        rows = conn.execute("SELECT name, sum(pgsize) FROM dbstat GROUP BY name ORDER BY 2 DESC").fetchall()
+    except sqlite3.OperationalError:
+        # 未编译 dbstat 时只比较文件大小
+        return []
+    return rows
+
+
+def run(layout: str, corpus, batch: int):
+    path = tempfile.mktemp(suffix=f".{layout}.db")
+    conn = sqlite3.connect(path, isolation_level=None)
+    conn.create_function("fts_segment", 1, segment_text, deterministic=True)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute(ARTICLE_SQL)
+    for sql in LAYOUTS[layout]:
+        conn.execute(sql)
+
+    start = time.perf_counter()
+    for offset in range(0, len(corpus), batch):
+        conn.execute("BEGIN")
+        conn.executemany(
+            "INSERT INTO article(id, title, content, summary) VALUES (?, ?, ?, ?)", corpus[offset:offset + batch]
+        )
+        conn.execute("COMMIT")
+    insert_seconds = time.perf_counter() - start
+
+    # 改写 10% 文章的正文（触发器删除旧索引项再插入）
+    updated = corpus[::10]
+    start = time.perf_counter()
+    conn.execute("BEGIN")
+    conn.executemany("UPDATE article SET content = ? WHERE id = ?", [(row[2][::-1], row[0]) for row in updated])
+    conn.execute("COMMIT")
+    update_seconds = time.perf_counter() - start
+
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.execute("VACUUM")
+    size = os.path.getsize(path)
+    tables = table_sizes(conn)
+    conn.close()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.unlink(path + suffix)
+    return {
+        "insert_rate": len(corpus) / insert_seconds,
+        "update_rate": len(updated) / update_seconds,
+        "size": size,
+        "tables": tables,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=5000)
+    parser.add_argument("--words", type=int, default=1500, help="正文平均词数")
+    parser.add_argument("--batch", type=int, default=500, help="每个事务插入的文章数")
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.articles, args.words)
+    text_bytes = sum(len(title.encode()) + len(content.encode()) + len(summary.encode()) for _, title, content, summary in corpus)
+    print(f"语料: {args.articles} 篇, 文本 {text_bytes / 1024 / 1024:.1f} MB, SQLite {sqlite3.sqlite_version}\n")
+
+    results = {layout: run(layout, corpus, args.batch) for layout in LAYOUTS}
+    for layout, result in results.items():
+        print(f"[{layout}]")
+        print(f"  插入   {result['insert_rate']:10.0f} 篇/秒")
+        print(f"  改正文 {result['update_rate']:10.0f} 篇/秒")
+        print(f"  文件   {result['size'] / 1024 / 1024:10.1f} MB")
+        for name, size in result["tables"][:6]:
+            print(f"    {name:<28}{size / 1024 / 1024:8.1f} MB")
+        print()
+
+    base, ext = results["standalone"], results["external"]
+    print(f"外部内容表: 文件大小 {ext['size'] / base['size']:.0%}，"
+          f"插入吞吐 {ext['insert_rate'] / base['insert_rate']:.2f}x，"
+          f"改正文吞吐 {ext['update_rate'] / base['update_rate']:.2f}x（相对独立表）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+相关文章增量计算测试（临时 SQLite 数据库，不需要启动服务）
+
+    python -m pytest tests/test_related_articles.py
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+
+# 必须在导入 app 之前指定数据库
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{tempfile.mktemp(suffix='.db')}"
+os.environ.setdefault("EMAIL_USER", "test@example.com")
+os.environ.setdefault("EMAIL_FROM", "test@example.com")
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import delete, select, update  # noqa: E402
+
+from app.core.database import async_session, create_db_and_tables, engine  # noqa: E402
+from app.core.related_articles import related_articles  # noqa: E402
+from app.models.article import Article, ArticleStatus  # noqa: E402
+from app.models.related import ArticleRelated, ArticleRelatedState  # noqa: E402
+from app.models.tag import ArticleTag, Tag  # noqa: E402
+from app.models.user import User, UserRole  # noqa: E402
+
+TOPICS = ["quantum field theory", "python asyncio sqlalchemy", "markdown latex render"]
+
+
+async def _seed():
+    """清空后写入 12 篇文章，返回 主题 -> 文章 id 列表"""
+    await create_db_and_tables()
+    async with async_session() as db:
+        for model in (ArticleRelated, ArticleRelatedState, ArticleTag, Tag, Article, User):
+            await db.execute(delete(model))
+        user = User(username="related", email="related@example.com", role=UserRole.ADMIN, hashed_password="x")
+        db.add(user)
+        await db.flush()
+        by_topic = {topic: [] for topic in TOPICS}
+        for i in range(12):
+            article = Article(
+                title=f"{TOPICS[i % 3]} {i}",
+                content=f"{TOPICS[i % 3]} notes {i} " * 20,
+                summary=TOPICS[i % 3],
+                status=ArticleStatus.PUBLISHED,
+                author_id=user.id,
+            )
+            db.add(article)
+            await db.flush()
+            by_topic[TOPICS[i % 3]].append(article.id)
+        await db.commit()
+    return by_topic
+
+
+async def _stored_lists():
+    """文章 id -> {近邻 id: 分数}（按名次）"""
+    async with async_session() as db:
+        result = await db.execute(
+            select(ArticleRelated.article_id, ArticleRelated.related_id, ArticleRelated.score)
+            .order_by(ArticleRelated.article_id, ArticleRelated.rank)
+        )
+        lists = {}
+        for article_id, related_id, score in result.all():
+            lists.setdefault(article_id, {})[related_id] = score
+        return lists
+
+
+async def _tag(tag_name, article_ids):
+    async with async_session() as db:
+        tag = Tag(name=tag_name)
+        db.add(tag)
+        await db.flush()
+        for article_id in article_ids:
+            db.add(ArticleTag(article_id=article_id, tag_id=tag.id))
+        await db.commit()
+
+
+def _run(coro):
+    async def wrapper():
+        try:
+            await coro
+        finally:
+            # 每个测试各自一个事件循环，连接池不能跨循环复用
+            await engine.dispose()
+    asyncio.run(wrapper())
+
+
+async def _full_then_incremental():
+    await _seed()
+    full = await related_articles.update(full=True)
+    assert full["recomputed"] == full["articles"] == 12
+
+    # 全量之后没有任何变化：增量不应重算任何文章
+    incremental = await related_articles.update()
+    assert incremental == {"articles": 12, "changed": 0, "recomputed": 0}
+
+    # 再跑一次全量，状态表仍然完整
+    await related_articles.update(full=True)
+    assert (await related_articles.update())["recomputed"] == 0
+
+
+async def _edit_content():
+    by_topic = await _seed()
+    await related_articles.update(full=True)
+    quantum, python = by_topic[TOPICS[0]], by_topic[TOPICS[1]]
+    moved = quantum[0]
+    before = await _stored_lists()
+    assert all(moved in before[a] for a in quantum[1:])
+
+    # 把一篇量子文章改写成 python 主题
+    async with async_session() as db:
+        await db.execute(update(Article).where(Article.id == moved).values(
+            title="python asyncio sqlalchemy",
+            summary="python asyncio sqlalchemy",
+            content="python asyncio sqlalchemy tutorial " * 20,
+        ))
+        await db.commit()
+    stats = await related_articles.update()
+    assert stats["changed"] == 1
+
+    after = await _stored_lists()
+    # 自身重算：最相似的是 python 文章
+    assert set(list(after[moved])[:len(python)]) == set(python)
+    # 引用它的旧近邻重算后不再包含它，新主题的文章把它挤入榜单
+    assert all(moved not in after[a] for a in quantum[1:])
+    assert all(moved in after[a] for a in python)
+
+
+async def _edit_tags():
+    by_topic = await _seed()
+    await related_articles.update(full=True)
+    quantum, markdown = by_topic[TOPICS[0]][0], by_topic[TOPICS[2]][0]
+    before = await _stored_lists()
+
+    # 跨主题的两篇文章加上同一个标签：双方互相的分数都应提高
+    await _tag("shared", [quantum, markdown])
+    stats = await related_articles.update()
+    assert stats["changed"] == 2
+    tagged = await _stored_lists()
+    assert tagged[markdown][quantum] > before[markdown].get(quantum, 0)
+    assert tagged[quantum][markdown] > before[quantum].get(markdown, 0)
+
+    # 只从一篇文章上去掉标签：另一篇作为近邻也要重算
+    async with async_session() as db:
+        await db.execute(delete(ArticleTag).where(ArticleTag.article_id == markdown))
+        await db.commit()
+    stats = await related_articles.update()
+    assert stats["changed"] == 1
+    untagged = await _stored_lists()
+    assert untagged[quantum].get(markdown, 0) < tagged[quantum][markdown]
+    assert (await related_articles.update())["recomputed"] == 0
+
+
+async def _delete_article():
+    by_topic = await _seed()
+    await related_articles.update(full=True)
+    removed = by_topic[TOPICS[0]][0]
+    assert any(removed in items for items in (await _stored_lists()).values())
+
+    # 与删除文章接口相同的清理顺序
+    async with async_session() as db:
+        await db.execute(delete(ArticleTag).where(ArticleTag.article_id == removed))
+        await related_articles.forget(db, removed)
+        await db.execute(delete(Article).where(Article.id == removed))
+        await db.commit()
+    lists = await _stored_lists()
+    assert removed not in lists
+    assert all(removed not in items for items in lists.values())
+
+    stats = await related_articles.update()
+    assert stats["articles"] == 11
+    assert all(removed not in items for items in (await _stored_lists()).values())
+
+
+async def _unpublish_article():
+    by_topic = await _seed()
+    await related_articles.update(full=True)
+    quantum = by_topic[TOPICS[0]]
+    hidden = quantum[0]
+    referrers = [a for a, items in (await _stored_lists()).items() if hidden in items]
+    assert referrers
+
+    # 下线的文章在增量计算时视为移除：引用它的文章全部重算
+    async with async_session() as db:
+        await db.execute(update(Article).where(Article.id == hidden).values(status=ArticleStatus.DRAFT))
+        await db.commit()
+    stats = await related_articles.update()
+    assert stats["articles"] == 11
+    assert stats["recomputed"] >= len(referrers)
+    lists = await _stored_lists()
+    assert hidden not in lists
+    assert all(hidden not in items for items in lists.values())
+    assert all(set(quantum[1:]) - {a} <= set(lists[a]) for a in quantum[1:])
+
+
+def test_full_then_incremental_recomputes_nothing():
+    _run(_full_then_incremental())
+
+
+def test_edited_content_recomputes_article_and_neighbours():
+    _run(_edit_content())
+
+
+def test_edited_tags_recompute_both_articles():
+    _run(_edit_tags())
+
+
+def test_deleted_article_leaves_related_lists():
+    _run(_delete_article())
+
+
+def test_unpublished_article_leaves_related_lists():
+    _run(_unpublish_article())
+
+
+if __name__ == "__main__":
+    test_full_then_incremental_recomputes_nothing()
+    test_edited_content_recomputes_article_and_neighbours()
+    test_edited_tags_recompute_both_articles()
+    test_deleted_article_leaves_related_lists()
+    test_unpublished_article_leaves_related_lists()
+    print("✅ 相关文章增量计算测试通过")
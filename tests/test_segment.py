@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+中文切分测试（内存 SQLite FTS5，不需要启动服务）
+
+    python -m pytest tests/test_segment.py
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+
+import pytest
+
+# 导入 app 会加载配置并创建引擎，不能指向真实数据库
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{tempfile.mktemp(suffix='.db')}")
+os.environ.setdefault("EMAIL_USER", "test@example.com")
+os.environ.setdefault("EMAIL_FROM", "test@example.com")
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import create_engine  # noqa: E402
+
+from app.core.search.sqlite_search_impl import (  # noqa: E402
+    SQLiteFTSSearch, ensure_sqlite_functions, register_sqlite_functions
+)
+from app.utils.segment import segment_text  # noqa: E402
+
+
+def _matches(documents, query):
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE VIRTUAL TABLE docs USING fts5(body, tokenize='unicode61')")
+    conn.executemany(
+        "INSERT INTO docs(rowid, body) VALUES (?, ?)",
+        [(i, segment_text(doc)) for i, doc in enumerate(documents)],
+    )
+    rows = conn.execute(
+        "SELECT rowid FROM docs WHERE docs MATCH ? ORDER BY rowid",
+        (SQLiteFTSSearch.build_search_query(query),),
+    ).fetchall()
+    conn.close()
+    return [documents[row[0]] for row in rows]
+
+
+def test_segment_text_indexes_run_final_character():
+    assert segment_text("数学").split() == ["数学", "学"]
+    assert segment_text("学").split() == ["学"]
+    assert segment_text("学习 FastAPI").split() == ["学习", "习", "FastAPI"]
+
+
+def test_single_character_query_matches_run_final_character():
+    documents = ["数学", "学习", "化学实验", "物理"]
+    assert _matches(documents, "学") == ["数学", "学习", "化学实验"]
+
+
+def test_multi_character_query_still_matches_phrase():
+    documents = ["学习量子力学", "量子计算", "力学"]
+    assert _matches(documents, "量子力学") == ["学习量子力学"]
+    assert _matches(documents, "力学") == ["学习量子力学", "力学"]
+
+
+def test_unregistered_connection_fails_loudly():
+    with create_engine("sqlite://").connect() as connection:
+        with pytest.raises(RuntimeError, match="fts_segment"):
+            ensure_sqlite_functions(connection)
+
+    engine = create_engine("sqlite://")
+    register_sqlite_functions(engine)
+    with engine.connect() as connection:
+        ensure_sqlite_functions(connection)
+
+
+if __name__ == "__main__":
+    test_segment_text_indexes_run_final_character()
+    test_single_character_query_matches_run_final_character()
+    test_multi_character_query_still_matches_phrase()
+    test_unregistered_connection_fails_loudly()
+    print("✅ 中文切分测试通过")
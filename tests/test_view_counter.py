@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+浏览量写回缓冲测试（fakeredis，不需要启动服务）
+
+    python -m pytest tests/test_view_counter.py
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{tempfile.mktemp(suffix='.db')}")
+os.environ.setdefault("EMAIL_USER", "test@example.com")
+os.environ.setdefault("EMAIL_FROM", "test@example.com")
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.core.redis import redis_manager  # noqa: E402
+from app.core.view_counter import ViewCounter  # noqa: E402
+
+
+class _InterleavingRedis(fakeredis.FakeAsyncRedis):
+    """每条命令执行前让出事件循环，模拟多个进程的命令交错到达；第一次切换快照后立即有一次新的浏览写入"""
+
+    renamed = False
+
+    async def execute_command(self, *args, **options):
+        await asyncio.sleep(0)
+        result = await super().execute_command(*args, **options)
+        if args[0] in ("RENAME", "RENAMENX") and result and not self.renamed:
+            self.renamed = True
+            await super().execute_command("HINCRBY", ViewCounter.PENDING_KEY, "1", 3)
+        return result
+
+
+async def _buffered_total(redis, article_id: int) -> int:
+    values = await asyncio.gather(
+        redis.hget(ViewCounter.PENDING_KEY, str(article_id)),
+        redis.hget(ViewCounter.FLUSHING_KEY, str(article_id)),
+    )
+    return sum(int(v) for v in values if v)
+
+
+async def _concurrent_drains():
+    redis = _InterleavingRedis(decode_responses=True)
+    redis_manager.redis = redis
+    first, second = ViewCounter(), ViewCounter()
+    try:
+        await first.incr(1, 5)
+        # 两个进程同时 flush：第一个切换快照后有新的浏览进入 pending，第二个不能用它覆盖快照
+        results = await asyncio.gather(first._drain_redis(), second._drain_redis())
+        assert await _buffered_total(redis, 1) == 8
+        # 读到快照的 drain 拿到的是同一个快照（同一批次号），落库时只会累加一次
+        drained = [result for result in results if result[0] is not None]
+        assert drained and all(result == drained[0] for result in drained)
+        assert drained[0][1] == {1: 5}
+    finally:
+        redis_manager.redis = None
+
+
+def test_concurrent_drains_keep_every_increment():
+    asyncio.run(_concurrent_drains())
+
+
+if __name__ == "__main__":
+    test_concurrent_drains_keep_every_increment()
+    print("✅ 浏览量缓冲测试通过")